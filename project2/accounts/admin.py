@@ -32,4 +32,5 @@ class UserAdmin(BaseUserAdmin):
 class CustomerProfileAdmin(admin.ModelAdmin):
     list_display = ["user", "city", "loyalty_points"]
     search_fields = ["user__username", "user__email", "city"]
+    list_select_related = ["user"]
     list_filter = ["city"]
@@ -89,3 +89,13 @@ def save_customer_profile(sender, instance, **kwargs):
             instance.customer_profile.save()
         else:
             CustomerProfile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def build_avatar_derivatives(sender, instance, update_fields=None, **kwargs):
+    from restaurant.images import schedule_derivatives
+
+    # Bỏ qua các lần lưu không đổi avatar (vd. cập nhật last_login)
+    if update_fields and "avatar" not in update_fields:
+        return
+    schedule_derivatives(instance.avatar)
@@ -0,0 +1,20 @@
+from django.core.mail import send_mail
+
+from taskqueue.queue import task
+
+
+@task
+def send_welcome_email(user_id):
+    """Gửi email chào mừng sau khi đăng ký"""
+    from .models import User
+
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return
+    send_mail(
+        "Chào mừng đến với Nhà hàng FourSeason",
+        f"Chào {user.get_full_name() or user.username},\n\n"
+        "Cảm ơn bạn đã đăng ký tài khoản. Chúc bạn ngon miệng!",
+        None,
+        [user.email],
+    )
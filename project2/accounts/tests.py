@@ -1,3 +1,18 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from project2.testing import query_budget
+from .models import User
+
+
+class CustomerProfileAdminTests(TestCase):
+    def test_changelist_query_count(self):
+        for index in range(5):
+            User.objects.create_user(f"khach{index}", password="x")
+        admin = User.objects.create_superuser("quanly", password="x")
+        self.client.force_login(admin)
+        with query_budget(5):
+            response = self.client.get(
+                reverse("admin:accounts_customerprofile_changelist")
+            )
+        self.assertEqual(response.status_code, 200)
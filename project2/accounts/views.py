@@ -11,6 +11,7 @@ from .forms import (
     CustomerProfileUpdateForm,
 )
 from .decorators import customer_required
+from .tasks import send_welcome_email
 
 
 # Function-Based Views
@@ -23,6 +24,7 @@ def register_view(request):
         form = UserRegistrationForm(request.POST)
         if form.is_valid():
             user = form.save()
+            send_welcome_email.delay(user.pk)
             login(request, user)
             messages.success(request, "Đăng ký tài khoản thành công!")
             return redirect("restaurant:home")
@@ -0,0 +1,208 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def get_cache_timeout():
+    return getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 60)
+
+
+def _money(expression):
+    return Coalesce(
+        expression,
+        Decimal(0),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def _date_range(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def _cached(key, builder):
+    data = cache.get(key)
+    if data is None:
+        data = builder()
+        cache.set(key, data, get_cache_timeout())
+    return data
+
+
+def summary_cache_key(start, end):
+    return f"dashboard:summary:{start.isoformat()}:{end.isoformat()}"
+
+
+def daily_revenue(start, end):
+    """Số đơn và doanh thu từng ngày trong [start, end]
+
+    Đọc từ bảng DailySalesRollup (một dòng mỗi ngày) nên chi phí không phụ
+    thuộc vào số lượng đơn hàng.
+    """
+    from orders.models import DailySalesRollup
+
+    rows = DailySalesRollup.objects.filter(
+        date__gte=start, date__lte=end
+    ).values_list("date", "orders_count", "revenue")
+    rollups = {day: (orders, revenue) for day, orders, revenue in rows}
+    series = []
+    for day in _date_range(start, end):
+        orders, revenue = rollups.get(day, (0, Decimal(0)))
+        series.append({"day": day, "orders": orders, "revenue": revenue})
+    return series
+
+
+def revenue_series(start, end, period="day"):
+    """Doanh thu theo ngày, tuần (bắt đầu thứ Hai) hoặc tháng"""
+    days = daily_revenue(start, end)
+    if period == "day":
+        return days
+
+    buckets = {}
+    for row in days:
+        if period == "week":
+            bucket = row["day"] - timedelta(days=row["day"].weekday())
+        else:
+            bucket = row["day"].replace(day=1)
+        total = buckets.setdefault(
+            bucket, {"day": bucket, "orders": 0, "revenue": Decimal(0)}
+        )
+        total["orders"] += row["orders"]
+        total["revenue"] += row["revenue"]
+    return list(buckets.values())
+
+
+def order_summary(start, end):
+    """Tổng quan đơn hàng trong khoảng ngày
+
+    Doanh số lấy từ bảng tổng hợp theo ngày, chỉ số lượng đơn theo trạng
+    thái được đếm trực tiếp (dùng index status, created_at).
+    """
+    from orders.models import DailySalesRollup, Order
+    from orders.rollups import created_between
+
+    summary = Order.objects.filter(created_between(start, end)).aggregate(
+        total_orders=Count("id"),
+        cancelled_orders=Count("id", filter=Q(status="cancelled")),
+    )
+    summary.update(
+        DailySalesRollup.objects.filter(
+            date__gte=start, date__lte=end
+        ).aggregate(
+            completed_orders=Coalesce(Sum("orders_count"), 0),
+            discounted_orders=Coalesce(Sum("discounted_orders"), 0),
+            revenue=_money(Sum("revenue")),
+            discount_total=_money(Sum("discount")),
+        )
+    )
+    completed = summary["completed_orders"]
+    summary["average_order_value"] = (
+        (summary["revenue"] / completed).quantize(Decimal("0.01"))
+        if completed
+        else Decimal(0)
+    )
+    return summary
+
+
+def top_menu_items(start, end, limit=10, order_by="total_quantity"):
+    """Món bán chạy nhất theo số lượng hoặc doanh thu"""
+    from orders.models import DailyItemSales
+
+    return list(
+        DailyItemSales.objects.filter(date__gte=start, date__lte=end)
+        .values("menu_item_id", "menu_item__name")
+        .annotate(
+            total_quantity=Sum("quantity"),
+            total_revenue=_money(Sum("revenue")),
+        )
+        .order_by(f"-{order_by}")[:limit]
+    )
+
+
+def coupon_stats():
+    """Tỷ lệ sử dụng của các mã giảm giá còn kích hoạt
+
+    Mã tạo hàng loạt được gộp theo chiến dịch thay vì liệt kê từng mã.
+    """
+    from orders.models import Coupon
+
+    active = Coupon.objects.filter(is_active=True)
+    coupons = list(
+        active.filter(campaign="")
+        .values("code", "used_count", "usage_limit")
+        .order_by("-used_count")
+    )
+    coupons += [
+        {
+            "code": f"{row['campaign']} ({row['codes']} mã)",
+            "used_count": row["used_count"],
+            "usage_limit": row["usage_limit"],
+        }
+        for row in active.exclude(campaign="")
+        .values("campaign")
+        .annotate(
+            codes=Count("id"),
+            used_count=Sum("used_count"),
+            usage_limit=Sum("usage_limit"),
+        )
+        .order_by("-used_count")
+    ]
+    for coupon in coupons:
+        limit = coupon["usage_limit"]
+        coupon["redemption_rate"] = (
+            coupon["used_count"] / limit if limit else None
+        )
+    return coupons
+
+
+def reservation_stats(start, end):
+    """Tỷ lệ khách không đến trên các đặt bàn đã kết thúc"""
+    from reservations.models import Reservation
+
+    stats = Reservation.objects.filter(
+        date__gte=start, date__lte=end
+    ).aggregate(
+        total=Count("id"),
+        completed=Count("id", filter=Q(status="completed")),
+        cancelled=Count("id", filter=Q(status="cancelled")),
+        no_show=Count("id", filter=Q(status="no_show")),
+    )
+    finished = stats["completed"] + stats["no_show"]
+    stats["no_show_rate"] = stats["no_show"] / finished if finished else None
+    return stats
+
+
+def dashboard_data(days=30, period="day"):
+    """Toàn bộ số liệu cho trang dashboard trong `days` ngày gần nhất"""
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    data = _cached(
+        summary_cache_key(start, end),
+        lambda: {
+            "summary": order_summary(start, end),
+            "top_by_quantity": top_menu_items(start, end),
+            "top_by_revenue": top_menu_items(
+                start, end, order_by="total_revenue"
+            ),
+            "coupons": coupon_stats(),
+            "reservations": reservation_stats(start, end),
+        },
+    )
+    summary = data["summary"]
+    completed = summary["completed_orders"]
+    return dict(
+        data,
+        start=start,
+        end=end,
+        period=period,
+        revenue_series=revenue_series(start, end, period),
+        coupon_usage_rate=(
+            summary["discounted_orders"] / completed if completed else None
+        ),
+    )
@@ -0,0 +1,84 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from dashboard.analytics import dashboard_data, summary_cache_key
+from dashboard.views import RANGES
+from orders.models import Order
+from orders.rollups import raw_daily_sales
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian dựng dashboard (cache trống và cache có sẵn) so với "
+        "tính doanh thu trực tiếp từ bảng Order, trên dữ liệu đang có "
+        "(vd. sau generate_load_data --orders 1000000)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            nargs="+",
+            default=list(RANGES),
+            help="Các khoảng ngày cần đo",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Số lần đo mỗi khoảng"
+        )
+
+    def handle(self, *args, **options):
+        total = Order.objects.count()
+        if not total:
+            raise CommandError(
+                "Chưa có đơn hàng, chạy generate_load_data --orders trước"
+            )
+
+        self.stdout.write(
+            f"{total} đơn hàng, {options['repeat']} lần đo, "
+            f"trung vị ms (số truy vấn)"
+        )
+        self.stdout.write(
+            f"{'số ngày':>8}{'cache trống':>20}{'cache có sẵn':>20}"
+            f"{'đếm từ Order':>20}"
+        )
+        for days in options["days"]:
+            end = timezone.localdate()
+            start = end - timedelta(days=days - 1)
+            key = summary_cache_key(start, end)
+
+            def cold():
+                cache.delete(key)
+                dashboard_data(days=days)
+
+            cells = [
+                self.measure(cold, options["repeat"]),
+                self.measure(
+                    lambda: dashboard_data(days=days), options["repeat"]
+                ),
+                self.measure(
+                    lambda: raw_daily_sales(start, end), options["repeat"]
+                ),
+            ]
+            self.stdout.write(
+                f"{days:>8}"
+                + "".join(
+                    f"{elapsed * 1000:>14.1f} ({queries:>3})"
+                    for elapsed, queries in cells
+                )
+            )
+
+    def measure(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+        return statistics.median(timings), len(queries)
@@ -1,7 +1,22 @@
 from django.shortcuts import render
 from accounts.decorators import admin_required
+from .analytics import dashboard_data
+
+PERIODS = ("day", "week", "month")
+RANGES = (7, 30, 90, 365)
 
 
 @admin_required
 def admin_dashboard(request):
-    return render(request, "dashboard/admin_dashboard.html")
+    """Trang thống kê cho admin"""
+    period = request.GET.get("period")
+    if period not in PERIODS:
+        period = "day"
+    days = request.GET.get("days", "")
+    days = int(days) if days.isdigit() and int(days) in RANGES else 30
+
+    context = dashboard_data(days=days, period=period)
+    context["days"] = days
+    context["periods"] = PERIODS
+    context["ranges"] = RANGES
+    return render(request, "dashboard/admin_dashboard.html", context)
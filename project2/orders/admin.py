@@ -1,17 +1,40 @@
-from django.contrib import admin
-from .models import Order, OrderItem, Coupon
+from functools import partial
+
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from .coupons import iter_coupons_csv
+from .forms import CouponBatchForm
+from .models import (
+    Coupon,
+    CouponRedemption,
+    DailySalesRollup,
+    Order,
+    OrderItem,
+)
 
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
-    readonly_fields = ["price", "get_total_price"]
+    # Món và giá được chốt lúc đặt hàng; để món là ô chọn thì mỗi dòng sẽ
+    # tải lại toàn bộ thực đơn
+    readonly_fields = ["menu_item", "price", "get_total_price"]
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
     def get_total_price(self, obj):
         return f"{obj.get_total_price():,.0f}đ"
 
     get_total_price.short_description = "Thành tiền"
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("menu_item")
+
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -26,6 +49,7 @@ class OrderAdmin(admin.ModelAdmin):
     ]
     list_filter = ["status", "payment_status", "order_type", "created_at"]
     search_fields = ["order_number", "customer__username", "delivery_phone"]
+    list_select_related = ["customer"]
     readonly_fields = [
         "order_number",
         "subtotal",
@@ -80,22 +104,39 @@ class OrderAdmin(admin.ModelAdmin):
 
     actions = ["mark_as_confirmed", "mark_as_completed"]
 
-    def mark_as_confirmed(self, request, queryset):
-        from django.utils import timezone
+    def _after_status_update(self, order_ids):
+        # update() không gửi signal nên phải tự báo cho màn hình bếp,
+        # tính lại doanh số các ngày bị ảnh hưởng
+        from .events import publish_order
+        from .tasks import refresh_sales_days
 
-        updated = queryset.filter(status="pending").update(
+        created = Order.objects.filter(pk__in=order_ids).values_list(
+            "created_at", flat=True
+        )
+        days = {timezone.localdate(value).isoformat() for value in created}
+        if days:
+            refresh_sales_days.delay(sorted(days))
+        for order_id in order_ids:
+            transaction.on_commit(partial(publish_order, order_id))
+
+    def mark_as_confirmed(self, request, queryset):
+        order_ids = list(
+            queryset.filter(status="pending").values_list("pk", flat=True)
+        )
+        updated = Order.objects.filter(pk__in=order_ids).update(
             status="confirmed", confirmed_at=timezone.now()
         )
+        self._after_status_update(order_ids)
         self.message_user(request, f"Đã xác nhận {updated} đơn hàng")
 
     mark_as_confirmed.short_description = "Xác nhận đơn hàng đã chọn"
 
     def mark_as_completed(self, request, queryset):
-        from django.utils import timezone
-
-        updated = queryset.update(
+        order_ids = list(queryset.values_list("pk", flat=True))
+        updated = Order.objects.filter(pk__in=order_ids).update(
             status="completed", completed_at=timezone.now()
         )
+        self._after_status_update(order_ids)
         self.message_user(request, f"Đã hoàn thành {updated} đơn hàng")
 
     mark_as_completed.short_description = "Đánh dấu hoàn thành"
@@ -113,6 +154,103 @@ class CouponAdmin(admin.ModelAdmin):
         "is_active",
         "valid_from",
         "valid_to",
+        "campaign",
+        "assigned_to",
     ]
     list_filter = ["discount_type", "is_active", "valid_from", "valid_to"]
-    search_fields = ["code"]
+    list_select_related = ["assigned_to"]
+    raw_id_fields = ["assigned_to"]
+    # Tìm đúng mã/chiến dịch để dùng unique index, không quét cả bảng
+    # như icontains khi có hàng triệu mã
+    search_fields = ["code__exact", "campaign__exact"]
+    show_full_result_count = False
+    actions = ["generate_batch", "export_csv"]
+
+    def generate_batch(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(
+                request, "Chọn đúng một mã làm mẫu", level=messages.WARNING
+            )
+            return None
+        coupon = queryset.get()
+
+        if "apply" in request.POST:
+            form = CouponBatchForm(request.POST)
+            if form.is_valid():
+                from .tasks import generate_coupon_batch
+
+                data = form.cleaned_data
+                generate_coupon_batch.delay(
+                    coupon.pk,
+                    data["count"],
+                    data["campaign"],
+                    data["prefix"],
+                    data["usage_limit"],
+                    data["for_customers"],
+                )
+                self.message_user(
+                    request,
+                    f"Đang tạo mã cho chiến dịch {data['campaign']} "
+                    f"từ mẫu {coupon.code}",
+                )
+                return None
+        else:
+            form = CouponBatchForm()
+
+        return TemplateResponse(
+            request,
+            "admin/orders/coupon/generate_batch.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": "Tạo loạt mã giảm giá",
+                "opts": self.model._meta,
+                "coupon": coupon,
+                "form": form,
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            },
+        )
+
+    generate_batch.short_description = "Tạo loạt mã từ mã mẫu đã chọn"
+
+    def export_csv(self, request, queryset):
+        response = StreamingHttpResponse(
+            iter_coupons_csv(queryset), content_type="text/csv"
+        )
+        response["Content-Disposition"] = 'attachment; filename="coupons.csv"'
+        return response
+
+    export_csv.short_description = "Xuất CSV các mã đã chọn"
+
+
+@admin.register(CouponRedemption)
+class CouponRedemptionAdmin(admin.ModelAdmin):
+    list_display = ["coupon", "order", "user", "discount", "created_at"]
+    list_select_related = ["coupon", "order", "user"]
+    list_filter = ["created_at"]
+    search_fields = ["coupon__code", "order__order_number", "user__username"]
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        "date",
+        "orders_count",
+        "discounted_orders",
+        "discount",
+        "revenue",
+        "updated_at",
+    ]
+    date_hierarchy = "date"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
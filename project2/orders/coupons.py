@@ -0,0 +1,250 @@
+import csv
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Coupon, CouponRedemption
+
+# Giá trị lưu vào cache cho mã không tồn tại (None nghĩa là chưa cache)
+MISSING = "missing"
+
+# Bỏ các ký tự dễ nhầm khi đọc/gõ lại: 0/O, 1/I/L
+CODE_ALPHABET = "23456789ABCDEFGHJKMNPQRSTUVWXYZ"
+CODE_LENGTH = 10
+# Số lần thử lại một lô khi mã vừa sinh bị trùng lúc insert
+MAX_BATCH_ATTEMPTS = 5
+
+# Các trường được sao từ mã mẫu sang mã tạo hàng loạt
+TEMPLATE_FIELDS = (
+    "discount_type",
+    "discount_value",
+    "min_order_amount",
+    "max_discount_amount",
+    "valid_from",
+    "valid_to",
+    "is_active",
+)
+
+CSV_FIELDS = (
+    "code",
+    "campaign",
+    "discount_type",
+    "discount_value",
+    "min_order_amount",
+    "max_discount_amount",
+    "usage_limit",
+    "used_count",
+    "valid_from",
+    "valid_to",
+    "assigned_to__username",
+    "assigned_to__email",
+)
+
+
+class CouponError(Exception):
+    """Mã giảm giá không dùng được; message hiển thị cho khách"""
+
+
+def get_coupon_cache_timeout():
+    return getattr(settings, "COUPON_CACHE_TIMEOUT", 60)
+
+
+def normalize_code(code):
+    return (code or "").strip()
+
+
+def coupon_cache_key(code):
+    return f"orders:coupon:{code}"
+
+
+def get_coupon(code):
+    """Tra cứu mã giảm giá theo code, có cache (kể cả mã không tồn tại)
+
+    `used_count` trong bản cache có thể đã cũ, chỉ dùng để loại sớm mã
+    hết lượt; giới hạn thật được kiểm tra khi `claim_usage`.
+    """
+    code = normalize_code(code)
+    if not code:
+        return None
+    key = coupon_cache_key(code)
+    coupon = cache.get(key)
+    if coupon is None:
+        coupon = Coupon.objects.filter(code=code).first() or MISSING
+        cache.set(key, coupon, get_coupon_cache_timeout())
+    return None if coupon == MISSING else coupon
+
+
+def forget_coupon(code):
+    cache.delete(coupon_cache_key(normalize_code(code)))
+
+
+def validate_coupon(code, subtotal, user_id=None):
+    """Kiểm tra mã cho đơn có tạm tính `subtotal` của user `user_id`
+
+    Trả về (coupon, số tiền giảm), lỗi thì raise CouponError.
+    """
+    coupon = get_coupon(code)
+    if coupon is None:
+        raise CouponError("Mã giảm giá không tồn tại")
+
+    if coupon.assigned_to_id and coupon.assigned_to_id != user_id:
+        raise CouponError("Mã giảm giá này không dành cho tài khoản của bạn")
+
+    is_valid, message = coupon.is_valid()
+    if not is_valid:
+        raise CouponError(message)
+
+    if subtotal < coupon.min_order_amount:
+        raise CouponError(f"Đơn hàng tối thiểu {coupon.min_order_amount}đ")
+
+    return coupon, coupon.calculate_discount(subtotal)
+
+
+def claim_usage(coupon):
+    """Tăng used_count bằng một UPDATE có điều kiện
+
+    Điều kiện (còn lượt, còn hiệu lực, code chưa đổi) được DB kiểm tra
+    cùng lúc với việc tăng, nên dù nhiều đơn dùng mã cùng lúc cũng không
+    vượt quá usage_limit. Trả về False nếu không còn dùng được.
+    """
+    now = timezone.now()
+    claimed = (
+        Coupon.objects.filter(
+            pk=coupon.pk,
+            code=coupon.code,
+            is_active=True,
+            valid_from__lte=now,
+            valid_to__gte=now,
+        )
+        .filter(
+            # usage_limit trống hoặc 0 là không giới hạn, như is_valid()
+            Q(usage_limit__isnull=True)
+            | Q(usage_limit=0)
+            | Q(used_count__lt=F("usage_limit"))
+        )
+        .update(used_count=F("used_count") + 1)
+    )
+    if not claimed:
+        # Bản cache đã cũ (hết lượt, bị tắt hoặc đổi code)
+        forget_coupon(coupon.code)
+    return bool(claimed)
+
+
+def redeem_coupon(code, order):
+    """Giữ một lượt dùng mã cho đơn chưa lưu và tính giảm giá
+
+    Phải gọi trong transaction của việc tạo đơn để lượt dùng được hoàn
+    lại nếu đơn không được lưu. Sau khi lưu đơn, gọi
+    `record_redemption`.
+    """
+    coupon, discount = validate_coupon(code, order.subtotal, order.customer_id)
+    if not claim_usage(coupon):
+        raise CouponError("Mã đã hết lượt sử dụng")
+    order.discount = discount
+    return coupon
+
+
+def record_redemption(coupon, order):
+    return CouponRedemption.objects.create(
+        coupon=coupon,
+        order=order,
+        user_id=order.customer_id,
+        discount=order.discount,
+    )
+
+
+def coupon_template(coupon, **overrides):
+    """Các trường của `coupon` dùng làm mẫu cho `generate_coupons`"""
+    template = {field: getattr(coupon, field) for field in TEMPLATE_FIELDS}
+    template.update(overrides)
+    return template
+
+
+def generate_code(length=CODE_LENGTH, prefix=""):
+    return prefix + "".join(
+        secrets.choice(CODE_ALPHABET) for _ in range(length)
+    )
+
+
+def _new_codes(count, length, prefix):
+    """`count` mã ngẫu nhiên khác nhau và chưa có trong DB"""
+    codes = set()
+    while len(codes) < count:
+        candidates = {
+            generate_code(length, prefix) for _ in range(count - len(codes))
+        }
+        candidates -= codes
+        taken = Coupon.objects.filter(code__in=candidates).values_list(
+            "code", flat=True
+        )
+        codes |= candidates.difference(taken)
+    return list(codes)
+
+
+def generate_coupons(
+    template,
+    count=0,
+    user_ids=None,
+    campaign="",
+    prefix="",
+    length=CODE_LENGTH,
+    batch_size=1000,
+):
+    """Tạo hàng loạt mã giảm giá theo `template` (dict các trường Coupon)
+
+    Có `user_ids` thì mỗi user nhận một mã dành riêng, khi đó `count` bị
+    bỏ qua. Mỗi lô được kiểm tra trùng rồi `bulk_create` trong một
+    transaction; nếu process khác chèn trùng mã giữa chừng thì sinh lại lô
+    đó. Trả về danh sách mã đã tạo.
+    """
+    owners = list(user_ids) if user_ids is not None else [None] * count
+    created = []
+    for start in range(0, len(owners), batch_size):
+        chunk = owners[start : start + batch_size]
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            codes = _new_codes(len(chunk), length, prefix)
+            try:
+                with transaction.atomic():
+                    Coupon.objects.bulk_create(
+                        [
+                            Coupon(
+                                code=code,
+                                campaign=campaign,
+                                assigned_to_id=user_id,
+                                **template,
+                            )
+                            for code, user_id in zip(codes, chunk)
+                        ]
+                    )
+            except IntegrityError:
+                if attempt == MAX_BATCH_ATTEMPTS - 1:
+                    raise
+                continue
+            break
+        # bulk_create không gửi post_save: bỏ cache "không tồn tại" nếu có
+        cache.delete_many([coupon_cache_key(code) for code in codes])
+        created.extend(codes)
+    return created
+
+
+class Echo:
+    """File giả cho csv.writer: trả lại dòng thay vì ghi"""
+
+    def write(self, value):
+        return value
+
+
+def iter_coupons_csv(queryset, header=True):
+    """Sinh từng dòng CSV của các mã, đọc DB theo từng phần"""
+    writer = csv.writer(Echo())
+    if header:
+        yield writer.writerow(CSV_FIELDS)
+    rows = queryset.order_by("pk").values_list(*CSV_FIELDS)
+    for row in rows.iterator(chunk_size=2000):
+        yield writer.writerow(
+            ["" if value is None else value for value in row]
+        )
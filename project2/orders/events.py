@@ -0,0 +1,121 @@
+import asyncio
+import json
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Trạng thái bếp cần theo dõi trên màn hình
+KITCHEN_STATUSES = ("pending", "confirmed", "preparing", "ready")
+
+
+def serialize_order(order, items):
+    """Dữ liệu một đơn gửi cho màn hình bếp"""
+    return {
+        "order_number": order.order_number,
+        "status": order.status,
+        "status_display": order.get_status_display(),
+        "order_type": order.order_type,
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+        "items": [
+            {
+                "name": item.menu_item.name,
+                "quantity": item.quantity,
+                "note": item.note,
+            }
+            for item in items
+        ],
+    }
+
+
+def format_sse(event, data):
+    """Đóng gói một sự kiện theo định dạng server-sent events"""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """Hàng đợi sự kiện của một kết nối, gắn với event loop của nó
+
+    Hàng đợi có giới hạn: client đọc chậm sẽ bị bỏ sự kiện cũ nhất và
+    đánh dấu `lagged` để view gửi lại toàn bộ trạng thái thay vì giữ
+    bộ nhớ không giới hạn.
+    """
+
+    def __init__(self, maxsize):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.lagged = False
+
+    def deliver(self, event):
+        # Chạy trong event loop của subscriber
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.lagged = True
+        self.queue.put_nowait(event)
+
+    def drain(self):
+        """Bỏ các sự kiện đang chờ, dùng sau khi đã gửi lại snapshot"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.lagged = False
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class OrderEventBus:
+    """Pub/sub trong process cho thay đổi trạng thái đơn hàng
+
+    publish() an toàn khi gọi từ thread đồng bộ (view, admin, signal):
+    sự kiện được chuyển sang event loop của từng subscriber qua
+    call_soon_threadsafe. Bus chỉ phục vụ các kết nối trong cùng process,
+    khi chạy nhiều worker mỗi worker có bus riêng.
+    """
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        subscription = Subscription(self.maxsize)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.deliver, event
+                )
+            except RuntimeError:
+                # Event loop đã đóng, kết nối không còn
+                self.unsubscribe(subscription)
+
+
+order_event_bus = OrderEventBus()
+
+
+def publish_order(order_id):
+    """Đọc đơn (kèm món) và phát cho các màn hình bếp đang mở"""
+    from .models import Order
+
+    if not order_event_bus.subscriber_count():
+        return
+    order = Order.objects.filter(pk=order_id).first()
+    if order is None:
+        return
+    items = order.items.select_related("menu_item")
+    order_event_bus.publish(serialize_order(order, items))
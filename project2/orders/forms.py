@@ -77,3 +77,28 @@ class OrderItemNoteForm(forms.ModelForm):
                 }
             )
         }
+
+
+class CouponBatchForm(forms.Form):
+    """Form tạo loạt mã giảm giá từ một mã mẫu trong admin"""
+
+    campaign = forms.CharField(max_length=50, label="Chiến dịch")
+    count = forms.IntegerField(
+        min_value=1,
+        max_value=1_000_000,
+        initial=1000,
+        label="Số mã",
+        help_text="Bỏ qua khi tạo mã riêng cho từng khách hàng",
+    )
+    prefix = forms.CharField(
+        max_length=10,
+        required=False,
+        label="Tiền tố",
+        help_text="Ví dụ: TET-",
+    )
+    usage_limit = forms.IntegerField(
+        min_value=1, initial=1, label="Số lượt dùng mỗi mã"
+    )
+    for_customers = forms.BooleanField(
+        required=False, label="Một mã riêng cho mỗi khách hàng đang hoạt động"
+    )
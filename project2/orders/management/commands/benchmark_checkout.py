@@ -0,0 +1,91 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from orders.models import Order
+from orders.services import place_order
+from restaurant.models import MenuItem
+
+LINE_COUNTS = [1, 20, 200]
+
+
+def cart_lines(count):
+    """Các dòng giỏ hàng như Cart trả về, mỗi món 2 phần"""
+    menu_items = list(
+        MenuItem.objects.filter(is_available=True).order_by("pk")[:count]
+    )
+    if len(menu_items) < count:
+        raise CommandError(
+            f"Cần ít nhất {count} món đang bán, chạy generate_load_data "
+            f"--menu-items trước"
+        )
+    return [
+        {
+            "menu_item": menu_item,
+            "quantity": 2,
+            "price": menu_item.get_price,
+            "total_price": menu_item.get_price * 2,
+        }
+        for menu_item in menu_items
+    ]
+
+
+def new_order(customer):
+    return Order(
+        customer=customer,
+        delivery_name="Khách benchmark",
+        delivery_phone="0900000000",
+        delivery_address="1 Lê Lợi",
+    )
+
+
+def get_customer():
+    customer = User.objects.filter(role="customer").first()
+    if customer is None:
+        raise CommandError("Chưa có khách hàng, chạy generate_load_data trước")
+    return customer
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian và số truy vấn của place_order với giỏ 1, 20 và 200 "
+        "món; mỗi lần đặt được rollback nên không để lại đơn"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lines",
+            type=int,
+            nargs="+",
+            default=LINE_COUNTS,
+            help="Số món trong giỏ cần đo",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=10, help="Số lần đo mỗi cỡ giỏ"
+        )
+
+    def handle(self, *args, **options):
+        customer = get_customer()
+        self.stdout.write(
+            f"{options['repeat']} lần đo, trung vị ms (số truy vấn)"
+        )
+        self.stdout.write(f"{'số món':>8}{'place_order':>20}")
+        for count in options["lines"]:
+            lines = cart_lines(count)
+            elapsed, queries = self.measure(customer, lines, options["repeat"])
+            self.stdout.write(f"{count:>8}{elapsed * 1000:>14.2f} ({queries})")
+
+    def measure(self, customer, lines, repeat):
+        timings = []
+        for _ in range(repeat):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    place_order(new_order(customer), lines)
+                    timings.append(time.perf_counter() - started)
+                transaction.set_rollback(True)
+        return statistics.median(timings), len(queries)
@@ -0,0 +1,79 @@
+import statistics
+import time
+
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from orders.models import Order
+from orders.services import place_order
+from taskqueue.models import Task
+
+from .benchmark_checkout import cart_lines, get_customer, new_order
+
+
+class SlowEmailBackend(EmailBackend):
+    """Giữ email trong bộ nhớ nhưng chờ như khi gửi qua SMTP"""
+
+    latency = 0.2
+
+    def send_messages(self, messages):
+        time.sleep(self.latency)
+        return super().send_messages(messages)
+
+
+class Command(BaseCommand):
+    help = (
+        "So sánh thời gian đặt món (tính cả lúc commit) khi email xác nhận "
+        "gửi ngay trong request với khi chỉ ghi tác vụ vào hàng đợi; đơn "
+        "và tác vụ tạo ra được xóa sau khi đo"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lines", type=int, default=5, help="Số món trong giỏ"
+        )
+        parser.add_argument(
+            "--mail-latency",
+            type=float,
+            default=200,
+            help="Thời gian giả lập gửi một email (ms)",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=10, help="Số lần đo mỗi chế độ"
+        )
+
+    def handle(self, *args, **options):
+        customer = get_customer()
+        lines = cart_lines(options["lines"])
+        SlowEmailBackend.latency = options["mail_latency"] / 1000
+        backend = f"{__name__}.SlowEmailBackend"
+
+        self.stdout.write(
+            f"Giỏ {options['lines']} món, email {options['mail_latency']:.0f}"
+            f" ms, {options['repeat']} lần đo, trung vị ms"
+        )
+        for label, eager in (("gửi ngay", True), ("hàng đợi", False)):
+            with override_settings(TASKS_EAGER=eager, EMAIL_BACKEND=backend):
+                elapsed = self.measure(customer, lines, options["repeat"])
+            self.stdout.write(f"{label:<12}{elapsed * 1000:>10.1f}")
+
+    def measure(self, customer, lines, repeat):
+        last_task = Task.objects.order_by("-pk").values_list("pk").first()
+        timings = []
+        order_ids = []
+        try:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                # on_commit chạy khi thoát atomic nên được tính vào thời gian
+                with transaction.atomic():
+                    order, _ = place_order(new_order(customer), lines)
+                timings.append(time.perf_counter() - started)
+                order_ids.append(order.pk)
+        finally:
+            Order.objects.filter(pk__in=order_ids).delete()
+            Task.objects.filter(
+                pk__gt=last_task[0] if last_task else 0
+            ).delete()
+        return statistics.median(timings)
@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from orders.rollups import check_consistency, default_range
+
+
+class Command(BaseCommand):
+    help = "Kiểm tra bảng doanh số theo ngày khớp với dữ liệu đơn hàng"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="Ngày bắt đầu (YYYY-MM-DD), mặc định ngày có đơn đầu tiên",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Ngày kết thúc (YYYY-MM-DD), mặc định hôm nay",
+        )
+
+    def handle(self, *args, **options):
+        first, today = default_range()
+        start = options["start"] or first
+        end = options["end"] or today
+
+        problems = check_consistency(start, end)
+        for problem in problems:
+            self.stderr.write(problem)
+        if problems:
+            raise CommandError(
+                f"{len(problems)} sai lệch, chạy rebuild_sales_rollups "
+                f"để dựng lại"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Doanh số từ {start} đến {end} khớp")
+        )
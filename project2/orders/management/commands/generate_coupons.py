@@ -0,0 +1,174 @@
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import User
+from orders.coupons import (
+    CODE_LENGTH,
+    coupon_template,
+    generate_coupons,
+    iter_coupons_csv,
+)
+from orders.models import Coupon
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Tạo hàng loạt mã giảm giá ngẫu nhiên cho một chiến dịch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaign", required=True, help="Tên chiến dịch")
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=0,
+            help="Số mã cần tạo (không dùng khi gán cho khách hàng)",
+        )
+        parser.add_argument(
+            "--template",
+            help="Sao loại giảm giá, giá trị và thời hạn từ mã có sẵn",
+        )
+        parser.add_argument(
+            "--type",
+            choices=("percentage", "fixed"),
+            default="percentage",
+            dest="discount_type",
+        )
+        parser.add_argument(
+            "--value", type=Decimal, help="Giá trị giảm (% hoặc số tiền)"
+        )
+        parser.add_argument("--min-order", type=Decimal, default=Decimal(0))
+        parser.add_argument("--max-discount", type=Decimal)
+        parser.add_argument(
+            "--days", type=int, default=30, help="Số ngày có hiệu lực"
+        )
+        parser.add_argument(
+            "--usage-limit",
+            type=int,
+            default=1,
+            help="Số lượt dùng mỗi mã",
+        )
+        parser.add_argument("--prefix", default="", help="Tiền tố của mã")
+        parser.add_argument("--length", type=int, default=CODE_LENGTH)
+        parser.add_argument(
+            "--users-file",
+            help="File chứa username hoặc email, mỗi dòng một khách",
+        )
+        parser.add_argument(
+            "--customers",
+            action="store_true",
+            help="Tạo một mã riêng cho mỗi khách hàng đang hoạt động",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--output", help="Ghi các mã vừa tạo ra file CSV ('-' là stdout)"
+        )
+
+    def handle(self, *args, **options):
+        if len(options["prefix"]) + options["length"] > 50:
+            raise CommandError("Tiền tố và độ dài mã vượt quá 50 ký tự")
+
+        template = self.get_template(options)
+        user_ids = self.get_user_ids(options)
+        if user_ids is None and options["count"] < 1:
+            raise CommandError("Cần --count, --users-file hoặc --customers")
+
+        started = time.perf_counter()
+        try:
+            codes = generate_coupons(
+                template,
+                options["count"],
+                user_ids,
+                options["campaign"],
+                options["prefix"],
+                options["length"],
+                options["batch_size"],
+            )
+        except IntegrityError as exc:
+            raise CommandError(f"Không tạo được mã: {exc}")
+        elapsed = time.perf_counter() - started
+
+        if options["output"]:
+            self.export(codes, options["output"])
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Đã tạo {len(codes)} mã cho chiến dịch "
+                f"{options['campaign']} trong {elapsed:.1f}s"
+            )
+        )
+
+    def get_template(self, options):
+        overrides = {"usage_limit": options["usage_limit"]}
+        if options["template"]:
+            coupon = Coupon.objects.filter(code=options["template"]).first()
+            if coupon is None:
+                raise CommandError(f"Không có mã {options['template']}")
+            return coupon_template(coupon, **overrides)
+
+        if options["value"] is None:
+            raise CommandError("Cần --value hoặc --template")
+        now = timezone.now()
+        return {
+            "discount_type": options["discount_type"],
+            "discount_value": options["value"],
+            "min_order_amount": options["min_order"],
+            "max_discount_amount": options["max_discount"],
+            "valid_from": now,
+            "valid_to": now + timedelta(days=options["days"]),
+            **overrides,
+        }
+
+    def get_user_ids(self, options):
+        if options["customers"]:
+            return list(
+                User.objects.filter(
+                    role="customer", is_active=True
+                ).values_list("id", flat=True)
+            )
+        if not options["users_file"]:
+            return None
+
+        with open(options["users_file"], encoding="utf-8") as stream:
+            names = {line.strip() for line in stream if line.strip()}
+        user_ids = []
+        found = set()
+        names_list = sorted(names)
+        for start in range(0, len(names_list), CHUNK_SIZE):
+            chunk = names_list[start : start + CHUNK_SIZE]
+            for pk, username, email in User.objects.filter(
+                Q(username__in=chunk) | Q(email__in=chunk)
+            ).values_list("id", "username", "email"):
+                user_ids.append(pk)
+                found.update((username, email))
+        missing = names - found
+        if missing:
+            self.stderr.write(
+                f"Bỏ qua {len(missing)} khách không tìm thấy: "
+                + ", ".join(sorted(missing)[:10])
+            )
+        return sorted(set(user_ids))
+
+    def export(self, codes, path):
+        stream = (
+            sys.stdout
+            if path == "-"
+            else open(path, "w", encoding="utf-8", newline="")
+        )
+        try:
+            for start in range(0, len(codes), CHUNK_SIZE):
+                queryset = Coupon.objects.filter(
+                    code__in=codes[start : start + CHUNK_SIZE]
+                )
+                stream.writelines(
+                    iter_coupons_csv(queryset, header=start == 0)
+                )
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from orders.rollups import default_range, rebuild_range
+
+
+class Command(BaseCommand):
+    help = "Dựng lại bảng doanh số theo ngày từ dữ liệu đơn hàng"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="Ngày bắt đầu (YYYY-MM-DD), mặc định ngày có đơn đầu tiên",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Ngày kết thúc (YYYY-MM-DD), mặc định hôm nay",
+        )
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=31,
+            help="Số ngày dựng lại trong mỗi transaction",
+        )
+
+    def handle(self, *args, **options):
+        first, today = default_range()
+        start = options["start"] or first
+        end = options["end"] or today
+
+        days = 0
+        chunk = timedelta(days=options["chunk_days"])
+        while start <= end:
+            chunk_end = min(start + chunk - timedelta(days=1), end)
+            days += rebuild_range(start, chunk_end)
+            start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Đã dựng lại doanh số cho {days} ngày")
+        )
@@ -0,0 +1,165 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    DailySalesRollup = apps.get_model("orders", "DailySalesRollup")
+    DailyItemSales = apps.get_model("orders", "DailyItemSales")
+
+    sales = (
+        Order.objects.filter(status="completed")
+        .annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values("day")
+        .annotate(
+            orders_count=Count("id"),
+            discounted_orders=Count("id", filter=Q(discount__gt=0)),
+            subtotal_sum=Sum("subtotal"),
+            discount_sum=Sum("discount"),
+            delivery_fee_sum=Sum("delivery_fee"),
+            revenue=Sum("total_amount"),
+        )
+    )
+    DailySalesRollup.objects.bulk_create(
+        [
+            DailySalesRollup(
+                date=row["day"],
+                orders_count=row["orders_count"],
+                discounted_orders=row["discounted_orders"],
+                subtotal=row["subtotal_sum"],
+                discount=row["discount_sum"],
+                delivery_fee=row["delivery_fee_sum"],
+                revenue=row["revenue"],
+            )
+            for row in sales
+        ],
+        batch_size=1000,
+    )
+
+    items = (
+        OrderItem.objects.filter(order__status="completed")
+        .annotate(day=TruncDate("order__created_at"))
+        .order_by()
+        .values("day", "menu_item_id")
+        .annotate(
+            total_quantity=Sum("quantity"),
+            total_revenue=Sum(F("price") * F("quantity")),
+        )
+    )
+    DailyItemSales.objects.bulk_create(
+        [
+            DailyItemSales(
+                date=row["day"],
+                menu_item_id=row["menu_item_id"],
+                quantity=row["total_quantity"],
+                revenue=row["total_revenue"],
+            )
+            for row in items
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_order_status_created_index"),
+        ("restaurant", "0004_menu_access_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True, verbose_name="Ngày")),
+                ("orders_count", models.PositiveIntegerField(default=0)),
+                ("discounted_orders", models.PositiveIntegerField(default=0)),
+                (
+                    "subtotal",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14
+                    ),
+                ),
+                (
+                    "discount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14
+                    ),
+                ),
+                (
+                    "delivery_fee",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Doanh số theo ngày",
+                "verbose_name_plural": "Doanh số theo ngày",
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyItemSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Ngày")),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14
+                    ),
+                ),
+                (
+                    "menu_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="restaurant.menuitem",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Doanh số món theo ngày",
+                "verbose_name_plural": "Doanh số món theo ngày",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "menu_item"),
+                        name="unique_daily_item_sales",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
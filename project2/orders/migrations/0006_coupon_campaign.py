@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0005_couponredemption"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="coupon",
+            name="assigned_to",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="assigned_coupons",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Dành riêng cho",
+            ),
+        ),
+        migrations.AddField(
+            model_name="coupon",
+            name="campaign",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=50,
+                verbose_name="Chiến dịch",
+            ),
+        ),
+    ]
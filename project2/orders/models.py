@@ -1,10 +1,18 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from accounts.models import User
+from project2.numbering import generate_number
 from restaurant.models import MenuItem
 
 
+# Các trường quyết định đơn có trong doanh số theo ngày hay không
+SALES_STATE_FIELDS = ("status", "total_amount", "created_at")
+
+
 class Order(models.Model):
     ORDER_TYPE_CHOICES = (
         ("delivery", "Giao hàng"),
@@ -35,6 +43,9 @@ class Order(models.Model):
         ("refunded", "Đã hoàn tiền"),
     )
 
+    DELIVERY_FEE = 30000
+    FREE_DELIVERY_THRESHOLD = 200000
+
     # Order info
     order_number = models.CharField(max_length=20, unique=True, editable=False)
     customer = models.ForeignKey(
@@ -92,18 +103,50 @@ class Order(models.Model):
         verbose_name = "Đơn hàng"
         verbose_name_plural = "Đơn hàng"
         ordering = ["-created_at"]
+        indexes = [
+            # dashboard: đơn theo trạng thái trong một khoảng thời gian
+            models.Index(
+                fields=["status", "created_at"],
+                name="order_status_created_idx",
+            ),
+            # order_list: đơn của khách, mới nhất trước
+            models.Index(
+                fields=["customer", "-created_at"],
+                name="order_customer_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Order #{self.order_number}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Phần doanh số lúc đọc từ DB, để khi lưu biết có cần tính lại
+        # bảng tổng hợp không (không cần SELECT lại trước khi lưu)
+        if all(field in field_names for field in SALES_STATE_FIELDS):
+            instance._loaded_sales_state = instance.sales_state()
+        return instance
+
+    def sales_state(self):
+        """(ngày, tổng tiền) nếu đơn được tính vào doanh số, ngược lại None"""
+        if self.status != "completed":
+            return None
+        return timezone.localdate(self.created_at), self.total_amount
+
     def save(self, *args, **kwargs):
         if not self.order_number:
-            # Generate order number: ORD + timestamp
-            import time
-
-            self.order_number = f"ORD{int(time.time())}"
+            # Generate order number: ORD + thời gian|node|sequence
+            self.order_number = generate_number("ORD")
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def get_delivery_fee(subtotal):
+        """Phí ship: miễn phí cho đơn từ FREE_DELIVERY_THRESHOLD"""
+        if subtotal >= Order.FREE_DELIVERY_THRESHOLD:
+            return 0
+        return Order.DELIVERY_FEE
+
     def get_status_display_class(self):
         """Trả về class Bootstrap cho status badge"""
         status_classes = {
@@ -123,12 +166,7 @@ class Order(models.Model):
             item.get_total_price() for item in self.items.all()
         )
 
-        # Free shipping cho đơn > 200k
-        if self.subtotal >= 200000:
-            self.delivery_fee = 0
-        else:
-            self.delivery_fee = 30000
-
+        self.delivery_fee = self.get_delivery_fee(self.subtotal)
         self.total_amount = self.subtotal + self.delivery_fee - self.discount
         self.save()
 
@@ -192,6 +230,17 @@ class Coupon(models.Model):
     valid_from = models.DateTimeField(verbose_name="Có hiệu lực từ")
     valid_to = models.DateTimeField(verbose_name="Có hiệu lực đến")
     is_active = models.BooleanField(default=True, verbose_name="Kích hoạt")
+    campaign = models.CharField(
+        max_length=50, blank=True, db_index=True, verbose_name="Chiến dịch"
+    )
+    assigned_to = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="assigned_coupons",
+        verbose_name="Dành riêng cho",
+    )
 
     class Meta:
         verbose_name = "Mã giảm giá"
@@ -233,3 +282,139 @@ class Coupon(models.Model):
             discount = self.discount_value
 
         return discount
+
+
+class CouponRedemption(models.Model):
+    """Một lượt dùng mã giảm giá, gắn với đúng một đơn hàng"""
+
+    coupon = models.ForeignKey(
+        Coupon, on_delete=models.CASCADE, related_name="redemptions"
+    )
+    order = models.OneToOneField(
+        Order, on_delete=models.CASCADE, related_name="coupon_redemption"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="coupon_redemptions",
+    )
+    discount = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Số tiền giảm"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Lượt dùng mã giảm giá"
+        verbose_name_plural = "Lượt dùng mã giảm giá"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.coupon_id} - {self.order_id}"
+
+
+class DailySalesRollup(models.Model):
+    """Tổng hợp doanh số theo ngày của các đơn đã hoàn thành
+
+    Ngày tính theo created_at của đơn (giờ địa phương). Bảng được tính lại
+    từng ngày từ dữ liệu gốc (xem orders.rollups) nên có thể xóa và dựng
+    lại bất cứ lúc nào.
+    """
+
+    date = models.DateField(unique=True, verbose_name="Ngày")
+    orders_count = models.PositiveIntegerField(default=0)
+    discounted_orders = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    delivery_fee = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0
+    )
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Doanh số theo ngày"
+        verbose_name_plural = "Doanh số theo ngày"
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.date}: {self.revenue}"
+
+
+class DailyItemSales(models.Model):
+    """Số lượng và doanh thu từng món theo ngày (đơn đã hoàn thành)"""
+
+    date = models.DateField(verbose_name="Ngày")
+    menu_item = models.ForeignKey(
+        MenuItem, on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Doanh số món theo ngày"
+        verbose_name_plural = "Doanh số món theo ngày"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "menu_item"], name="unique_daily_item_sales"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date}: {self.menu_item_id} x{self.quantity}"
+
+
+@receiver(post_save, sender=Order)
+def broadcast_order_status(sender, instance, created, update_fields, **kwargs):
+    """Báo cho màn hình bếp khi có đơn mới hoặc đơn đổi trạng thái"""
+    if not created and update_fields and "status" not in update_fields:
+        return
+    from .events import publish_order
+
+    # Đợi commit để món trong đơn (bulk_create sau save) đã có trong DB
+    transaction.on_commit(lambda: publish_order(instance.pk))
+
+
+def schedule_sales_rollup(days):
+    """Đưa việc tính lại doanh số của các ngày vào hàng đợi"""
+    from .tasks import refresh_sales_days
+
+    refresh_sales_days.delay(sorted({day.isoformat() for day in days}))
+
+
+@receiver(post_save, sender=Order)
+def refresh_sales_rollup(sender, instance, created, **kwargs):
+    """Tính lại doanh số khi đơn vào/rời trạng thái hoàn thành, hoặc đơn
+    hoàn thành đổi tổng tiền hay ngày"""
+    current = instance.sales_state()
+    if created:
+        previous = None
+    else:
+        # Đơn không được đọc từ DB (hoặc thiếu trường): không biết trạng
+        # thái cũ nên tính lại ngày của đơn cho chắc
+        previous = getattr(
+            instance,
+            "_loaded_sales_state",
+            (timezone.localdate(instance.created_at), None),
+        )
+    if previous != current:
+        schedule_sales_rollup(
+            state[0] for state in (previous, current) if state is not None
+        )
+    instance._loaded_sales_state = current
+
+
+@receiver(post_delete, sender=Order)
+def remove_from_sales_rollup(sender, instance, **kwargs):
+    state = getattr(instance, "_loaded_sales_state", instance.sales_state())
+    if state is not None:
+        schedule_sales_rollup([state[0]])
+
+
+# Signal để mã vừa sửa/xóa được đọc lại từ DB ở lần tra cứu sau
+@receiver([post_save, post_delete], sender=Coupon)
+def forget_cached_coupon(sender, instance, **kwargs):
+    from .coupons import forget_coupon
+
+    forget_coupon(instance.code)
@@ -0,0 +1,181 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyItemSales, DailySalesRollup, Order, OrderItem
+
+SALES_FIELDS = (
+    "orders_count",
+    "discounted_orders",
+    "subtotal",
+    "discount",
+    "delivery_fee",
+    "revenue",
+)
+
+
+def created_between(start, end, prefix=""):
+    """Điều kiện created_at trong [start, end] theo giờ địa phương
+
+    So sánh trực tiếp với mốc thời gian thay vì __date để dùng được index.
+    """
+    lower = timezone.make_aware(datetime.combine(start, time.min))
+    upper = timezone.make_aware(
+        datetime.combine(end + timedelta(days=1), time.min)
+    )
+    return Q(
+        **{f"{prefix}created_at__gte": lower, f"{prefix}created_at__lt": upper}
+    )
+
+
+def raw_daily_sales(start, end):
+    """Doanh số từng ngày tính trực tiếp từ Order: {date: {field: value}}"""
+    rows = (
+        Order.objects.filter(created_between(start, end), status="completed")
+        .annotate(day=TruncDate("created_at"))
+        .values("day")
+        .annotate(
+            orders_count=Count("id"),
+            discounted_orders=Count("id", filter=Q(discount__gt=0)),
+            subtotal_sum=Sum("subtotal"),
+            discount_sum=Sum("discount"),
+            delivery_fee_sum=Sum("delivery_fee"),
+            revenue=Sum("total_amount"),
+        )
+    )
+    return {
+        row["day"]: {
+            "orders_count": row["orders_count"],
+            "discounted_orders": row["discounted_orders"],
+            "subtotal": row["subtotal_sum"],
+            "discount": row["discount_sum"],
+            "delivery_fee": row["delivery_fee_sum"],
+            "revenue": row["revenue"],
+        }
+        for row in rows
+    }
+
+
+def raw_daily_item_sales(start, end):
+    """Doanh số từng món theo ngày: {(date, menu_item_id): (sl, tiền)}"""
+    rows = (
+        OrderItem.objects.filter(
+            created_between(start, end, prefix="order__"),
+            order__status="completed",
+        )
+        .annotate(day=TruncDate("order__created_at"))
+        .values("day", "menu_item_id")
+        .annotate(
+            total_quantity=Sum("quantity"),
+            total_revenue=Sum(F("price") * F("quantity")),
+        )
+    )
+    return {
+        (row["day"], row["menu_item_id"]): (
+            row["total_quantity"],
+            row["total_revenue"],
+        )
+        for row in rows
+    }
+
+
+@transaction.atomic
+def rebuild_range(start, end):
+    """Dựng lại bảng tổng hợp cho các ngày trong [start, end]
+
+    Idempotent: dữ liệu cũ trong khoảng bị xóa và ghi lại từ Order, các
+    dòng bị request khác ghi chen vào sẽ được cập nhật thay vì báo lỗi.
+    Trả về số ngày có doanh số.
+    """
+    sales = raw_daily_sales(start, end)
+    items = raw_daily_item_sales(start, end)
+
+    DailySalesRollup.objects.filter(date__gte=start, date__lte=end).delete()
+    DailyItemSales.objects.filter(date__gte=start, date__lte=end).delete()
+
+    DailySalesRollup.objects.bulk_create(
+        [
+            DailySalesRollup(date=day, **values)
+            for day, values in sales.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["date"],
+        update_fields=SALES_FIELDS,
+    )
+    DailyItemSales.objects.bulk_create(
+        [
+            DailyItemSales(
+                date=day,
+                menu_item_id=menu_item_id,
+                quantity=quantity,
+                revenue=revenue,
+            )
+            for (day, menu_item_id), (quantity, revenue) in items.items()
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["date", "menu_item"],
+        update_fields=["quantity", "revenue"],
+    )
+    return len(sales)
+
+
+def rebuild_days(days):
+    """Dựng lại từng ngày (dùng khi có đơn hoàn thành hoặc bị hủy)"""
+    for day in sorted(set(days)):
+        rebuild_range(day, day)
+
+
+def check_consistency(start, end):
+    """So sánh bảng tổng hợp với dữ liệu gốc, trả về danh sách sai lệch"""
+    zero = {field: 0 for field in SALES_FIELDS}
+    expected = raw_daily_sales(start, end)
+    actual = {
+        row["date"]: row
+        for row in DailySalesRollup.objects.filter(
+            date__gte=start, date__lte=end
+        ).values("date", *SALES_FIELDS)
+    }
+
+    problems = []
+    for day in sorted(set(expected) | set(actual)):
+        want = expected.get(day, zero)
+        have = actual.get(day, zero)
+        for field in SALES_FIELDS:
+            if Decimal(want[field] or 0) != Decimal(have[field] or 0):
+                problems.append(
+                    f"{day} {field}: tổng hợp {have[field]}, "
+                    f"thực tế {want[field]}"
+                )
+
+    expected_items = raw_daily_item_sales(start, end)
+    actual_items = {
+        (row["date"], row["menu_item_id"]): (row["quantity"], row["revenue"])
+        for row in DailyItemSales.objects.filter(
+            date__gte=start, date__lte=end
+        ).values("date", "menu_item_id", "quantity", "revenue")
+    }
+    for key in sorted(set(expected_items) | set(actual_items)):
+        want = expected_items.get(key, (0, 0))
+        have = actual_items.get(key, (0, 0))
+        if (want[0], Decimal(want[1])) != (have[0], Decimal(have[1])):
+            day, menu_item_id = key
+            problems.append(
+                f"{day} món #{menu_item_id}: tổng hợp {have}, thực tế {want}"
+            )
+    return problems
+
+
+def default_range():
+    """Từ ngày có đơn đầu tiên đến hôm nay"""
+    today = timezone.localdate()
+    first = Order.objects.order_by("created_at").values_list(
+        "created_at", flat=True
+    )[:1]
+    if not first:
+        return today, today
+    return timezone.localdate(first[0]), today
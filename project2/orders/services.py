@@ -0,0 +1,60 @@
+from django.contrib import messages
+from django.db import transaction
+from .coupons import CouponError, record_redemption, redeem_coupon
+from .models import Order, OrderItem
+from .tasks import send_order_confirmation
+
+
+class EmptyCartError(Exception):
+    """Giỏ hàng không còn món nào để đặt"""
+
+
+def _apply_coupon(order, coupon_code, notices):
+    """Giữ lượt dùng mã giảm giá; trả về coupon nếu áp dụng được"""
+    try:
+        coupon = redeem_coupon(coupon_code, order)
+    except CouponError as exc:
+        notices.append((messages.WARNING, str(exc)))
+        return None
+    notices.append((messages.SUCCESS, "Áp dụng mã giảm giá thành công!"))
+    return coupon
+
+
+@transaction.atomic
+def place_order(order, cart, coupon_code=""):
+    """Tạo đơn hàng từ giỏ hàng trong một transaction
+
+    Trả về (order, notices) với notices là danh sách (level, message)
+    để view hiển thị. Nếu có lỗi giữa chừng, không có gì được ghi lại.
+    """
+    lines = list(cart)
+    if not lines:
+        raise EmptyCartError
+
+    notices = []
+    order.subtotal = sum(line["total_price"] for line in lines)
+
+    coupon = None
+    if coupon_code:
+        coupon = _apply_coupon(order, coupon_code, notices)
+
+    order.delivery_fee = Order.get_delivery_fee(order.subtotal)
+    order.total_amount = order.subtotal + order.delivery_fee - order.discount
+    order.save()
+    if coupon is not None:
+        record_redemption(coupon, order)
+
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(
+                order=order,
+                menu_item=line["menu_item"],
+                quantity=line["quantity"],
+                price=line["price"],
+            )
+            for line in lines
+        ]
+    )
+    # Email gửi nền, chỉ khi đơn đã được commit
+    send_order_confirmation.delay(order.pk)
+    return order, notices
@@ -0,0 +1,76 @@
+from datetime import date
+
+from django.core.mail import send_mail
+
+from taskqueue.queue import task
+
+
+@task
+def refresh_sales_days(days):
+    """Dựng lại doanh số của các ngày (chuỗi YYYY-MM-DD)"""
+    from .rollups import rebuild_days
+
+    rebuild_days(date.fromisoformat(day) for day in days)
+
+
+@task
+def send_order_confirmation(order_id):
+    """Gửi email xác nhận đơn hàng cho khách"""
+    from .models import Order
+
+    order = (
+        Order.objects.select_related("customer")
+        .prefetch_related("items__menu_item")
+        .filter(pk=order_id)
+        .first()
+    )
+    if order is None or not order.customer.email:
+        return
+
+    lines = [
+        f"- {item.menu_item.name} x{item.quantity}: "
+        f"{item.get_total_price():,.0f}đ"
+        for item in order.items.all()
+    ]
+    send_mail(
+        f"Xác nhận đơn hàng {order.order_number}",
+        "\n".join(
+            [
+                f"Chào {order.delivery_name},",
+                "",
+                f"Nhà hàng đã nhận đơn hàng {order.order_number}:",
+                *lines,
+                "",
+                f"Tổng cộng: {order.total_amount:,.0f}đ",
+            ]
+        ),
+        None,
+        [order.customer.email],
+    )
+
+
+@task(max_attempts=1)
+def generate_coupon_batch(
+    template_id, count, campaign, prefix="", usage_limit=1, for_customers=False
+):
+    """Tạo loạt mã theo mã mẫu; không chạy lại để tránh tạo trùng lô"""
+    from accounts.models import User
+
+    from .coupons import coupon_template, generate_coupons
+    from .models import Coupon
+
+    coupon = Coupon.objects.filter(pk=template_id).first()
+    if coupon is None:
+        return
+    user_ids = None
+    if for_customers:
+        user_ids = User.objects.filter(
+            role="customer", is_active=True
+        ).values_list("id", flat=True)
+    generate_coupons(
+        coupon_template(coupon, usage_limit=usage_limit),
+        count,
+        user_ids,
+        campaign,
+        prefix,
+    )
@@ -1,3 +1,856 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from contextlib import redirect_stdout
+from io import StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.db import transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from project2.checks import check_number_node_id, check_number_node_id_set
+from project2.numbering import PROCESS_BITS, NumberGenerator, generate_number
+from project2.testing import (
+    query_budget,
+    query_plan,
+    run_in_processes,
+    with_templates,
+)
+from restaurant.cart import current_prices, forget_prices
+from restaurant.models import Category, MenuItem
+from .coupons import (
+    CouponError,
+    coupon_template,
+    generate_coupons,
+    get_coupon,
+    redeem_coupon,
+)
+from .events import OrderEventBus, order_event_bus
+from taskqueue.models import Task
+from .models import Coupon, DailyItemSales, DailySalesRollup, Order, OrderItem
+from .rollups import check_consistency, rebuild_range
+from .services import EmptyCartError, place_order
+from .views import _kitchen_events
+
+
+def redeem_many(code, customer_id, attempts):
+    """Chạy trong process con của ConcurrentCouponTests"""
+    redeemed = 0
+    for _ in range(attempts):
+        order = Order(customer_id=customer_id, subtotal=Decimal(100000))
+        try:
+            with transaction.atomic():
+                redeem_coupon(code, order)
+        except CouponError:
+            continue
+        redeemed += 1
+    return redeemed
+
+
+def generate_numbers(count):
+    """Chạy trong process con của NumberingTests"""
+    return [generate_number("ORD") for _ in range(count)]
+
+
+class NumberingTests(SimpleTestCase):
+    def test_no_collisions_across_processes(self):
+        results = run_in_processes(
+            "orders.tests.generate_numbers", [(5000,)] * 8
+        )
+        numbers = [number for result in results for number in result]
+        self.assertEqual(len(set(numbers)), len(numbers))
+
+    def test_generators_never_share_node(self):
+        # Hai generator cùng PID vẫn phải giữ hai ô process khác nhau
+        first, second = NumberGenerator(), NumberGenerator()
+        first.next_id()
+        second.next_id()
+        self.assertNotEqual(first._node, second._node)
+
+    @override_settings(NUMBER_NODE_ID=3)
+    def test_node_contains_host_id(self):
+        generator = NumberGenerator()
+        generator.next_id()
+        self.assertEqual(generator._node >> PROCESS_BITS, 3)
+
+    def test_missing_node_id_is_reported_in_production(self):
+        with override_settings(DEBUG=False, NUMBER_NODE_ID=None):
+            self.assertEqual(
+                [w.id for w in check_number_node_id_set(None)],
+                ["project2.W002"],
+            )
+        with override_settings(DEBUG=False, NUMBER_NODE_ID=300):
+            self.assertEqual(
+                [e.id for e in check_number_node_id(None)], ["project2.E001"]
+            )
+        with override_settings(DEBUG=False, NUMBER_NODE_ID=1):
+            self.assertEqual(check_number_node_id(None), [])
+            self.assertEqual(check_number_node_id_set(None), [])
+
+
+ORDER_TEMPLATES = with_templates(
+    {
+        "orders/order_list.html": (
+            "{% for order in orders %}{{ order.order_number }}"
+            "{% for item in order.items.all %}{{ item.menu_item.name }}"
+            "{% endfor %}{% endfor %}"
+        ),
+        "orders/order_detail.html": (
+            "{% for item in order.items.all %}{{ item.menu_item.name }}"
+            "{% endfor %}"
+        ),
+    }
+)
+
+
+@override_settings(TEMPLATES=ORDER_TEMPLATES)
+class OrderQueryTests(TestCase):
+    """Số truy vấn không tăng theo số đơn và số món trong đơn"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        cls.admin = User.objects.create_superuser("quanly", password="x")
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        items = [
+            MenuItem.objects.create(
+                category=category,
+                name=f"Món {index}",
+                slug=f"mon-{index}",
+                description="Món ngon",
+                price=50000,
+            )
+            for index in range(6)
+        ]
+        for _ in range(5):
+            order = Order.objects.create(
+                customer=cls.customer,
+                delivery_name="Khách",
+                delivery_phone="0900000000",
+                delivery_address="1 Lê Lợi",
+            )
+            for item in items:
+                OrderItem.objects.create(
+                    order=order, menu_item=item, quantity=1, price=item.price
+                )
+        cls.order = order
+
+    def get(self, url, max_queries):
+        with query_budget(max_queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_customer_pages(self):
+        self.client.force_login(self.customer)
+        self.get(reverse("orders:order_list"), 3)
+        self.get(
+            reverse("orders:order_detail", args=[self.order.order_number]), 3
+        )
+
+    def test_order_list_uses_customer_index(self):
+        plan = query_plan(Order.objects.filter(customer=self.customer))
+        self.assertIn("USING INDEX order_customer_created_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_admin_pages(self):
+        self.client.force_login(self.admin)
+        self.get(reverse("admin:orders_order_changelist"), 4)
+        self.get(reverse("admin:orders_order_change", args=[self.order.pk]), 5)
+
+
+def create_coupon(code, **fields):
+    now = timezone.now()
+    fields.setdefault("discount_value", 10)
+    return Coupon.objects.create(
+        code=code,
+        valid_from=now - timedelta(days=1),
+        valid_to=now + timedelta(days=1),
+        **fields,
+    )
+
+
+class PlaceOrderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        cls.lines = [
+            {
+                "menu_item": MenuItem.objects.create(
+                    category=category,
+                    name=name,
+                    slug=slug,
+                    description="Món ngon",
+                    price=price,
+                ),
+                "quantity": 2,
+                "price": Decimal(price),
+                "total_price": Decimal(price) * 2,
+            }
+            for name, slug, price in (
+                ("Phở bò", "pho-bo", 50000),
+                ("Bún chả", "bun-cha", 40000),
+            )
+        ]
+
+    def new_order(self):
+        return Order(
+            customer=self.customer,
+            delivery_name="Khách",
+            delivery_phone="0900000000",
+            delivery_address="1 Lê Lợi",
+        )
+
+    def test_creates_order_with_items_and_totals(self):
+        order, notices = place_order(self.new_order(), self.lines)
+        self.assertEqual(notices, [])
+        self.assertEqual(order.subtotal, 180000)
+        self.assertEqual(order.delivery_fee, Order.DELIVERY_FEE)
+        self.assertEqual(order.total_amount, 180000 + Order.DELIVERY_FEE)
+        self.assertEqual(
+            sorted(order.items.values_list("menu_item__slug", "quantity")),
+            [("bun-cha", 2), ("pho-bo", 2)],
+        )
+
+    def test_empty_cart_is_rejected(self):
+        with self.assertRaises(EmptyCartError):
+            place_order(self.new_order(), [])
+        self.assertFalse(Order.objects.exists())
+
+    def test_failure_rolls_back_everything(self):
+        coupon = create_coupon("GIAM10")
+        with mock.patch.object(
+            OrderItem.objects, "bulk_create", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                place_order(self.new_order(), self.lines, "GIAM10")
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 0)
+
+
+class CheckoutRepriceTests(TestCase):
+    """Giỏ được đối chiếu với giá hiện tại trước khi đặt hàng"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        cls.pho = MenuItem.objects.create(
+            category=category,
+            name="Phở bò",
+            slug="pho-bo",
+            description="Món ngon",
+            price=50000,
+        )
+        cls.bun = MenuItem.objects.create(
+            category=category,
+            name="Bún chả",
+            slug="bun-cha",
+            description="Món ngon",
+            price=40000,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.customer)
+        for item in (self.pho, self.bun):
+            self.client.post(
+                reverse("restaurant:cart_add", args=[item.pk]),
+                {"quantity": 2},
+            )
+
+    def checkout(self):
+        return self.client.post(
+            reverse("orders:checkout"),
+            {
+                "order_type": "delivery",
+                "delivery_name": "Khách",
+                "delivery_phone": "0900000000",
+                "delivery_address": "1 Lê Lợi",
+                "payment_method": "cod",
+            },
+        )
+
+    def messages(self, response):
+        # Bỏ các thông báo "Đã thêm ... vào giỏ hàng" từ setUp
+        return [
+            str(message)
+            for message in response.context["messages"]
+            if not str(message).startswith("Đã thêm")
+        ]
+
+    def placed_lines(self):
+        order = Order.objects.get()
+        return order.subtotal, sorted(
+            order.items.values_list("menu_item__slug", "quantity", "price")
+        )
+
+    def test_unchanged_prices_place_order(self):
+        response = self.checkout()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            self.placed_lines(),
+            (180000, [("bun-cha", 2, 40000), ("pho-bo", 2, 50000)]),
+        )
+
+    def test_changed_price_needs_confirmation(self):
+        self.pho.price = 60000
+        self.pho.save()
+
+        response = self.checkout()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(
+            self.messages(response),
+            [
+                "Giá Phở bò đã đổi từ 50,000đ thành 60,000đ",
+                "Giỏ hàng vừa thay đổi, vui lòng kiểm tra lại",
+            ],
+        )
+
+        response = self.checkout()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            self.placed_lines(),
+            (200000, [("bun-cha", 2, 40000), ("pho-bo", 2, 60000)]),
+        )
+
+    def test_unavailable_item_is_removed(self):
+        self.pho.is_available = False
+        self.pho.save()
+
+        response = self.checkout()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Order.objects.exists())
+        self.assertIn(
+            "Phở bò đã hết, đã bỏ khỏi giỏ hàng", self.messages(response)
+        )
+        self.assertEqual(
+            [item["menu_item"] for item in response.context["cart"]],
+            [self.bun],
+        )
+
+        self.checkout()
+        self.assertEqual(self.placed_lines(), (80000, [("bun-cha", 2, 40000)]))
+
+    def test_prices_are_cached_until_forgotten(self):
+        ids = [self.pho.pk, self.bun.pk]
+        self.assertEqual(current_prices(ids)[self.pho.pk][0], 5000000)
+        with self.assertNumQueries(0):
+            current_prices(ids)
+
+        # update() không gửi signal nên giá trong cache vẫn là giá cũ
+        MenuItem.objects.filter(pk=self.pho.pk).update(price=70000)
+        self.assertEqual(current_prices(ids)[self.pho.pk][0], 5000000)
+        forget_prices([self.pho.pk])
+        with self.assertNumQueries(1):
+            self.assertEqual(current_prices(ids)[self.pho.pk][0], 7000000)
+
+
+class CouponTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+
+    def setUp(self):
+        cache.clear()
+
+    def new_order(self):
+        return Order(customer=self.customer, subtotal=Decimal(100000))
+
+    def test_redemption_stops_at_usage_limit(self):
+        coupon = create_coupon("GIAM10", usage_limit=2)
+        for _ in range(2):
+            order = self.new_order()
+            redeem_coupon("GIAM10", order)
+            self.assertEqual(order.discount, 10000)
+        with self.assertRaisesMessage(CouponError, "hết lượt"):
+            redeem_coupon("GIAM10", self.new_order())
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 2)
+
+    def test_stale_cached_coupon_cannot_exceed_limit(self):
+        coupon = create_coupon("GIAM10", usage_limit=1)
+        get_coupon("GIAM10")
+        # Cập nhật không qua save() nên bản cache vẫn thấy used_count = 0
+        Coupon.objects.filter(pk=coupon.pk).update(used_count=1)
+        with self.assertRaises(CouponError):
+            redeem_coupon("GIAM10", self.new_order())
+        self.assertEqual(get_coupon("GIAM10").used_count, 1)
+
+    def test_saving_coupon_invalidates_cached_lookup(self):
+        coupon = create_coupon("GIAM10")
+        self.assertEqual(get_coupon("GIAM10").discount_value, 10)
+        with self.assertNumQueries(0):
+            get_coupon("GIAM10")
+
+        coupon.discount_value = 20
+        coupon.save()
+        self.assertEqual(get_coupon("GIAM10").discount_value, 20)
+
+        coupon.delete()
+        self.assertIsNone(get_coupon("GIAM10"))
+
+
+class CouponCampaignTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            "quanly", password="x", role="admin"
+        )
+        cls.customers = [
+            User.objects.create_user(f"khach{index}", password="x")
+            for index in range(3)
+        ]
+        cls.template = create_coupon("MAU", discount_value=15)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_batch_codes_are_unique(self):
+        # Tiền tố + 2 ký tự chỉ có 961 mã: lô nào cũng gặp mã trùng
+        create_coupon("T22")
+        codes = generate_coupons(
+            coupon_template(self.template),
+            count=900,
+            campaign="tet",
+            prefix="T",
+            length=2,
+            batch_size=100,
+        )
+        self.assertEqual(len(set(codes)), 900)
+        self.assertNotIn("T22", codes)
+        self.assertEqual(Coupon.objects.filter(campaign="tet").count(), 900)
+
+    def test_codes_assigned_to_customers(self):
+        user_ids = [user.pk for user in self.customers]
+        generate_coupons(
+            coupon_template(self.template), user_ids=user_ids, campaign="vip"
+        )
+        self.assertEqual(
+            sorted(
+                Coupon.objects.filter(campaign="vip").values_list(
+                    "assigned_to", flat=True
+                )
+            ),
+            user_ids,
+        )
+
+    def test_assigned_coupon_rejects_other_customers(self):
+        owner, other = self.customers[:2]
+        create_coupon("RIENG", assigned_to=owner)
+        with self.assertRaisesMessage(CouponError, "không dành cho"):
+            redeem_coupon("RIENG", Order(customer=other, subtotal=100000))
+        order = Order(customer=owner, subtotal=100000)
+        redeem_coupon("RIENG", order)
+        self.assertEqual(order.discount, 10000)
+
+    def test_generate_coupons_command(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            call_command(
+                "generate_coupons",
+                "--campaign=he",
+                "--count=50",
+                "--value=20",
+                "--output=-",
+                stderr=StringIO(),
+            )
+        rows = output.getvalue().splitlines()
+        self.assertEqual(len(rows), 51)
+        self.assertTrue(rows[0].startswith("code,campaign"))
+        self.assertEqual(Coupon.objects.filter(campaign="he").count(), 50)
+
+        call_command(
+            "generate_coupons",
+            "--campaign=khach",
+            "--template=MAU",
+            "--customers",
+            stderr=StringIO(),
+        )
+        coupons = Coupon.objects.filter(campaign="khach")
+        self.assertEqual(coupons.count(), len(self.customers))
+        self.assertEqual(
+            set(coupons.values_list("discount_value", flat=True)), {15}
+        )
+
+    def run_action(self, action, coupons, follow=False, **data):
+        self.client.force_login(self.admin)
+        return self.client.post(
+            reverse("admin:orders_coupon_changelist"),
+            {
+                "action": action,
+                "_selected_action": [coupon.pk for coupon in coupons],
+                **data,
+            },
+            follow=follow,
+        )
+
+    @override_settings(TASKS_EAGER=True)
+    def test_generate_batch_action(self):
+        response = self.run_action("generate_batch", [self.template])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("form", response.context)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.run_action(
+                "generate_batch",
+                [self.template],
+                apply="1",
+                campaign="thu",
+                count=20,
+                prefix="THU-",
+                usage_limit=3,
+            )
+        self.assertEqual(response.status_code, 302)
+        coupons = Coupon.objects.filter(campaign="thu")
+        self.assertEqual(coupons.count(), 20)
+        self.assertEqual(
+            set(coupons.values_list("usage_limit", "discount_value")),
+            {(3, 15)},
+        )
+        self.assertTrue(
+            all(
+                code.startswith("THU-")
+                for code in coupons.values_list("code", flat=True)
+            )
+        )
+
+    def test_generate_batch_needs_one_template(self):
+        other = create_coupon("KHAC")
+        response = self.run_action(
+            "generate_batch", [self.template, other], follow=True
+        )
+        self.assertEqual(
+            [str(m) for m in response.context["messages"]],
+            ["Chọn đúng một mã làm mẫu"],
+        )
+        self.assertEqual(Coupon.objects.count(), 2)
+
+    def test_export_csv_action(self):
+        other = create_coupon("KHAC", assigned_to=self.customers[0])
+        response = self.run_action("export_csv", [self.template, other])
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 3)
+        self.assertIn("khach0", rows[2])
+
+
+class ConcurrentCouponTests(TransactionTestCase):
+    def test_usage_limit_holds_under_concurrent_redemptions(self):
+        customer = User.objects.create_user("khach", password="x")
+        coupon = create_coupon("GIAM10", usage_limit=25)
+        results = run_in_processes(
+            "orders.tests.redeem_many", [("GIAM10", customer.pk, 10)] * 8
+        )
+        self.assertEqual(sum(results), 25)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 25)
+
+
+@override_settings(TASKS_EAGER=False)
+class SalesRollupSignalTests(TestCase):
+    """Chỉ xếp việc tính lại doanh số khi phần doanh số của đơn đổi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        cls.order = Order.objects.create(
+            customer=cls.customer, subtotal=100000, total_amount=130000
+        )
+        cls.day = timezone.localdate(cls.order.created_at).isoformat()
+
+    def scheduled(self):
+        return list(
+            Task.objects.filter(name="orders.tasks.refresh_sales_days")
+            .order_by("pk")
+            .values_list("args", flat=True)
+        )
+
+    def save(self, **fields):
+        order = Order.objects.get(pk=self.order.pk)
+        for field, value in fields.items():
+            setattr(order, field, value)
+        order.save()
+        return order
+
+    def test_save_without_sales_change_is_one_query(self):
+        order = Order.objects.get(pk=self.order.pk)
+        order.delivery_name = "Khách mới"
+        with self.assertNumQueries(1):
+            order.save()
+        self.assertEqual(self.scheduled(), [])
+
+    def test_completion_and_cancellation(self):
+        self.save(status="preparing")
+        self.assertEqual(self.scheduled(), [])
+
+        order = self.save(status="completed")
+        self.assertEqual(self.scheduled(), [[[self.day]]])
+
+        # Đơn đã hoàn thành được lưu lại mà doanh số không đổi
+        order.notes = "Giao cổng sau"
+        order.save()
+        self.save(delivery_phone="0911111111")
+        self.assertEqual(len(self.scheduled()), 1)
+
+        self.save(total_amount=150000)
+        self.save(status="cancelled")
+        self.assertEqual(self.scheduled(), [[[self.day]]] * 3)
+
+    def test_completed_order_moved_to_another_day(self):
+        self.save(status="completed")
+        moved = self.order.created_at - timedelta(days=3)
+        self.save(created_at=moved)
+        self.assertEqual(
+            self.scheduled()[-1],
+            [sorted([timezone.localdate(moved).isoformat(), self.day])],
+        )
+
+    def test_deleting_completed_order(self):
+        order = self.save(status="completed")
+        order.delete()
+        self.assertEqual(self.scheduled(), [[[self.day]]] * 2)
+
+        pending = Order.objects.create(customer=self.customer)
+        pending.delete()
+        self.assertEqual(len(self.scheduled()), 2)
+
+
+@override_settings(TASKS_EAGER=True)
+class SalesRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        cls.pho = MenuItem.objects.create(
+            category=category,
+            name="Phở bò",
+            slug="pho-bo",
+            description="Món ngon",
+            price=50000,
+        )
+
+    def create_order(self, quantity, **fields):
+        order = Order.objects.create(
+            customer=self.customer,
+            subtotal=50000 * quantity,
+            total_amount=50000 * quantity + 30000,
+            delivery_fee=30000,
+            **fields,
+        )
+        OrderItem.objects.create(
+            order=order, menu_item=self.pho, quantity=quantity, price=50000
+        )
+        return order
+
+    def complete(self, order):
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = "completed"
+            order.save()
+
+    def today_sales(self):
+        return (
+            DailySalesRollup.objects.filter(date=timezone.localdate())
+            .values_list("orders_count", "revenue")
+            .first()
+        )
+
+    def test_signal_keeps_rollup_in_sync(self):
+        first, second = self.create_order(1), self.create_order(2)
+        self.complete(first)
+        self.complete(second)
+        self.assertEqual(self.today_sales(), (2, 210000))
+        self.assertEqual(
+            DailyItemSales.objects.get(menu_item=self.pho).quantity, 3
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.status = "cancelled"
+            first.save()
+        self.assertEqual(self.today_sales(), (1, 130000))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertIsNone(self.today_sales())
+        self.assertFalse(DailyItemSales.objects.exists())
+
+    def test_rebuild_and_check_consistency(self):
+        today = timezone.localdate()
+        start = date(today.year - 1, 1, 1)
+        Order.objects.filter(
+            pk__in=[self.create_order(2).pk, self.create_order(1).pk]
+        ).update(status="completed")
+        problems = check_consistency(start, today)
+        self.assertEqual(len(problems), 5)
+        self.assertIn("orders_count", problems[0])
+
+        self.assertEqual(rebuild_range(start, today), 1)
+        self.assertEqual(check_consistency(start, today), [])
+        self.assertEqual(self.today_sales(), (2, 210000))
+
+        DailySalesRollup.objects.update(revenue=0)
+        DailyItemSales.objects.update(quantity=1)
+        self.assertEqual(len(check_consistency(start, today)), 2)
+        call_command("rebuild_sales_rollups", stdout=StringIO())
+        call_command("check_sales_rollups", stdout=StringIO())
+
+
+def parse_sse(message):
+    event, data = message.strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data[len("data: ") :])
+
+
+class KitchenStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        cls.order = Order.objects.create(
+            customer=cls.customer,
+            delivery_name="Khách",
+            delivery_phone="0900000000",
+            delivery_address="1 Lê Lợi",
+        )
+
+    def test_stream_requires_staff(self):
+        self.client.force_login(self.customer)
+        response = self.client.get(reverse("orders:kitchen_stream"))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_snapshot_then_published_updates(self):
+        events = _kitchen_events()
+        event, orders = parse_sse(await anext(events))
+        self.assertEqual(event, "snapshot")
+        self.assertEqual(
+            [order["order_number"] for order in orders],
+            [self.order.order_number],
+        )
+
+        # publish() được gọi từ thread đồng bộ (view, admin, signal)
+        publisher = threading.Thread(
+            target=order_event_bus.publish, args=({"order_number": "X"},)
+        )
+        publisher.start()
+        publisher.join()
+        self.assertEqual(
+            parse_sse(await anext(events)), ("order", {"order_number": "X"})
+        )
+
+        await events.aclose()
+        self.assertEqual(order_event_bus.subscriber_count(), 0)
+
+    async def test_slow_subscriber_is_marked_lagged(self):
+        bus = OrderEventBus(maxsize=2)
+        subscription = bus.subscribe()
+        for number in range(3):
+            bus.publish(number)
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.lagged)
+        self.assertEqual(
+            [await subscription.get(), await subscription.get()], [1, 2]
+        )
+
+
+class KitchenStreamASGITests(TransactionTestCase):
+    """Luồng sự kiện chạy qua ASGIHandler thật, nhiều màn hình bếp cùng lúc"""
+
+    subscribers = 20
+
+    def setUp(self):
+        staff = User.objects.create_user("bep", password="x", role="staff")
+        self.client.force_login(staff)
+        self.cookie = (
+            f"{settings.SESSION_COOKIE_NAME}="
+            f"{self.client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        ).encode()
+        self.order = Order.objects.create(
+            customer=User.objects.create_user("khach", password="x"),
+            delivery_name="Khách",
+            delivery_phone="0900000000",
+            delivery_address="1 Lê Lợi",
+        )
+
+    async def connect(self):
+        path = reverse("orders:kitchen_stream")
+        communicator = ApplicationCommunicator(
+            ASGIHandler(),
+            {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "root_path": "",
+                "query_string": b"",
+                "headers": [
+                    (b"host", b"testserver"),
+                    (b"cookie", self.cookie),
+                ],
+                "client": ("127.0.0.1", 50000),
+                "server": ("testserver", 80),
+            },
+        )
+        await communicator.send_input({"type": "http.request", "body": b""})
+        return communicator
+
+    async def next_event(self, communicator):
+        message = await communicator.receive_output(5)
+        self.assertEqual(message["type"], "http.response.body")
+        return parse_sse(message["body"].decode())
+
+    async def test_every_subscriber_receives_order_update(self):
+        communicators = [await self.connect() for _ in range(self.subscribers)]
+        for communicator in communicators:
+            start = await communicator.receive_output(5)
+            self.assertEqual(start["status"], 200)
+            headers = {name.lower(): value for name, value in start["headers"]}
+            self.assertEqual(headers[b"content-type"], b"text/event-stream")
+            self.assertEqual(headers[b"cache-control"], b"no-cache")
+            self.assertEqual(headers[b"x-accel-buffering"], b"no")
+            event, orders = await self.next_event(communicator)
+            self.assertEqual(event, "snapshot")
+            self.assertEqual(len(orders), 1)
+        self.assertEqual(order_event_bus.subscriber_count(), self.subscribers)
+
+        # Lưu đơn (thread đồng bộ) -> signal -> bus -> mọi kết nối
+        self.order.status = "confirmed"
+        await sync_to_async(self.order.save)()
+        for communicator in communicators:
+            event, data = await self.next_event(communicator)
+            self.assertEqual(event, "order")
+            self.assertEqual(
+                (data["order_number"], data["status"]),
+                (self.order.order_number, "confirmed"),
+            )
+
+        for communicator in communicators:
+            await communicator.send_input({"type": "http.disconnect"})
+            await communicator.wait(5)
+        self.assertEqual(order_event_bus.subscriber_count(), 0)
+
+    async def test_anonymous_is_forbidden(self):
+        self.cookie = b""
+        communicator = await self.connect()
+        start = await communicator.receive_output(5)
+        self.assertEqual(start["status"], 403)
+        await communicator.wait(5)
@@ -6,6 +6,8 @@ app_name = "orders"
 urlpatterns = [
     path("checkout/", views.checkout, name="checkout"),
     path("my-orders/", views.order_list, name="order_list"),
+    path("kitchen/", views.kitchen_display, name="kitchen_display"),
+    path("kitchen/stream/", views.kitchen_stream, name="kitchen_stream"),
     path("order/<str:order_number>/", views.order_detail, name="order_detail"),
     path(
         "order/<str:order_number>/cancel/",
@@ -1,18 +1,43 @@
+import asyncio
+
+from django.db.models import Prefetch
+from django.http import HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.utils import timezone
-from restaurant.cart import Cart
-from .models import Order, OrderItem, Coupon
+from restaurant.cart import get_cart
+from .models import Order, OrderItem
 from .forms import CheckoutForm
-from accounts.decorators import customer_required
+from .events import (
+    KITCHEN_STATUSES,
+    format_sse,
+    order_event_bus,
+    serialize_order,
+)
+from .services import EmptyCartError, place_order
+from accounts.decorators import customer_required, staff_required
+
+# Gửi comment định kỳ để proxy không cắt kết nối SSE đang rảnh
+KEEPALIVE_SECONDS = 15
+
+
+def _items_with_menu_item():
+    """Prefetch món trong đơn kèm MenuItem, tránh N+1 khi hiển thị"""
+    return Prefetch(
+        "items", queryset=OrderItem.objects.select_related("menu_item")
+    )
 
 
 @login_required
 @customer_required
 def checkout(request):
     """Trang thanh toán"""
-    cart = Cart(request)
+    cart = get_cart(request)
+
+    # Kiểm tra lại giá và tình trạng món trước khi hiển thị hay đặt hàng
+    changes = cart.reprice()
+    for level, message in changes:
+        messages.add_message(request, level, message)
 
     if len(cart) == 0:
         messages.warning(request, "Giỏ hàng trống!")
@@ -21,58 +46,26 @@ def checkout(request):
     if request.method == "POST":
         form = CheckoutForm(request.POST, user=request.user)
 
-        if form.is_valid():
+        if changes:
+            # Không đặt hàng với giá khách chưa thấy, để khách xác nhận lại
+            messages.warning(
+                request, "Giỏ hàng vừa thay đổi, vui lòng kiểm tra lại"
+            )
+        elif form.is_valid():
             # Tạo order
             order = form.save(commit=False)
             order.customer = request.user
-            order.subtotal = cart.get_total_price()
-
-            # Xử lý mã giảm giá
-            coupon_code = form.cleaned_data.get("coupon_code")
-            if coupon_code:
-                try:
-                    coupon = Coupon.objects.get(code=coupon_code)
-                    is_valid, message = coupon.is_valid()
-
-                    if is_valid:
-                        if order.subtotal >= coupon.min_order_amount:
-                            order.discount = coupon.calculate_discount(
-                                order.subtotal
-                            )
-                            coupon.used_count += 1
-                            coupon.save()
-                            messages.success(
-                                request, f"Áp dụng mã giảm giá thành công!"
-                            )
-                        else:
-                            messages.warning(
-                                request,
-                                f"Đơn hàng tối thiểu {coupon.min_order_amount}đ",
-                            )
-                    else:
-                        messages.warning(request, message)
-                except Coupon.DoesNotExist:
-                    messages.warning(request, "Mã giảm giá không tồn tại")
-
-            # Tính phí ship
-            if order.subtotal >= 200000:
-                order.delivery_fee = 0
-            else:
-                order.delivery_fee = 30000
 
-            order.total_amount = (
-                order.subtotal + order.delivery_fee - order.discount
-            )
-            order.save()
-
-            # Tạo order items từ cart
-            for item in cart:
-                OrderItem.objects.create(
-                    order=order,
-                    menu_item=item["menu_item"],
-                    quantity=item["quantity"],
-                    price=item["price"],
+            try:
+                order, notices = place_order(
+                    order, cart, form.cleaned_data.get("coupon_code")
                 )
+            except EmptyCartError:
+                messages.warning(request, "Giỏ hàng trống!")
+                return redirect("restaurant:menu_list")
+
+            for level, message in notices:
+                messages.add_message(request, level, message)
 
             # Xóa giỏ hàng
             cart.clear()
@@ -99,7 +92,7 @@ def checkout(request):
 def order_list(request):
     """Danh sách đơn hàng của khách"""
     orders = Order.objects.filter(customer=request.user).prefetch_related(
-        "items"
+        _items_with_menu_item()
     )
 
     context = {
@@ -113,7 +106,9 @@ def order_list(request):
 def order_detail(request, order_number):
     """Chi tiết đơn hàng"""
     order = get_object_or_404(
-        Order, order_number=order_number, customer=request.user
+        Order.objects.prefetch_related(_items_with_menu_item()),
+        order_number=order_number,
+        customer=request.user,
     )
 
     context = {
@@ -138,3 +133,68 @@ def cancel_order(request, order_number):
         messages.error(request, "Không thể hủy đơn hàng này")
 
     return redirect("orders:order_detail", order_number=order_number)
+
+
+@staff_required
+def kitchen_display(request):
+    """Màn hình bếp: danh sách đơn cập nhật theo thời gian thực"""
+    columns = [
+        (status, label)
+        for status, label in Order.STATUS_CHOICES
+        if status in KITCHEN_STATUSES
+    ]
+    return render(request, "orders/kitchen_display.html", {"columns": columns})
+
+
+async def _kitchen_snapshot():
+    orders = (
+        Order.objects.filter(status__in=KITCHEN_STATUSES)
+        .prefetch_related(_items_with_menu_item())
+        .order_by("created_at")
+    )
+    return [
+        serialize_order(order, order.items.all()) async for order in orders
+    ]
+
+
+async def _kitchen_events():
+    subscription = order_event_bus.subscribe()
+    try:
+        yield format_sse("snapshot", await _kitchen_snapshot())
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if subscription.lagged:
+                # Client đọc chậm đã bị bỏ sự kiện, gửi lại toàn bộ
+                subscription.drain()
+                yield format_sse("snapshot", await _kitchen_snapshot())
+            else:
+                yield format_sse("order", event)
+    finally:
+        order_event_bus.unsubscribe(subscription)
+
+
+async def kitchen_stream(request):
+    """Luồng server-sent events trạng thái đơn cho màn hình bếp
+
+    View bất đồng bộ: mỗi kết nối chỉ là một coroutine chờ trên hàng đợi,
+    nên một worker ASGI giữ được hàng trăm kết nối rảnh mà không tốn thread.
+    """
+    user = await request.auser()
+    if not user.is_authenticated or not (
+        user.is_staff_member or user.is_superuser
+    ):
+        return HttpResponseForbidden()
+
+    response = StreamingHttpResponse(
+        _kitchen_events(), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class Project2Config(AppConfig):
+    name = "project2"
+
+    def ready(self):
+        from . import checks, db  # noqa: F401
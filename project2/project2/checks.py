@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+from .numbering import MAX_HOST_ID
+
+SESSION_CART_STORAGE = "restaurant.cart.SessionCartStorage"
+
+
+@register()
+def check_session_cart_size(app_configs, **kwargs):
+    """Cookie chỉ chứa được ~4KB, giỏ hàng lưu trong session sẽ vượt quá"""
+    engine = settings.SESSION_ENGINE
+    storage = getattr(settings, "CART_STORAGE_BACKEND", "")
+    if engine.endswith("signed_cookies") and storage == SESSION_CART_STORAGE:
+        return [
+            Warning(
+                "Giỏ hàng lưu trong session khi session là signed cookie "
+                "sẽ làm cookie quá lớn với giỏ nhiều món.",
+                hint="Dùng CART_STORAGE_BACKEND mặc định "
+                "(restaurant.cart.DatabaseCartStorage).",
+                id="project2.W001",
+            )
+        ]
+    return []
+
+
+@register()
+def check_number_node_id(app_configs, **kwargs):
+    node_id = getattr(settings, "NUMBER_NODE_ID", None)
+    if node_id is not None and not 0 <= node_id <= MAX_HOST_ID:
+        return [
+            Error(
+                f"NUMBER_NODE_ID phải nằm trong khoảng 0..{MAX_HOST_ID}.",
+                id="project2.E001",
+            )
+        ]
+    return []
+
+
+@register(deploy=True)
+def check_number_node_id_set(app_configs, **kwargs):
+    """Mã đơn chỉ duy nhất giữa các máy khi mỗi máy có NUMBER_NODE_ID riêng"""
+    if settings.DEBUG or getattr(settings, "NUMBER_NODE_ID", None) is not None:
+        return []
+    return [
+        Warning(
+            "Chưa đặt NUMBER_NODE_ID: mọi máy chạy app dùng chung node 0 "
+            "nên có thể sinh trùng mã đơn/đặt bàn.",
+            hint="Đặt biến môi trường NUMBER_NODE_ID (0..255) khác nhau "
+            "cho mỗi máy hoặc container.",
+            id="project2.W002",
+        )
+    ]
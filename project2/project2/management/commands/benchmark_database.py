@@ -0,0 +1,88 @@
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import F
+
+from restaurant.models import MenuItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo throughput đọc/ghi của profile database hiện tại (DB_ENGINE) "
+        "với nhiều thread chạy song song"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--seconds", type=float, default=10, help="Thời gian chạy"
+        )
+        parser.add_argument(
+            "--write-ratio",
+            type=float,
+            default=0.1,
+            help="Tỉ lệ thao tác ghi (0..1)",
+        )
+
+    def handle(self, *args, **options):
+        ids = list(MenuItem.objects.values_list("pk", flat=True)[:10000])
+        if not ids:
+            raise CommandError(
+                "Chưa có món ăn, chạy generate_load_data --menu-items trước"
+            )
+
+        settings_dict = connection.settings_dict
+        self.stdout.write(
+            f"{connection.vendor} ({settings_dict['NAME']}), "
+            f"{options['threads']} thread, {options['seconds']}s, "
+            f"{options['write_ratio']:.0%} ghi"
+        )
+        deadline = time.monotonic() + options["seconds"]
+        results = []
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(ids, options["write_ratio"], deadline, results, seed),
+            )
+            for seed in range(options["threads"])
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        reads, writes, errors = (sum(column) for column in zip(*results))
+        self.stdout.write(
+            f"đọc {reads / elapsed:,.0f}/s, ghi {writes / elapsed:,.0f}/s, "
+            f"lỗi khóa {errors}"
+        )
+
+    def worker(self, ids, write_ratio, deadline, results, seed):
+        rng = random.Random(seed)
+        reads = writes = errors = 0
+        try:
+            while time.monotonic() < deadline:
+                menu_item_id = rng.choice(ids)
+                try:
+                    if rng.random() < write_ratio:
+                        # Ghi không đổi dữ liệu nhưng vẫn lấy khóa ghi
+                        with transaction.atomic():
+                            MenuItem.objects.filter(pk=menu_item_id).update(
+                                views_count=F("views_count")
+                            )
+                        writes += 1
+                    else:
+                        MenuItem.objects.filter(pk=menu_item_id).values_list(
+                            "name", "price"
+                        ).first()
+                        reads += 1
+                except OperationalError:
+                    errors += 1
+        finally:
+            connections.close_all()
+            results.append((reads, writes, errors))
@@ -0,0 +1,73 @@
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian đọc và ghi một session theo từng SESSION_MODE, với "
+        "cache và database đang cấu hình"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=settings.SESSION_ENGINES,
+            help="Mặc định: tất cả",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=200, help="Số lần đo mỗi thao tác"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{options['repeat']} lần đo, trung vị µs (số truy vấn)"
+        )
+        self.stdout.write(f"{'mode':<16}{'đọc':>16}{'ghi':>16}")
+        for mode in options["mode"] or settings.SESSION_ENGINES:
+            engine = import_module(settings.SESSION_ENGINES[mode])
+            read, write = self.measure(engine.SessionStore, options["repeat"])
+            self.stdout.write(
+                f"{mode:<16}"
+                + "".join(
+                    f"{elapsed * 1e6:>11.0f} ({queries})"
+                    for elapsed, queries in (read, write)
+                )
+            )
+
+    def measure(self, store_class, repeat):
+        # Session như của khách đã thêm món: chỉ giữ token giỏ hàng
+        session = store_class()
+        session["cart_token"] = "x" * 32
+        session.save()
+        key = session.session_key
+        try:
+            read = self.time(
+                lambda: store_class(key).get("cart_token"), repeat
+            )
+
+            def write():
+                nonlocal key
+                store = store_class(key)
+                store["visits"] = store.get("visits", 0) + 1
+                store.save()
+                key = store.session_key
+
+            return read, self.time(write, repeat)
+        finally:
+            store_class(key).delete()
+
+    def time(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+        return statistics.median(timings), len(queries)
@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+DB_ENGINES = (
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Xóa session hết hạn theo từng lô nhỏ (thay cho clearsessions, "
+        "vốn xóa trong một câu lệnh và giữ khóa ghi của SQLite lâu)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Số session xóa trong mỗi lô",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.05,
+            help="Số giây nghỉ giữa các lô để request khác kịp ghi",
+        )
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_ENGINES:
+            # Cache tự hết hạn, cookie nằm ở trình duyệt
+            self.stdout.write(
+                f"{settings.SESSION_ENGINE} không lưu session trong DB"
+            )
+            return
+
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(
+                expired.values_list("session_key", flat=True)[
+                    : options["batch_size"]
+                ]
+            )
+            if not keys:
+                break
+            Session.objects.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+            time.sleep(options["pause"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Đã xóa {deleted} session hết hạn")
+        )
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# 2024-01-01 00:00:00 UTC tính bằng mili giây
+EPOCH_MS = 1704067200000
+
+# Node = máy chủ (NUMBER_NODE_ID) | ô process đang chạy trên máy đó
+HOST_BITS = 8
+PROCESS_BITS = 8
+NODE_BITS = HOST_BITS + PROCESS_BITS
+MAX_HOST_ID = (1 << HOST_BITS) - 1
+SEQUENCE_BITS = 8
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# 13 ký tự base36 đủ chứa 42 bit thời gian + 24 bit node/sequence
+ENCODED_LENGTH = 13
+
+
+def encode_base36(value, length=ENCODED_LENGTH):
+    """Mã hóa số nguyên thành chuỗi base36 có độ dài cố định"""
+    chars = []
+    while value:
+        value, remainder = divmod(value, 36)
+        chars.append(ALPHABET[remainder])
+    return "".join(reversed(chars)).rjust(length, "0")
+
+
+def get_host_id():
+    return getattr(settings, "NUMBER_NODE_ID", None)
+
+
+def get_lock_dir():
+    return getattr(settings, "NUMBER_LOCK_DIR", None) or tempfile.gettempdir()
+
+
+class NumberGenerator:
+    """Sinh ID duy nhất, tăng dần theo thời gian: thời gian | node | sequence
+
+    Node gồm NUMBER_NODE_ID (mỗi máy/container một giá trị) và một ô
+    process giữ bằng file lock trên máy đó, nên hai process đang chạy không
+    bao giờ có cùng node, kể cả khi PID trùng nhau.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._node = 0
+        self._slot_file = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _claim_process_slot(self):
+        """Giữ ô process đầu tiên còn trống bằng flock, tới khi process dừng"""
+        try:
+            import fcntl
+        except ImportError:
+            # Windows không có flock: dùng PID như trước
+            return os.getpid() & ((1 << PROCESS_BITS) - 1)
+
+        host_id = get_host_id() or 0
+        for slot in range(1 << PROCESS_BITS):
+            path = os.path.join(
+                get_lock_dir(), f"project2-number-{host_id}-{slot}.lock"
+            )
+            slot_file = open(path, "a")
+            try:
+                fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                slot_file.close()
+                continue
+            self._slot_file = slot_file
+            return slot
+        raise RuntimeError(
+            f"Hết ô process để sinh mã ({1 << PROCESS_BITS} process/máy)"
+        )
+
+    def _get_node(self):
+        host_id = get_host_id() or 0
+        if not 0 <= host_id <= MAX_HOST_ID:
+            raise ValueError(
+                f"NUMBER_NODE_ID phải nằm trong khoảng 0..{MAX_HOST_ID}"
+            )
+        return (host_id << PROCESS_BITS) | self._claim_process_slot()
+
+    def next_id(self):
+        with self._lock:
+            # Process con sau khi fork phải lấy node mới
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._node = self._get_node()
+                self._last_ms = -1
+                self._sequence = 0
+
+            now_ms = max(int(time.time() * 1000) - EPOCH_MS, self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Hết sequence trong mili giây này, chờ sang mili giây sau
+                    while now_ms <= self._last_ms:
+                        time.sleep(0.0001)
+                        now_ms = int(time.time() * 1000) - EPOCH_MS
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+
+            return (
+                (now_ms << (NODE_BITS + SEQUENCE_BITS))
+                | (self._node << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+
+number_generator = NumberGenerator()
+
+
+def generate_number(prefix):
+    """Tạo mã dạng PREFIX + 13 ký tự base36, ví dụ ORD00K3X9Q2Z7M1A"""
+    return f"{prefix}{encode_base36(number_generator.next_id())}"
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
     "reservations",
     "blog",
     "dashboard",
+    "taskqueue",
 ]
 
 MIDDLEWARE = [
@@ -83,8 +85,107 @@ MESSAGE_TAGS = {
     messages.ERROR: "danger",
 }
 
+# Session: "cached_db" (mặc định, đọc từ cache, ghi xuống DB), "db", "cache"
+# hoặc "signed_cookies" (không chạm DB, chỉ hợp khi giỏ hàng lưu ở CartLine).
+# Session chỉ được tạo khi có dữ liệu (vd. thêm món vào giỏ, đăng nhập),
+# khách chỉ xem menu không tạo dòng django_session nào
+SESSION_MODE = os.environ.get("SESSION_MODE", "cached_db")
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+SESSION_SAVE_EVERY_REQUEST = False
+
 # Cart session ID
 CART_SESSION_ID = "cart"
+CART_SUMMARY_SESSION_ID = "cart_summary"
+
+# Nơi lưu giỏ hàng: bảng CartLine (mặc định) hoặc
+# "restaurant.cart.SessionCartStorage" để giữ toàn bộ trong session
+CART_STORAGE_BACKEND = "restaurant.cart.DatabaseCartStorage"
+# Giỏ không thay đổi quá số ngày này bị xóa bởi clear_expired_carts
+CART_ANONYMOUS_EXPIRY_DAYS = 7
+CART_USER_EXPIRY_DAYS = 30
+
+# Menu search backend (SQLite FTS5; profile PostgreSQL dùng icontains)
+MENU_SEARCH_BACKEND = "restaurant.search.SQLiteFTSSearchBackend"
+
+# Cache: locmem khi dev, Redis (REDIS_URL) hoặc file cache khi production
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+elif DEBUG:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "project2",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / "cache",
+        }
+    }
+
+# Thời gian (giây) cache dữ liệu các trang menu/trang chủ
+RESTAURANT_CACHE_TIMEOUT = 300
+
+# Lượt xem món ăn được gom trong Redis và ghi xuống DB mỗi N giây; với
+# cache khác mỗi lượt xem được ghi thẳng xuống DB
+VIEW_COUNT_FLUSH_INTERVAL = 10
+
+# Alias cache dùng để gom lượt xem (phải là RedisCache mới được gom)
+VIEW_COUNT_CACHE = "default"
+
+# Thời gian (giây) cache số liệu tổng hợp của dashboard; doanh thu theo
+# ngày được cache đến khi có đơn trong ngày đó thay đổi
+DASHBOARD_CACHE_TIMEOUT = 60
+
+# Thời gian (giây) cache mã giảm giá theo code; lượt dùng luôn được kiểm
+# tra lại trong DB khi đặt hàng
+COUPON_CACHE_TIMEOUT = 60
+
+# Chiều rộng (px) các bản thu nhỏ được tạo cho ảnh tải lên, kèm bản WebP
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_WEBP_QUALITY = 80
+
+# Hàng đợi tác vụ nền (worker: python manage.py run_tasks). TASKS_EAGER
+# chạy tác vụ ngay sau commit, tiện khi phát triển không có worker
+TASKS_EAGER = os.environ.get("TASKS_EAGER") == "1"
+TASKS_CONCURRENCY = 2
+TASKS_MAX_ATTEMPTS = 5
+# Chờ 10s, 20s, 40s... (tối đa 1 giờ) trước mỗi lần chạy lại
+TASKS_RETRY_BACKOFF = 10
+TASKS_RETRY_BACKOFF_MAX = 3600
+# Tác vụ "đang chạy" quá lâu được coi là worker đã chết và chạy lại
+TASKS_LOCK_TIMEOUT = 600
+TASKS_RETENTION_DAYS = 7
+
+# Mã đơn/đặt bàn (project2.numbering): mỗi máy hoặc container chạy app
+# cần một NUMBER_NODE_ID riêng trong khoảng 0..255. Các process trên cùng
+# máy tự chia ô bằng file lock trong NUMBER_LOCK_DIR (mặc định thư mục tạm)
+NUMBER_NODE_ID = (
+    int(os.environ["NUMBER_NODE_ID"])
+    if os.environ.get("NUMBER_NODE_ID")
+    else None
+)
+NUMBER_LOCK_DIR = os.environ.get("NUMBER_LOCK_DIR")
+
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+DEFAULT_FROM_EMAIL = os.environ.get(
+    "DEFAULT_FROM_EMAIL", "FourSeason <no-reply@fourseason.vn>"
+)
 
 TEMPLATES = [
     {
@@ -109,11 +210,61 @@ WSGI_APPLICATION = "project2.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Chọn profile bằng biến môi trường DB_ENGINE: "sqlite" (mặc định) hoặc
+# "postgresql". Các PRAGMA của SQLite được áp dụng trong project2/db.py.
+
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DB_NAME", "project2"),
+            "USER": os.environ.get("DB_USER", "postgres"),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", "localhost"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+            # Giữ kết nối giữa các request, kiểm tra trước khi dùng lại
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+        }
+    }
+    if os.environ.get("DB_POOL"):
+        # Connection pool của psycopg 3 (cần psycopg[pool]), không dùng
+        # chung với CONN_MAX_AGE
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"] = {
+            "pool": {
+                "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+                "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            }
+        }
+    # FTS5 chỉ có trên SQLite
+    MENU_SEARCH_BACKEND = "restaurant.search.IcontainsSearchBackend"
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            # Database test là file để test nhiều process dùng chung được
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+            "OPTIONS": {
+                # Số giây chờ khi database đang bị khóa (busy timeout của
+                # SQLite); không đặt lại trong SQLITE_PRAGMAS
+                "timeout": 20,
+                # Lấy write lock ngay từ đầu transaction để tránh deadlock
+                # khi nhiều transaction cùng nâng cấp từ đọc lên ghi
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
     }
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
 }
 
 
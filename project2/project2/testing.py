@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Đoạn code chạy nhiều truy vấn hơn mức cho phép"""
+
+
+@contextmanager
+def query_budget(max_queries, using=DEFAULT_DB_ALIAS):
+    """Kiểm tra số truy vấn không vượt quá max_queries
+
+    Dùng trong test để bắt lỗi N+1: khác với assertNumQueries, chỉ giới
+    hạn trên được cố định nên thêm cache hay gộp truy vấn không làm test
+    hỏng, còn lặp truy vấn theo từng dòng thì sẽ bị báo kèm danh sách SQL.
+
+        with query_budget(5):
+            self.client.get(reverse("orders:order_list"))
+    """
+    context = CaptureQueriesContext(connections[using])
+    with context:
+        yield context
+
+    executed = len(context.captured_queries)
+    if executed > max_queries:
+        queries = "\n".join(
+            f"{index}. {query['sql']}"
+            for index, query in enumerate(context.captured_queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f"{executed} truy vấn, vượt giới hạn {max_queries}:\n{queries}"
+        )
+
+
+def query_plan(queryset):
+    """Kết quả EXPLAIN QUERY PLAN (SQLite) của queryset, gộp thành một chuỗi"""
+    sql, params = queryset.query.sql_with_params()
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return " ".join(row[-1] for row in cursor.fetchall())
+
+
+def with_templates(templates):
+    """TEMPLATES của settings, thêm các template viết sẵn trong bộ nhớ
+
+    Dùng với override_settings để test view khi template thật chưa có,
+    template trong `templates` được ưu tiên hơn template trên đĩa.
+
+        @override_settings(TEMPLATES=with_templates({"a.html": "..."}))
+    """
+    backend = dict(settings.TEMPLATES[0], APP_DIRS=False)
+    backend["OPTIONS"] = dict(
+        backend["OPTIONS"],
+        loaders=[
+            ("django.template.loaders.locmem.Loader", templates),
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    )
+    return [backend]
+
+
+def _setup_process(settings_module, database_names):
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    import django
+    from django.conf import settings
+
+    # Trỏ sang database test của process cha trước khi mở kết nối
+    for alias, name in database_names.items():
+        settings.DATABASES[alias]["NAME"] = name
+    django.setup()
+
+
+def _call(target, args):
+    return import_string(target)(*args)
+
+
+def run_in_processes(target, args_list):
+    """Chạy `target` (đường dẫn import) song song, mỗi bộ args một process
+
+    Process con dùng chung database test với process hiện tại, nên test
+    phải là TransactionTestCase (dữ liệu đã commit) và database test phải
+    là file. Trả về kết quả theo thứ tự `args_list`.
+
+        run_in_processes("orders.tests.create_orders", [(100,)] * 4)
+    """
+    database_names = {
+        alias: connections[alias].settings_dict["NAME"]
+        for alias in connections
+    }
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        len(args_list),
+        initializer=_setup_process,
+        initargs=(os.environ["DJANGO_SETTINGS_MODULE"], database_names),
+    ) as pool:
+        return pool.starmap(_call, [(target, args) for args in args_list])
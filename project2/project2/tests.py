@@ -0,0 +1,64 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .checks import SESSION_CART_STORAGE, check_session_cart_size
+
+
+class SessionTests(TestCase):
+    def create_sessions(self, prefix, count, expire_date):
+        Session.objects.bulk_create(
+            Session(
+                session_key=f"{prefix}{index:030d}",
+                session_data="",
+                expire_date=expire_date,
+            )
+            for index in range(count)
+        )
+
+    def test_clear_expired_sessions_in_batches(self):
+        now = timezone.now()
+        self.create_sessions("het", 5, now - timedelta(minutes=1))
+        self.create_sessions("con", 3, now + timedelta(days=1))
+        output = StringIO()
+        call_command(
+            "clear_expired_sessions",
+            "--batch-size=2",
+            "--pause=0",
+            stdout=output,
+        )
+        self.assertIn("Đã xóa 5 session", output.getvalue())
+        self.assertEqual(
+            sorted(Session.objects.values_list("session_key", flat=True)),
+            [f"con{index:030d}" for index in range(3)],
+        )
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"
+    )
+    def test_clear_expired_sessions_skips_non_db_engines(self):
+        self.create_sessions("het", 1, timezone.now() - timedelta(days=1))
+        output = StringIO()
+        call_command("clear_expired_sessions", stdout=output)
+        self.assertIn("không lưu session trong DB", output.getvalue())
+        self.assertEqual(Session.objects.count(), 1)
+
+    def test_session_cart_in_signed_cookie_warns(self):
+        with override_settings(
+            SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies",
+            CART_STORAGE_BACKEND=SESSION_CART_STORAGE,
+        ):
+            self.assertEqual(
+                [w.id for w in check_session_cart_size(None)],
+                ["project2.W001"],
+            )
+        with override_settings(
+            SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"
+        ):
+            self.assertEqual(check_session_cart_size(None), [])
+        with override_settings(CART_STORAGE_BACKEND=SESSION_CART_STORAGE):
+            self.assertEqual(check_session_cart_size(None), [])
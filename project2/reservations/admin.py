@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Table, Reservation
+from .forms import ReservationAdminForm
+from .models import Table, Reservation, TableSlot
 
 
 @admin.register(Table)
@@ -11,6 +12,7 @@ class TableAdmin(admin.ModelAdmin):
 
 @admin.register(Reservation)
 class ReservationAdmin(admin.ModelAdmin):
+    form = ReservationAdminForm
     list_display = [
         "reservation_number",
         "customer",
@@ -23,6 +25,7 @@ class ReservationAdmin(admin.ModelAdmin):
     ]
     list_filter = ["status", "date", "occasion"]
     search_fields = ["reservation_number", "customer__username", "guest_phone"]
+    list_select_related = ["customer", "table"]
     readonly_fields = ["reservation_number", "created_at", "updated_at"]
 
     fieldsets = (
@@ -70,6 +73,8 @@ class ReservationAdmin(admin.ModelAdmin):
     mark_as_confirmed.short_description = "Xác nhận đặt bàn đã chọn"
 
     def mark_as_completed(self, request, queryset):
+        # update() không gửi signal nên phải tự trả các ô giữ bàn
+        TableSlot.objects.filter(reservation__in=queryset).delete()
         updated = queryset.update(status="completed")
         self.message_user(request, f"Đã hoàn thành {updated} đặt bàn")
 
@@ -0,0 +1,148 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from .models import Reservation, Table, TableSlot
+
+OPENING_TIME = time(10, 0)
+CLOSING_TIME = time(22, 0)
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def start_times(date, step_minutes=30):
+    """Các giờ có thể bắt đầu đặt bàn trong giờ mở cửa của ngày `date`"""
+    current = datetime.combine(date, OPENING_TIME)
+    closing = datetime.combine(date, CLOSING_TIME)
+    while current < closing:
+        yield current.time()
+        current += timedelta(minutes=step_minutes)
+
+
+class DayAvailability:
+    """Chỉ mục khoảng thời gian đã đặt của từng bàn trong một ngày
+
+    Dựng bằng hai truy vấn (bàn + đặt bàn trong ngày), sau đó mọi câu hỏi
+    "bàn nào trống trong khung giờ X" chỉ là tìm kiếm nhị phân trong bộ nhớ.
+    """
+
+    def __init__(self, date, exclude_reservation_id=None):
+        self.date = date
+        self.tables = list(
+            Table.objects.filter(is_active=True)
+            .exclude(status="maintenance")
+            .order_by("capacity", "number")
+        )
+
+        reservations = Reservation.objects.filter(
+            date=date,
+            status__in=Reservation.BLOCKING_STATUSES,
+            table__isnull=False,
+        )
+        if exclude_reservation_id:
+            reservations = reservations.exclude(id=exclude_reservation_id)
+
+        intervals = defaultdict(list)
+        for table_id, start, hours in reservations.values_list(
+            "table_id", "time", "duration_hours"
+        ):
+            start_minutes = to_minutes(start)
+            intervals[table_id].append(
+                (start_minutes, start_minutes + hours * 60)
+            )
+
+        # Với mỗi bàn: giờ bắt đầu đã sắp xếp và giờ kết thúc lớn nhất
+        # tính tới từng vị trí, để kiểm tra chồng lấn bằng một lần bisect
+        self._starts = {}
+        self._max_ends = {}
+        for table_id, table_intervals in intervals.items():
+            table_intervals.sort()
+            max_ends = []
+            latest = 0
+            for _, end in table_intervals:
+                latest = max(latest, end)
+                max_ends.append(latest)
+            self._starts[table_id] = [s for s, _ in table_intervals]
+            self._max_ends[table_id] = max_ends
+
+    def is_free(self, table, start_minutes, end_minutes):
+        """Bàn có trống trong khoảng [start, end) không"""
+        starts = self._starts.get(table.id)
+        if not starts:
+            return True
+        # Các khoảng bắt đầu trước khi khung giờ kết thúc
+        index = bisect_left(starts, end_minutes)
+        if index == 0:
+            return True
+        # Chồng lấn nếu một trong số đó kết thúc sau giờ bắt đầu
+        return self._max_ends[table.id][index - 1] <= start_minutes
+
+    def free_tables(self, start, duration_hours, number_of_guests):
+        """Danh sách bàn trống đủ chỗ, sắp theo sức chứa tăng dần"""
+        start_minutes = to_minutes(start)
+        end_minutes = start_minutes + duration_hours * 60
+        return [
+            table
+            for table in self.tables
+            if table.capacity >= number_of_guests
+            and self.is_free(table, start_minutes, end_minutes)
+        ]
+
+    def best_table(self, start, duration_hours, number_of_guests):
+        """Chọn bàn trống ít thừa ghế nhất (best-fit)"""
+        tables = self.free_tables(start, duration_hours, number_of_guests)
+        return tables[0] if tables else None
+
+    def available_slots(
+        self, number_of_guests, duration_hours=2, step_minutes=30
+    ):
+        """Các giờ bắt đầu còn ít nhất một bàn phù hợp"""
+        return [
+            start
+            for start in start_times(self.date, step_minutes)
+            if self.best_table(start, duration_hours, number_of_guests)
+        ]
+
+
+@transaction.atomic
+def book_table(reservation):
+    """Lưu đặt bàn và giữ bàn phù hợp một cách nguyên tử
+
+    Mỗi bàn được giữ bằng các dòng TableSlot có ràng buộc unique, nên hai
+    request đồng thời không thể cùng giữ một khung giờ: request thua sẽ gặp
+    IntegrityError và chuyển sang bàn kế tiếp. Trả về bàn đã giữ hoặc None.
+    """
+    reservation.table = None
+    reservation.save()
+
+    slots = TableSlot.slot_range(reservation.time, reservation.duration_hours)
+    candidates = DayAvailability(reservation.date).free_tables(
+        reservation.time,
+        reservation.duration_hours,
+        reservation.number_of_guests,
+    )
+    for table in candidates:
+        try:
+            with transaction.atomic():
+                TableSlot.objects.bulk_create(
+                    [
+                        TableSlot(
+                            reservation=reservation,
+                            table=table,
+                            date=reservation.date,
+                            slot=slot,
+                        )
+                        for slot in slots
+                    ]
+                )
+        except IntegrityError:
+            # Bàn vừa bị request khác giữ, thử bàn tiếp theo
+            continue
+
+        reservation.table = table
+        reservation.save(update_fields=["table"])
+        return table
+    return None
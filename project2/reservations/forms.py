@@ -1,5 +1,5 @@
 from django import forms
-from .models import Reservation, Table
+from .models import Reservation, Table, TableSlot
 from django.utils import timezone
 from datetime import datetime, timedelta
 
@@ -99,3 +99,40 @@ class ReservationForm(forms.ModelForm):
                 )
 
         return cleaned_data
+
+
+class ReservationAdminForm(forms.ModelForm):
+    """Form sửa đặt bàn trong admin, chặn đổi sang khung giờ đã có người giữ"""
+
+    class Meta:
+        model = Reservation
+        fields = "__all__"
+
+    def clean(self):
+        cleaned_data = super().clean()
+        table = cleaned_data.get("table")
+        date = cleaned_data.get("date")
+        time = cleaned_data.get("time")
+        duration_hours = cleaned_data.get("duration_hours")
+        status = cleaned_data.get("status")
+        if (
+            table
+            and date
+            and time
+            and duration_hours
+            and status in Reservation.BLOCKING_STATUSES
+        ):
+            taken = (
+                TableSlot.objects.filter(
+                    table=table,
+                    date=date,
+                    slot__in=TableSlot.slot_range(time, duration_hours),
+                )
+                .exclude(reservation_id=self.instance.pk)
+                .exists()
+            )
+            if taken:
+                raise forms.ValidationError(
+                    "Bàn đã được đặt trong khung giờ này"
+                )
+        return cleaned_data
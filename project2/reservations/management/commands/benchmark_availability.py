@@ -0,0 +1,94 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from reservations.availability import DayAvailability, start_times
+from reservations.models import Reservation, Table, TableSlot
+
+GUESTS = [2, 4, 8]
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian tìm bàn trống và giờ còn trống của DayAvailability so "
+        "với một truy vấn SQL cho mỗi khung giờ, trên những ngày đông nhất"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=5, help="Số ngày đông nhất để đo"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Số lần đo mỗi ngày"
+        )
+        parser.add_argument("--duration", type=int, default=2)
+
+    def handle(self, *args, **options):
+        tables = Table.objects.filter(is_active=True).count()
+        days = list(
+            Reservation.objects.filter(
+                status__in=Reservation.BLOCKING_STATUSES,
+                table__isnull=False,
+            )
+            .values_list("date")
+            .annotate(total=Count("id"))
+            .order_by("-total")[: options["days"]]
+        )
+        if not tables or not days:
+            raise CommandError(
+                "Chưa có bàn hoặc đặt bàn, chạy generate_load_data "
+                "--tables 200 --reservations 100000 trước"
+            )
+
+        self.stdout.write(
+            f"{tables} bàn, {Reservation.objects.count()} đặt bàn, "
+            f"{options['repeat']} lần đo, đơn vị ms"
+        )
+        self.stdout.write(
+            f"{'ngày':<12}{'đặt bàn':>9}{'khách':>7}"
+            f"{'index':>10}{'sql':>10}{'giờ trống':>11}"
+        )
+        duration = options["duration"]
+        for date, total in days:
+            for guests in GUESTS:
+                index = self.measure(
+                    lambda: DayAvailability(date).available_slots(
+                        guests, duration
+                    ),
+                    options["repeat"],
+                )
+                sql = self.measure(
+                    lambda: self.sql_slots(date, guests, duration),
+                    options["repeat"],
+                )
+                slots = len(DayAvailability(date).available_slots(guests))
+                self.stdout.write(
+                    f"{date.isoformat():<12}{total:>9}{guests:>7}"
+                    f"{index * 1000:>10.2f}{sql * 1000:>10.2f}{slots:>11}"
+                )
+
+    def sql_slots(self, date, guests, duration):
+        """Cách làm không có chỉ mục: mỗi giờ bắt đầu một truy vấn tìm bàn"""
+        slots = []
+        for start in start_times(date):
+            held = TableSlot.slot_range(start, duration)
+            table = (
+                Table.objects.filter(is_active=True, capacity__gte=guests)
+                .exclude(status="maintenance")
+                .exclude(slots__date=date, slots__slot__in=held)
+                .order_by("capacity", "number")
+                .first()
+            )
+            if table:
+                slots.append(start)
+        return slots
+
+    def measure(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SLOT_MINUTES = 15
+
+
+def backfill_slots(apps, schema_editor):
+    Reservation = apps.get_model("reservations", "Reservation")
+    TableSlot = apps.get_model("reservations", "TableSlot")
+    reservations = Reservation.objects.filter(
+        status__in=("pending", "confirmed", "checked_in"),
+        table__isnull=False,
+    )
+    slots = []
+    for reservation in reservations.iterator():
+        start = reservation.time.hour * 60 + reservation.time.minute
+        end = start + reservation.duration_hours * 60
+        for slot in range(start // SLOT_MINUTES, -(-end // SLOT_MINUTES)):
+            slots.append(
+                TableSlot(
+                    reservation_id=reservation.id,
+                    table_id=reservation.table_id,
+                    date=reservation.date,
+                    slot=slot,
+                )
+            )
+    # Dữ liệu cũ có thể đã bị đặt trùng, giữ lại ô đầu tiên
+    TableSlot.objects.bulk_create(slots, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TableSlot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "slot",
+                    models.PositiveSmallIntegerField(
+                        verbose_name="Ô thời gian (tính từ 0h)"
+                    ),
+                ),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slots",
+                        to="reservations.reservation",
+                    ),
+                ),
+                (
+                    "table",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slots",
+                        to="reservations.table",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ô giữ bàn",
+                "verbose_name_plural": "Ô giữ bàn",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("table", "date", "slot"),
+                        name="unique_table_slot",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_slots, migrations.RunPython.noop),
+    ]
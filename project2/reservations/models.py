@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from accounts.models import User
+from project2.numbering import generate_number
 
 
 class Table(models.Model):
@@ -56,6 +57,9 @@ class Reservation(models.Model):
         ("no_show", "Không đến"),
     )
 
+    # Các trạng thái đang giữ bàn
+    BLOCKING_STATUSES = ("pending", "confirmed", "checked_in")
+
     # Reservation info
     reservation_number = models.CharField(
         max_length=20, unique=True, editable=False
@@ -126,16 +130,60 @@ class Reservation(models.Model):
         verbose_name = "Đặt bàn"
         verbose_name_plural = "Đặt bàn"
         ordering = ["-date", "-time"]
+        indexes = [
+            # reservation_list: đặt bàn của khách theo thứ tự mặc định
+            models.Index(
+                fields=["customer", "-date", "-time"],
+                name="reservation_customer_date_idx",
+            ),
+            # DayAvailability: các đặt bàn còn hiệu lực trong một ngày
+            models.Index(
+                fields=["date", "status"],
+                name="reservation_date_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Reservation #{self.reservation_number} - {self.guest_name}"
 
+    # Các trường quyết định ô giữ bàn
+    SLOT_FIELDS = {"table", "date", "time", "duration_hours", "status"}
+
     def save(self, *args, **kwargs):
         if not self.reservation_number:
-            import time
+            self.reservation_number = generate_number("RES")
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or self.SLOT_FIELDS & set(update_fields):
+                self.sync_table_slots()
 
-            self.reservation_number = f"RES{int(time.time())}"
-        super().save(*args, **kwargs)
+    def sync_table_slots(self):
+        """Dựng lại các ô giữ bàn theo bàn, ngày, giờ và trạng thái hiện tại
+
+        Ô mới trùng với đặt bàn khác gây IntegrityError, khiến cả lần lưu
+        bị hủy thay vì để hai đặt bàn cùng giữ một khung giờ.
+        """
+        wanted = set()
+        if self.table_id and self.status in self.BLOCKING_STATUSES:
+            wanted = {
+                (self.table_id, self.date, slot)
+                for slot in TableSlot.slot_range(
+                    self.time, self.duration_hours
+                )
+            }
+        held = set(self.slots.values_list("table_id", "date", "slot"))
+        if wanted == held:
+            return
+        self.slots.all().delete()
+        TableSlot.objects.bulk_create(
+            [
+                TableSlot(
+                    reservation=self, table_id=table_id, date=date, slot=slot
+                )
+                for table_id, date, slot in wanted
+            ]
+        )
 
     @property
     def is_upcoming(self):
@@ -167,3 +215,42 @@ class Reservation(models.Model):
             "no_show": "secondary",
         }
         return status_classes.get(self.status, "secondary")
+
+
+class TableSlot(models.Model):
+    """Ô thời gian đã giữ của một bàn (chống đặt trùng bằng unique)"""
+
+    SLOT_MINUTES = 15
+
+    reservation = models.ForeignKey(
+        Reservation, on_delete=models.CASCADE, related_name="slots"
+    )
+    table = models.ForeignKey(
+        Table, on_delete=models.CASCADE, related_name="slots"
+    )
+    date = models.DateField()
+    slot = models.PositiveSmallIntegerField(
+        verbose_name="Ô thời gian (tính từ 0h)"
+    )
+
+    class Meta:
+        verbose_name = "Ô giữ bàn"
+        verbose_name_plural = "Ô giữ bàn"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["table", "date", "slot"], name="unique_table_slot"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.table_id} - {self.date} #{self.slot}"
+
+    @classmethod
+    def slot_range(cls, start, duration_hours):
+        """Các ô thời gian bị chiếm bởi khoảng [start, start + duration)"""
+        start_minutes = start.hour * 60 + start.minute
+        end_minutes = start_minutes + duration_hours * 60
+        return range(
+            start_minutes // cls.SLOT_MINUTES,
+            -(-end_minutes // cls.SLOT_MINUTES),
+        )
@@ -0,0 +1,36 @@
+from django.core.mail import send_mail
+
+from taskqueue.queue import task
+
+
+@task
+def send_reservation_confirmation(reservation_id):
+    """Gửi email xác nhận đặt bàn cho khách"""
+    from .models import Reservation
+
+    reservation = (
+        Reservation.objects.select_related("customer", "table")
+        .filter(pk=reservation_id)
+        .first()
+    )
+    if reservation is None or reservation.table is None:
+        return
+    email = reservation.guest_email or reservation.customer.email
+    if not email:
+        return
+
+    send_mail(
+        f"Xác nhận đặt bàn {reservation.reservation_number}",
+        "\n".join(
+            [
+                f"Chào {reservation.guest_name},",
+                "",
+                f"Nhà hàng đã giữ bàn {reservation.table.number} cho "
+                f"{reservation.number_of_guests} khách lúc "
+                f"{reservation.time:%H:%M} ngày {reservation.date:%d/%m/%Y}.",
+                f"Mã đặt bàn: {reservation.reservation_number}",
+            ]
+        ),
+        None,
+        [email],
+    )
@@ -1,3 +1,298 @@
-from django.test import TestCase
+import threading
+from datetime import time, timedelta
 
-# Create your tests here.
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from project2.testing import query_budget, query_plan, with_templates
+from .availability import DayAvailability, book_table
+from .forms import ReservationAdminForm
+from .models import Reservation, Table, TableSlot
+
+
+def new_reservation(customer, **fields):
+    fields.setdefault("date", timezone.localdate() + timedelta(days=1))
+    fields.setdefault("time", time(19, 0))
+    fields.setdefault("number_of_guests", 2)
+    return Reservation(
+        customer=customer,
+        guest_name="Khách",
+        guest_phone="0900000000",
+        **fields,
+    )
+
+
+class AvailabilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        cls.date = timezone.localdate() + timedelta(days=1)
+        cls.small = Table.objects.create(number="1", capacity=2)
+        cls.medium = Table.objects.create(number="2", capacity=4)
+        cls.large = Table.objects.create(number="3", capacity=6)
+        Table.objects.create(number="8", capacity=2, status="maintenance")
+        Table.objects.create(number="9", capacity=2, is_active=False)
+        cls.book(cls.small, time(18, 0))
+        cls.book(cls.large, time(10, 0), duration_hours=4)
+        cls.book(cls.medium, time(12, 0), status="cancelled")
+
+    @classmethod
+    def book(cls, table, start, **fields):
+        new_reservation(
+            cls.customer, table=table, date=cls.date, time=start, **fields
+        ).save()
+
+    def test_loads_day_in_two_queries(self):
+        with self.assertNumQueries(2):
+            availability = DayAvailability(self.date)
+        self.assertEqual(
+            availability.tables, [self.small, self.medium, self.large]
+        )
+
+    def test_best_table_is_smallest_free_fit(self):
+        availability = DayAvailability(self.date)
+        self.assertEqual(
+            availability.best_table(time(12, 0), 2, 2), self.small
+        )
+        self.assertEqual(availability.best_table(time(12, 0), 2, 5), None)
+        self.assertEqual(
+            availability.best_table(time(14, 0), 2, 5), self.large
+        )
+        self.assertEqual(availability.best_table(time(12, 0), 2, 7), None)
+
+    def test_overlap_boundaries(self):
+        availability = DayAvailability(self.date)
+        # Bàn nhỏ bận 18:00-20:00, kết thúc đúng lúc bắt đầu thì không chồng
+        self.assertEqual(
+            availability.best_table(time(16, 0), 2, 2), self.small
+        )
+        self.assertEqual(
+            availability.best_table(time(20, 0), 2, 2), self.small
+        )
+        self.assertEqual(
+            availability.best_table(time(17, 0), 2, 2), self.medium
+        )
+        self.assertEqual(
+            availability.best_table(time(19, 30), 1, 2), self.medium
+        )
+
+    def test_cancelled_and_excluded_reservation_do_not_block(self):
+        availability = DayAvailability(self.date)
+        self.assertIn(self.medium, availability.free_tables(time(12, 0), 2, 4))
+
+        reservation = self.small.reservations.get()
+        availability = DayAvailability(
+            self.date, exclude_reservation_id=reservation.pk
+        )
+        self.assertEqual(
+            availability.best_table(time(18, 0), 2, 2), self.small
+        )
+
+    def test_available_slots(self):
+        slots = DayAvailability(self.date).available_slots(5)
+        self.assertEqual(slots[0], time(14, 0))
+        self.assertEqual(slots[-1], time(21, 30))
+        self.assertEqual(len(slots), 16)
+
+
+class AvailableSlotsViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Table.objects.create(number="1", capacity=4)
+
+    def setUp(self):
+        self.url = reverse("reservations:available_slots")
+
+    def test_lists_open_start_times(self):
+        date = timezone.localdate() + timedelta(days=1)
+        response = self.client.get(
+            self.url, {"date": date.isoformat(), "guests": 3}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["date"], data["guests"]), (date.isoformat(), 3))
+        self.assertEqual(data["slots"][:2], ["10:00", "10:30"])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in (
+            {},
+            {"date": "ngày mai"},
+            {"date": "2030-13-45"},
+            {"date": "2030-01-01", "guests": "hai"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+
+class TableSlotSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        cls.table = Table.objects.create(number="1", capacity=4)
+        cls.other_table = Table.objects.create(number="2", capacity=4)
+
+    def setUp(self):
+        self.reservation = new_reservation(self.customer)
+        book_table(self.reservation)
+
+    def held(self, reservation):
+        return set(reservation.slots.values_list("table_id", "date", "slot"))
+
+    def expected(self, table, date, start, hours=2):
+        return {
+            (table.pk, date, slot)
+            for slot in TableSlot.slot_range(start, hours)
+        }
+
+    def test_booking_holds_table(self):
+        self.assertEqual(self.reservation.table, self.table)
+        self.assertEqual(
+            self.held(self.reservation),
+            self.expected(self.table, self.reservation.date, time(19, 0)),
+        )
+
+    def test_edit_rebuilds_slots(self):
+        reservation = self.reservation
+        reservation.table = self.other_table
+        reservation.time = time(12, 0)
+        reservation.duration_hours = 3
+        reservation.save()
+        self.assertEqual(
+            self.held(reservation),
+            self.expected(self.other_table, reservation.date, time(12, 0), 3),
+        )
+
+        # Khung giờ cũ đã được trả cho đặt bàn khác
+        other = new_reservation(self.customer)
+        self.assertEqual(book_table(other), self.table)
+
+    def test_cancel_releases_and_reactivate_holds_again(self):
+        reservation = self.reservation
+        reservation.status = "cancelled"
+        reservation.save()
+        self.assertEqual(self.held(reservation), set())
+
+        reservation.status = "confirmed"
+        reservation.save()
+        self.assertEqual(
+            self.held(reservation),
+            self.expected(self.table, reservation.date, time(19, 0)),
+        )
+
+    def test_move_onto_held_slot_fails(self):
+        other = new_reservation(self.customer, time=time(12, 0))
+        book_table(other)
+        other.time = time(20, 0)
+        other.table = self.table
+        with self.assertRaises(IntegrityError):
+            other.save()
+
+    def test_admin_form_rejects_held_slot(self):
+        other = new_reservation(self.customer, time=time(12, 0))
+        book_table(other)
+        data = {
+            field: getattr(other, field)
+            for field in ReservationAdminForm.base_fields
+            if hasattr(other, field)
+        }
+        data.update(customer=self.customer.pk, table=self.table.pk)
+        data["time"] = time(20, 0)
+        form = ReservationAdminForm(data, instance=other)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(list(form.errors), ["__all__"])
+
+        data["time"] = time(12, 30)
+        form = ReservationAdminForm(data, instance=other)
+        self.assertTrue(form.is_valid(), form.errors)
+
+
+RESERVATION_TEMPLATES = with_templates(
+    {
+        "reservations/reservation_list.html": (
+            "{% for reservation in reservations %}{{ reservation.table }}"
+            "{% endfor %}"
+        ),
+        "reservations/reservation_detail.html": "{{ reservation.table }}",
+    }
+)
+
+
+@override_settings(TEMPLATES=RESERVATION_TEMPLATES)
+class ReservationQueryTests(TestCase):
+    """Số truy vấn không tăng theo số đặt bàn"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("khach", password="x")
+        cls.admin = User.objects.create_superuser("quanly", password="x")
+        for index in range(5):
+            Table.objects.create(number=str(index), capacity=4)
+            cls.reservation = new_reservation(cls.customer)
+            book_table(cls.reservation)
+
+    def get(self, url, max_queries):
+        with query_budget(max_queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_customer_pages(self):
+        self.client.force_login(self.customer)
+        self.get(reverse("reservations:reservation_list"), 2)
+        self.get(
+            reverse(
+                "reservations:reservation_detail",
+                args=[self.reservation.reservation_number],
+            ),
+            2,
+        )
+
+    def test_reservation_list_uses_customer_index(self):
+        plan = query_plan(Reservation.objects.filter(customer=self.customer))
+        self.assertIn("USING INDEX reservation_customer_date_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_admin_changelist(self):
+        self.client.force_login(self.admin)
+        self.get(reverse("admin:reservations_reservation_changelist"), 4)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    def test_last_table_is_booked_once(self):
+        customer = User.objects.create_user("khach", password="x")
+        Table.objects.create(number="1", capacity=4)
+        attempts = 200
+        barrier = threading.Barrier(attempts)
+        tables = []
+        errors = []
+
+        def book():
+            try:
+                reservation = new_reservation(customer)
+                barrier.wait()
+                tables.append(book_table(reservation))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book) for _ in range(attempts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(tables), attempts)
+        self.assertEqual(sum(table is not None for table in tables), 1)
+        self.assertEqual(
+            Reservation.objects.filter(table__isnull=False).count(), 1
+        )
+        self.assertEqual(
+            TableSlot.objects.count(),
+            len(TableSlot.slot_range(time(19, 0), 2)),
+        )
@@ -6,6 +6,7 @@ app_name = "reservations"
 urlpatterns = [
     path("book/", views.reservation_create, name="reservation_create"),
     path("my-reservations/", views.reservation_list, name="reservation_list"),
+    path("available-slots/", views.available_slots, name="available_slots"),
     path(
         "reservation/<str:reservation_number>/",
         views.reservation_detail,
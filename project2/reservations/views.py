@@ -1,9 +1,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.utils import timezone
-from .models import Reservation, Table
+from django.http import JsonResponse
+from django.utils.dateparse import parse_date
+from .models import Reservation
 from .forms import ReservationForm
+from .availability import DayAvailability, book_table
+from .tasks import send_reservation_confirmation
 from accounts.decorators import customer_required
 
 
@@ -18,21 +21,11 @@ def reservation_create(request):
             reservation = form.save(commit=False)
             reservation.customer = request.user
 
-            # Tìm bàn phù hợp
-            suitable_table = (
-                Table.objects.filter(
-                    capacity__gte=reservation.number_of_guests,
-                    is_active=True,
-                    status="available",
-                )
-                .order_by("capacity")
-                .first()
-            )
+            # Giữ bàn trống trong khung giờ đặt, ít thừa ghế nhất
+            suitable_table = book_table(reservation)
 
             if suitable_table:
-                reservation.table = suitable_table
-                reservation.save()
-
+                send_reservation_confirmation.delay(reservation.pk)
                 messages.success(
                     request,
                     f"Đặt bàn thành công! Mã đặt bàn: {reservation.reservation_number}",
@@ -46,7 +39,6 @@ def reservation_create(request):
                     request,
                     "Hiện tại không có bàn phù hợp. Chúng tôi sẽ liên hệ lại với bạn.",
                 )
-                reservation.save()
                 return redirect("reservations:reservation_list")
     else:
         form = ReservationForm(user=request.user)
@@ -76,7 +68,7 @@ def reservation_list(request):
 def reservation_detail(request, reservation_number):
     """Chi tiết đặt bàn"""
     reservation = get_object_or_404(
-        Reservation,
+        Reservation.objects.select_related("table"),
         reservation_number=reservation_number,
         customer=request.user,
     )
@@ -92,7 +84,7 @@ def reservation_detail(request, reservation_number):
 def cancel_reservation(request, reservation_number):
     """Hủy đặt bàn"""
     reservation = get_object_or_404(
-        Reservation,
+        Reservation.objects.select_related("table"),
         reservation_number=reservation_number,
         customer=request.user,
     )
@@ -113,3 +105,33 @@ def cancel_reservation(request, reservation_number):
         "reservations:reservation_detail",
         reservation_number=reservation_number,
     )
+
+
+def available_slots(request):
+    """API trả về các giờ còn bàn trống trong một ngày"""
+    try:
+        date = parse_date(request.GET.get("date", ""))
+    except ValueError:
+        # Đúng định dạng nhưng không phải ngày có thật, vd. 2030-13-45
+        date = None
+    if date is None:
+        return JsonResponse(
+            {"error": "Ngày không hợp lệ (YYYY-MM-DD)"}, status=400
+        )
+
+    try:
+        number_of_guests = int(request.GET.get("guests", 1))
+        duration_hours = int(request.GET.get("duration", 2))
+    except ValueError:
+        return JsonResponse({"error": "Tham số không hợp lệ"}, status=400)
+
+    slots = DayAvailability(date).available_slots(
+        max(number_of_guests, 1), max(duration_hours, 1)
+    )
+    return JsonResponse(
+        {
+            "date": date.isoformat(),
+            "guests": number_of_guests,
+            "slots": [slot.strftime("%H:%M") for slot in slots],
+        }
+    )
@@ -25,6 +25,7 @@ class MenuItemAdmin(admin.ModelAdmin):
         "is_available",
         "is_featured",
         "views_count",
+        "avg_rating",
     ]
     list_filter = [
         "category",
@@ -34,9 +35,10 @@ class MenuItemAdmin(admin.ModelAdmin):
         "is_spicy",
     ]
     search_fields = ["name", "description"]
+    list_select_related = ["category"]
     prepopulated_fields = {"slug": ("name",)}
     inlines = [MenuItemImageInline]
-    readonly_fields = ["views_count"]
+    readonly_fields = ["views_count", "rating_count", "avg_rating"]
 
 
 @admin.register(Chef)
@@ -52,3 +54,4 @@ class ReviewAdmin(admin.ModelAdmin):
     list_display = ["user", "menu_item", "rating", "created_at"]
     list_filter = ["rating", "created_at"]
     search_fields = ["user__username", "menu_item__name", "comment"]
+    list_select_related = ["user", "menu_item"]
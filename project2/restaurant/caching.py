@@ -0,0 +1,53 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import urlencode
+
+MENU_CACHE_VERSION_KEY = "restaurant:menu_cache_version"
+
+
+def get_cache_timeout():
+    return getattr(settings, "RESTAURANT_CACHE_TIMEOUT", 300)
+
+
+def get_menu_cache_version():
+    """Phiên bản hiện tại của cache menu (tăng mỗi khi dữ liệu đổi)"""
+    version = cache.get(MENU_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(MENU_CACHE_VERSION_KEY, 1, timeout=None)
+        version = cache.get(MENU_CACHE_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_menu_cache():
+    """Vô hiệu hóa toàn bộ cache menu bằng cách tăng phiên bản"""
+    try:
+        cache.incr(MENU_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.add(MENU_CACHE_VERSION_KEY, 1, timeout=None)
+
+
+def normalize_params(params, allowed):
+    """Chuẩn hóa GET params: chỉ giữ key hợp lệ, bỏ giá trị rỗng, sắp xếp"""
+    items = []
+    for key in sorted(allowed):
+        value = params.get(key, "").strip()
+        if value:
+            items.append((key, value))
+    return urlencode(items)
+
+
+def make_view_cache_key(view_name, params="", *args):
+    raw = ":".join(str(part) for part in (params,) + args)
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return f"restaurant:view:{view_name}:v{get_menu_cache_version()}:{digest}"
+
+
+def get_or_build(key, builder):
+    """Lấy dữ liệu từ cache, nếu chưa có thì tính và lưu lại"""
+    data = cache.get(key)
+    if data is None:
+        data = builder()
+        cache.set(key, data, get_cache_timeout())
+    return data
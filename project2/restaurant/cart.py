@@ -1,75 +1,436 @@
+import uuid
 from decimal import Decimal
+
 from django.conf import settings
-from .models import MenuItem
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from django.utils.module_loading import import_string
 
+from .caching import get_cache_timeout
+from .models import CartLine, MenuItem
 
-class Cart:
-    """Giỏ hàng sử dụng session"""
+
+def to_cents(amount):
+    """Đổi số tiền sang số nguyên xu để lưu gọn"""
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def from_cents(cents):
+    return Decimal(cents) / 100
+
+
+def price_cache_key(menu_item_id):
+    return f"restaurant:price:{menu_item_id}"
+
+
+def current_prices(menu_item_ids):
+    """Giá hiện tại của các món: {id: (đơn giá xu, còn hàng, tên)}
+
+    Đọc từ cache bằng một lần get_many, món chưa có trong cache được lấy
+    bằng một truy vấn. Món đã bị xóa không có trong kết quả.
+    """
+    keys = {
+        price_cache_key(menu_item_id): menu_item_id
+        for menu_item_id in menu_item_ids
+    }
+    prices = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    missing = [
+        menu_item_id
+        for menu_item_id in menu_item_ids
+        if menu_item_id not in prices
+    ]
+    if missing:
+        fresh = {
+            menu_item.id: (
+                to_cents(menu_item.get_price),
+                menu_item.is_available,
+                menu_item.name,
+            )
+            for menu_item in MenuItem.objects.filter(id__in=missing).only(
+                "id", "name", "price", "discount_price", "is_available"
+            )
+        }
+        cache.set_many(
+            {
+                price_cache_key(menu_item_id): value
+                for menu_item_id, value in fresh.items()
+            },
+            get_cache_timeout(),
+        )
+        prices.update(fresh)
+    return prices
+
+
+def forget_prices(menu_item_ids):
+    """Xóa giá đã cache khi món thay đổi"""
+    cache.delete_many(
+        [price_cache_key(menu_item_id) for menu_item_id in menu_item_ids]
+    )
+
+
+class SessionCartStorage:
+    """Giỏ hàng trong session: {id món: [số lượng, đơn giá xu]}
+
+    Mỗi lần thay đổi ghi lại cả session; phù hợp khi không muốn thêm bảng.
+    """
 
     def __init__(self, request):
         self.session = request.session
-        cart = self.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            cart = self.session[settings.CART_SESSION_ID] = {}
-        self.cart = cart
-
-    def add(self, menu_item, quantity=1, override_quantity=False):
-        """Thêm món vào giỏ hàng"""
-        menu_item_id = str(menu_item.id)
-        if menu_item_id not in self.cart:
-            self.cart[menu_item_id] = {
-                "quantity": 0,
-                "price": str(menu_item.get_price),
+        lines = self.session.get(settings.CART_SESSION_ID)
+        self.data = lines if isinstance(lines, dict) else {}
+        if any(isinstance(line, dict) for line in self.data.values()):
+            # Định dạng cũ: {"quantity": ..., "price": "..."}
+            self.data = {
+                menu_item_id: [line["quantity"], to_cents(line["price"])]
+                for menu_item_id, line in self.data.items()
             }
+            self._save()
+
+    def lines(self):
+        return {
+            int(menu_item_id): tuple(line)
+            for menu_item_id, line in self.data.items()
+        }
+
+    def add(self, menu_item_id, quantity, unit_price, override=False):
+        line = self.data.setdefault(str(menu_item_id), [0, unit_price])
+        line[0] = quantity if override else line[0] + quantity
+        self._save()
+
+    def remove(self, menu_item_id):
+        if self.data.pop(str(menu_item_id), None) is not None:
+            self._save()
+
+    def update_prices(self, prices):
+        for menu_item_id, unit_price in prices.items():
+            self.data[str(menu_item_id)][1] = unit_price
+        self._save()
+
+    def clear(self):
+        self.session.pop(settings.CART_SESSION_ID, None)
+        self.session.pop(settings.CART_SUMMARY_SESSION_ID, None)
+        self.data = {}
+
+    def summary(self):
+        """(tổng số lượng, tổng tiền xu), đọc từ bản lưu sẵn trong session"""
+        if not self.data:
+            return 0, 0
+        summary = self.session.get(settings.CART_SUMMARY_SESSION_ID)
+        if summary is None:
+            return self._summarize()
+        return summary
+
+    def quantity(self, menu_item_id):
+        return self.data.get(str(menu_item_id), [0])[0]
+
+    def _summarize(self):
+        return (
+            sum(quantity for quantity, _ in self.data.values()),
+            sum(quantity * price for quantity, price in self.data.values()),
+        )
+
+    def _save(self):
+        self.session[settings.CART_SESSION_ID] = self.data
+        self.session[settings.CART_SUMMARY_SESSION_ID] = self._summarize()
+
+    @classmethod
+    def merge_on_login(cls, request, user):
+        # Dữ liệu session được giữ nguyên khi đăng nhập, không cần gộp
+        pass
+
+
+class DatabaseCartStorage:
+    """Giỏ hàng trong bảng CartLine, mỗi món một dòng
+
+    Thêm/xóa món chỉ đụng tới một dòng; session chỉ giữ token giỏ của
+    khách chưa đăng nhập. Tổng số lượng và tổng tiền được cache theo giỏ
+    để thanh menu không phải truy vấn ở mỗi trang.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    @staticmethod
+    def user_key(user):
+        return f"u:{user.pk}"
+
+    @staticmethod
+    def summary_cache_key(cart_key):
+        return f"restaurant:cart:{cart_key}"
 
-        if override_quantity:
-            self.cart[menu_item_id]["quantity"] = quantity
-        else:
-            self.cart[menu_item_id]["quantity"] += quantity
+    @property
+    def key(self):
+        user = getattr(self.request, "user", None)
+        if user is not None and user.is_authenticated:
+            return self.user_key(user)
+        token = self.request.session.get(settings.CART_SESSION_ID)
+        return f"a:{token}" if isinstance(token, str) else None
 
-        self.save()
+    def _key_for_write(self):
+        key = self.key
+        if key is None:
+            token = uuid.uuid4().hex
+            self.request.session[settings.CART_SESSION_ID] = token
+            key = f"a:{token}"
+        return key
 
-    def save(self):
-        """Lưu giỏ hàng vào session"""
-        self.session.modified = True
+    def _changed(self, key):
+        cache.delete(self.summary_cache_key(key))
+
+    def lines(self):
+        key = self.key
+        if key is None:
+            return {}
+        return {
+            menu_item_id: (quantity, unit_price)
+            for menu_item_id, quantity, unit_price in CartLine.objects.filter(
+                cart_key=key
+            ).values_list("menu_item_id", "quantity", "unit_price")
+        }
+
+    def add(self, menu_item_id, quantity, unit_price, override=False):
+        key = self._key_for_write()
+        line = CartLine.objects.filter(cart_key=key, menu_item_id=menu_item_id)
+        new_quantity = quantity if override else F("quantity") + quantity
+        if not line.update(quantity=new_quantity, updated_at=timezone.now()):
+            try:
+                with transaction.atomic():
+                    CartLine.objects.create(
+                        cart_key=key,
+                        menu_item_id=menu_item_id,
+                        quantity=quantity,
+                        unit_price=unit_price,
+                    )
+            except IntegrityError:
+                # Request khác vừa tạo dòng này, cộng dồn vào đó
+                line.update(quantity=new_quantity, updated_at=timezone.now())
+        self._changed(key)
+
+    def remove(self, menu_item_id):
+        key = self.key
+        if key is not None:
+            CartLine.objects.filter(
+                cart_key=key, menu_item_id=menu_item_id
+            ).delete()
+            self._changed(key)
+
+    def update_prices(self, prices):
+        key = self.key
+        for menu_item_id, unit_price in prices.items():
+            CartLine.objects.filter(
+                cart_key=key, menu_item_id=menu_item_id
+            ).update(unit_price=unit_price)
+        self._changed(key)
+
+    def clear(self):
+        key = self.key
+        if key is not None:
+            CartLine.objects.filter(cart_key=key).delete()
+            self._changed(key)
+
+    def summary(self):
+        key = self.key
+        if key is None:
+            return 0, 0
+        cache_key = self.summary_cache_key(key)
+        summary = cache.get(cache_key)
+        if summary is None:
+            totals = CartLine.objects.filter(cart_key=key).aggregate(
+                count=Sum("quantity"),
+                total=Sum(F("quantity") * F("unit_price")),
+            )
+            summary = (totals["count"] or 0, totals["total"] or 0)
+            cache.set(cache_key, summary, get_cache_timeout())
+        return summary
+
+    def quantity(self, menu_item_id):
+        key = self.key
+        if key is None:
+            return 0
+        return (
+            CartLine.objects.filter(cart_key=key, menu_item_id=menu_item_id)
+            .values_list("quantity", flat=True)
+            .first()
+            or 0
+        )
+
+    @classmethod
+    def merge_on_login(cls, request, user):
+        """Gộp giỏ của khách chưa đăng nhập vào giỏ của tài khoản"""
+        token = request.session.pop(settings.CART_SESSION_ID, None)
+        if isinstance(token, str):
+            merge_carts(f"a:{token}", cls.user_key(user))
+
+
+@transaction.atomic
+def merge_carts(source_key, target_key):
+    """Chuyển các dòng của giỏ source sang giỏ target
+
+    Món đã có trong target được cộng số lượng, còn lại chỉ đổi cart_key.
+    Trả về số dòng đã chuyển.
+    """
+    lines = list(
+        CartLine.objects.filter(cart_key=source_key).values_list(
+            "menu_item_id", "quantity"
+        )
+    )
+    if not lines:
+        return 0
+
+    now = timezone.now()
+    existing = set(
+        CartLine.objects.filter(
+            cart_key=target_key,
+            menu_item_id__in=[menu_item_id for menu_item_id, _ in lines],
+        ).values_list("menu_item_id", flat=True)
+    )
+    for menu_item_id, quantity in lines:
+        if menu_item_id in existing:
+            CartLine.objects.filter(
+                cart_key=target_key, menu_item_id=menu_item_id
+            ).update(quantity=F("quantity") + quantity, updated_at=now)
+    CartLine.objects.filter(
+        cart_key=source_key, menu_item_id__in=existing
+    ).delete()
+    CartLine.objects.filter(cart_key=source_key).update(
+        cart_key=target_key, updated_at=now
+    )
+    cache.delete_many(
+        [
+            DatabaseCartStorage.summary_cache_key(source_key),
+            DatabaseCartStorage.summary_cache_key(target_key),
+        ]
+    )
+    return len(lines)
+
+
+def get_cart_storage_class():
+    """Backend lưu giỏ hàng theo settings.CART_STORAGE_BACKEND"""
+    return import_string(
+        getattr(
+            settings,
+            "CART_STORAGE_BACKEND",
+            "restaurant.cart.DatabaseCartStorage",
+        )
+    )
+
+
+class Cart:
+    """Giỏ hàng của request, dữ liệu nằm trong backend lưu trữ
+
+    Danh sách món chỉ được truy vấn một lần mỗi request; số lượng và
+    tổng tiền lấy từ bản tổng hợp của backend.
+    """
+
+    def __init__(self, request):
+        self.storage = get_cart_storage_class()(request)
+        self._items = None
+
+    def add(self, menu_item, quantity=1, override_quantity=False):
+        """Thêm món vào giỏ hàng"""
+        self.storage.add(
+            menu_item.id,
+            quantity,
+            to_cents(menu_item.get_price),
+            override=override_quantity,
+        )
+        self._items = None
 
     def remove(self, menu_item):
         """Xóa món khỏi giỏ hàng"""
-        menu_item_id = str(menu_item.id)
-        if menu_item_id in self.cart:
-            del self.cart[menu_item_id]
-            self.save()
+        self.storage.remove(menu_item.id)
+        self._items = None
 
-    def __iter__(self):
-        """Lặp qua các món trong giỏ hàng"""
-        menu_item_ids = self.cart.keys()
-        menu_items = MenuItem.objects.filter(id__in=menu_item_ids)
-        cart = self.cart.copy()
+    def reprice(self):
+        """Đối chiếu giỏ với giá và tình trạng hiện tại của món
+
+        Món đã xóa hoặc hết hàng bị bỏ khỏi giỏ, món đổi giá được cập nhật
+        giá mới. Trả về danh sách (level, message) để báo cho khách; danh
+        sách rỗng nghĩa là giỏ không thay đổi.
+        """
+        lines = self.storage.lines()
+        if not lines:
+            return []
+
+        prices = current_prices(list(lines))
+        notices = []
+        changed = {}
+        for menu_item_id, (quantity, unit_price) in lines.items():
+            current = prices.get(menu_item_id)
+            if current is None or not current[1]:
+                self.storage.remove(menu_item_id)
+                name = current[2] if current else "Một món"
+                notices.append(
+                    (messages.WARNING, f"{name} đã hết, đã bỏ khỏi giỏ hàng")
+                )
+                continue
 
-        for menu_item in menu_items:
-            cart[str(menu_item.id)]["menu_item"] = menu_item
+            new_price, _, name = current
+            if new_price != unit_price:
+                changed[menu_item_id] = new_price
+                notices.append(
+                    (
+                        messages.INFO,
+                        f"Giá {name} đã đổi từ "
+                        f"{from_cents(unit_price):,.0f}đ thành "
+                        f"{from_cents(new_price):,.0f}đ",
+                    )
+                )
+        if changed:
+            self.storage.update_prices(changed)
+        if notices:
+            self._items = None
+        return notices
 
-        for item in cart.values():
-            item["price"] = Decimal(item["price"])
-            item["total_price"] = item["price"] * item["quantity"]
-            yield item
+    def _load_items(self):
+        """Lấy thông tin món trong giỏ (một truy vấn cho mỗi request)"""
+        if self._items is None:
+            lines = self.storage.lines()
+            menu_items = MenuItem.objects.in_bulk(list(lines))
+            self._items = []
+            for menu_item_id, (quantity, unit_price) in lines.items():
+                menu_item = menu_items.get(menu_item_id)
+                if menu_item is None:
+                    continue
+                price = from_cents(unit_price)
+                self._items.append(
+                    {
+                        "menu_item": menu_item,
+                        "quantity": quantity,
+                        "price": price,
+                        "total_price": price * quantity,
+                    }
+                )
+        return self._items
+
+    def __iter__(self):
+        """Lặp qua các món trong giỏ hàng"""
+        return iter(self._load_items())
 
     def __len__(self):
         """Đếm tổng số món trong giỏ"""
-        return sum(item["quantity"] for item in self.cart.values())
+        return self.storage.summary()[0]
 
     def get_total_price(self):
         """Tính tổng giá trị giỏ hàng"""
-        return sum(
-            Decimal(item["price"]) * item["quantity"]
-            for item in self.cart.values()
-        )
+        return from_cents(self.storage.summary()[1])
 
     def clear(self):
         """Xóa toàn bộ giỏ hàng"""
-        del self.session[settings.CART_SESSION_ID]
-        self.save()
+        self.storage.clear()
+        self._items = None
 
     def get_item_quantity(self, menu_item_id):
         """Lấy số lượng của một món"""
-        return self.cart.get(str(menu_item_id), {}).get("quantity", 0)
+        return self.storage.quantity(menu_item_id)
+
+
+def get_cart(request):
+    """Lấy giỏ hàng của request, mỗi request chỉ tạo một lần"""
+    if not hasattr(request, "_cart"):
+        request._cart = Cart(request)
+    return request._cart
@@ -0,0 +1,295 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import BooleanField
+
+from .caching import invalidate_menu_cache
+from .cart import forget_prices
+from .models import Category, MenuItem, MenuItemImage
+from .search import get_search_backend
+
+FORMATS = ("csv", "jsonl")
+# Định dạng khi đọc/ghi qua stdin/stdout mà không chỉ định --format
+STREAM_FORMAT = "jsonl"
+
+BOOLEAN_VALUES = {
+    "1": True,
+    "true": True,
+    "yes": True,
+    "0": False,
+    "false": False,
+    "no": False,
+}
+
+
+def guess_format(path):
+    """Đoán định dạng theo phần mở rộng; '-' (stdin/stdout) là JSON Lines"""
+    if path == "-":
+        return STREAM_FORMAT
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return None
+
+
+def read_rows(stream, fmt):
+    """Đọc từng dòng dữ liệu, trả về (số dòng, dict hoặc lỗi)"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, ValidationError(f"JSON không hợp lệ: {exc}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, ValidationError("Mỗi dòng phải là một object")
+            continue
+        yield line_number, row
+
+
+class RowWriter:
+    """Ghi từng dòng ra CSV hoặc JSON Lines"""
+
+    def __init__(self, stream, fmt, fields):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.DictWriter(stream, fieldnames=fields)
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self.writer.writerow(row)
+        else:
+            self.stream.write(
+                json.dumps(row, ensure_ascii=False, default=str) + "\n"
+            )
+
+
+class CatalogResource:
+    """Mô tả cách nhập/xuất một model của menu
+
+    `fields` là các cột dữ liệu, `relations` là các khóa ngoại được tham
+    chiếu bằng slug (vd. cột `category` chứa slug của danh mục).
+    """
+
+    model = None
+    fields = ()
+    relations = {}
+
+    def __init__(self):
+        # slug -> id của các đối tượng liên quan, dùng lại giữa các chunk
+        self._related_ids = {name: {} for name in self.relations}
+
+    def export_rows(self, chunk_size=2000):
+        lookups = [
+            f"{name}__slug" if name in self.relations else name
+            for name in self.fields
+        ]
+        queryset = (
+            self.model.objects.order_by("pk")
+            .values_list(*lookups)
+            .iterator(chunk_size=chunk_size)
+        )
+        for values in queryset:
+            yield dict(zip(self.fields, values))
+
+    def _load_related(self, rows):
+        """Tra id cho các slug chưa gặp, một truy vấn cho mỗi quan hệ"""
+        for name, model in self.relations.items():
+            known = self._related_ids[name]
+            slugs = {row.get(name) for row in rows} - set(known) - {None, ""}
+            if slugs:
+                known.update(
+                    model.objects.filter(slug__in=slugs).values_list(
+                        "slug", "id"
+                    )
+                )
+
+    def _clean_value(self, field, value):
+        if value is None or value == "":
+            if field.null:
+                value = None
+            elif field.has_default():
+                value = field.get_default()
+            elif field.blank:
+                value = ""
+        elif isinstance(field, BooleanField) and isinstance(value, str):
+            value = BOOLEAN_VALUES.get(value.strip().lower(), value)
+        return field.clean(value, None)
+
+    def build(self, row):
+        """Tạo instance chưa lưu từ một dòng, raise ValidationError nếu sai"""
+        values = {}
+        errors = []
+        for name in self.fields:
+            if name in self.relations:
+                slug = row.get(name)
+                related_id = self._related_ids[name].get(slug)
+                if related_id is None:
+                    errors.append(f"{name}: không tìm thấy '{slug}'")
+                else:
+                    values[f"{name}_id"] = related_id
+                continue
+
+            field = self.model._meta.get_field(name)
+            try:
+                values[name] = self._clean_value(field, row.get(name))
+            except ValidationError as exc:
+                errors.append(f"{name}: {'; '.join(exc.messages)}")
+        if errors:
+            raise ValidationError(errors)
+        return self.model(**values)
+
+    def save_chunk(self, objs):
+        raise NotImplementedError
+
+    def finish(self):
+        """Xóa cache menu sau khi nhập (bulk_create không gửi signal)"""
+        invalidate_menu_cache()
+
+    def import_rows(self, rows, chunk_size=1000, on_error=None):
+        """Nhập dữ liệu theo từng chunk, trả về số dòng đã ghi
+
+        Mỗi chunk được kiểm tra trong bộ nhớ rồi ghi bằng một lần
+        bulk_create, dòng lỗi được báo qua on_error(số dòng, thông báo)
+        và bỏ qua.
+        """
+        rows = iter(rows)
+        imported = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            parsed = []
+            for line_number, row in chunk:
+                if isinstance(row, ValidationError):
+                    if on_error:
+                        on_error(line_number, "; ".join(row.messages))
+                else:
+                    parsed.append((line_number, row))
+            self._load_related([row for _, row in parsed])
+
+            objs = {}
+            for line_number, row in parsed:
+                try:
+                    obj = self.build(row)
+                except ValidationError as exc:
+                    if on_error:
+                        on_error(line_number, "; ".join(exc.messages))
+                    continue
+                key = self.row_key(obj)
+                if key in objs and on_error:
+                    on_error(
+                        objs[key][0],
+                        f"bị ghi đè bởi dòng {line_number} cùng khóa",
+                    )
+                objs[key] = (line_number, obj)
+
+            if objs:
+                with transaction.atomic():
+                    self.save_chunk([obj for _, obj in objs.values()])
+                imported += len(objs)
+        return imported
+
+    def row_key(self, obj):
+        return obj.slug
+
+
+class SlugResource(CatalogResource):
+    """Model có slug unique: upsert theo slug"""
+
+    def save_chunk(self, objs):
+        update_fields = [name for name in self.fields if name != "slug"]
+        if any(f.name == "updated_at" for f in self.model._meta.fields):
+            update_fields.append("updated_at")
+        self.model.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["slug"],
+            update_fields=update_fields,
+        )
+
+
+class CategoryResource(SlugResource):
+    model = Category
+    fields = ("slug", "name", "description", "image", "is_active", "order")
+
+
+class MenuItemResource(SlugResource):
+    model = MenuItem
+    fields = (
+        "slug",
+        "name",
+        "category",
+        "description",
+        "recipe",
+        "ingredients",
+        "price",
+        "discount_price",
+        "image",
+        "is_available",
+        "is_featured",
+        "is_vegetarian",
+        "is_spicy",
+        "preparation_time",
+    )
+    relations = {"category": Category}
+
+    def save_chunk(self, objs):
+        super().save_chunk(objs)
+        # bulk_create không gửi post_save nên phải tự cập nhật chỉ mục
+        # và bỏ giá đã cache của các món vừa ghi
+        menu_items = list(
+            MenuItem.objects.filter(slug__in=[obj.slug for obj in objs]).only(
+                "id", "name", "description", "ingredients"
+            )
+        )
+        get_search_backend().index_many(menu_items)
+        forget_prices([menu_item.id for menu_item in menu_items])
+
+
+class MenuItemImageResource(CatalogResource):
+    """Ảnh phụ không có khóa riêng
+
+    Mỗi món xuất hiện trong file được thay toàn bộ bộ ảnh bằng các dòng
+    của món đó.
+    """
+
+    model = MenuItemImage
+    fields = ("menu_item", "image", "caption", "order")
+    relations = {"menu_item": MenuItem}
+
+    def row_key(self, obj):
+        return (obj.menu_item_id, obj.image.name)
+
+    def save_chunk(self, objs):
+        menu_item_ids = {obj.menu_item_id for obj in objs}
+        # Chỉ xóa ảnh cũ ở lần đầu gặp món, các chunk sau chỉ thêm vào
+        fresh = menu_item_ids - self._replaced
+        MenuItemImage.objects.filter(menu_item_id__in=fresh).delete()
+        self._replaced |= fresh
+        MenuItemImage.objects.bulk_create(objs)
+
+    def import_rows(self, rows, chunk_size=1000, on_error=None):
+        self._replaced = set()
+        return super().import_rows(rows, chunk_size, on_error)
+
+
+RESOURCES = {
+    "category": CategoryResource,
+    "menuitem": MenuItemResource,
+    "image": MenuItemImageResource,
+}
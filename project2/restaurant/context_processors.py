@@ -1,6 +1,7 @@
-from .cart import Cart
+from django.utils.functional import SimpleLazyObject
+from .cart import get_cart
 
 
 def cart(request):
-    """Làm cho cart có thể truy cập từ mọi template"""
-    return {"cart": Cart(request)}
+    """Làm cho cart có thể truy cập từ mọi template (chỉ tạo khi dùng tới)"""
+    return {"cart": SimpleLazyObject(lambda: get_cart(request))}
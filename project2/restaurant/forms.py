@@ -46,6 +46,12 @@ class MenuItemSearchForm(forms.Form):
             attrs={"class": "form-control", "placeholder": "Giá đến"}
         ),
     )
+    min_rating = forms.ChoiceField(
+        required=False,
+        choices=[("", "Mọi đánh giá")]
+        + [(i, f"Từ {i} sao") for i in range(4, 0, -1)],
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
     vegetarian = forms.BooleanField(
         required=False,
         widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
@@ -0,0 +1,136 @@
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from taskqueue.queue import task
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_CACHE_PREFIX = "images:derivatives"
+
+
+def get_variant_widths():
+    return tuple(getattr(settings, "IMAGE_VARIANT_WIDTHS", (320, 640, 1280)))
+
+
+def get_webp_quality():
+    return getattr(settings, "IMAGE_WEBP_QUALITY", 80)
+
+
+def derivative_name(name, width, ext):
+    """Tên file bản thu nhỏ, cạnh ảnh gốc: menu/pho.jpg -> menu/pho.w320.webp"""
+    root, _ = posixpath.splitext(name)
+    return f"{root}.w{width}.{ext}"
+
+
+def fallback_ext(name):
+    """Phần mở rộng của bản thu nhỏ không phải WebP (giữ nền trong suốt)"""
+    ext = posixpath.splitext(name)[1].lower()
+    return "png" if ext in (".png", ".gif") else "jpg"
+
+
+def _save(image, name, fmt, storage, **params):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **params)
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def generate_derivatives(name, storage=default_storage, force=False):
+    """Tạo bản thu nhỏ JPEG/PNG và WebP cho ảnh `name`
+
+    Chỉ thu nhỏ, không phóng to: bỏ qua chiều rộng lớn hơn ảnh gốc. Bản
+    đã tồn tại được giữ nguyên trừ khi force. Trả về tuple các chiều rộng đã có đủ bản thu nhỏ. Hàm không
+    đụng tới DB nên chạy được trong process pool.
+    """
+    widths = get_variant_widths()
+    ext = fallback_ext(name)
+    expected = [
+        derivative_name(name, width, fmt)
+        for width in widths
+        for fmt in (ext, "webp")
+    ]
+    if not force and all(storage.exists(path) for path in expected):
+        return widths
+
+    try:
+        with storage.open(name) as source:
+            original = Image.open(source)
+            original = ImageOps.exif_transpose(original)
+            original.load()
+    except (OSError, UnidentifiedImageError) as exc:
+        logger.warning("Không đọc được ảnh %s: %s", name, exc)
+        return ()
+
+    if ext == "png":
+        formats = [("PNG", "png", {"optimize": True})]
+    else:
+        formats = [("JPEG", "jpg", {"quality": 85, "optimize": True})]
+        if original.mode not in ("RGB", "L"):
+            original = original.convert("RGB")
+    formats.append(("WEBP", "webp", {"quality": get_webp_quality()}))
+
+    done = []
+    for width in widths:
+        if width > original.width:
+            # Ảnh gốc hẹp hơn: bỏ qua để srcset không khai sai chiều rộng,
+            # xoá bản cũ (nếu có) mang nhãn chiều rộng này
+            for _, fmt_ext, _ in formats:
+                path = derivative_name(name, width, fmt_ext)
+                if storage.exists(path):
+                    storage.delete(path)
+            continue
+        resized = original.copy()
+        resized.thumbnail((width, width * 4), Image.LANCZOS)
+        for fmt, fmt_ext, params in formats:
+            path = derivative_name(name, width, fmt_ext)
+            if force or not storage.exists(path):
+                _save(resized, path, fmt, storage, **params)
+        done.append(width)
+    return tuple(done)
+
+
+def _cache_key(name):
+    return f"{DERIVATIVE_CACHE_PREFIX}:{name}"
+
+
+def remember_derivatives(name, widths):
+    # Kết quả rỗng chỉ nhớ ngắn để thấy ngay khi worker xử lý xong
+    cache.set(_cache_key(name), tuple(widths), None if widths else 60)
+
+
+def available_widths(name, storage=default_storage):
+    """Các chiều rộng đã có bản thu nhỏ, ghi nhớ trong cache
+
+    Ảnh chưa được xử lý trả về tuple rỗng để template dùng ảnh gốc.
+    """
+    widths = cache.get(_cache_key(name))
+    if widths is None:
+        ext = fallback_ext(name)
+        widths = tuple(
+            width
+            for width in get_variant_widths()
+            if storage.exists(derivative_name(name, width, ext))
+            and storage.exists(derivative_name(name, width, "webp"))
+        )
+        remember_derivatives(name, widths)
+    return widths
+
+
+@task
+def process_image(name):
+    """Tạo bản thu nhỏ rồi cập nhật cache, chạy trong worker nền"""
+    remember_derivatives(name, generate_derivatives(name))
+
+
+def schedule_derivatives(field_file):
+    """Đưa ảnh vào hàng đợi tác vụ nền để tạo bản thu nhỏ"""
+    if field_file and field_file.name:
+        process_image.delay(field_file.name)
@@ -0,0 +1,122 @@
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from restaurant.cart import Cart
+from restaurant.models import CartLine, MenuItem
+
+BACKENDS = {
+    "session": "restaurant.cart.SessionCartStorage",
+    "database": "restaurant.cart.DatabaseCartStorage",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian thêm và xóa một món vào giỏ đang có 1 và 100 món, "
+        "với giỏ trong session và giỏ trong bảng CartLine; mỗi lần đo "
+        "gồm cả đọc và ghi session như một request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lines",
+            type=int,
+            nargs="+",
+            default=[1, 100],
+            help="Số món có sẵn trong giỏ",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=100, help="Số lần đo mỗi thao tác"
+        )
+
+    def handle(self, *args, **options):
+        needed = max(options["lines"]) + 1
+        menu_items = list(
+            MenuItem.objects.filter(is_available=True).order_by("pk")[:needed]
+        )
+        if len(menu_items) < needed:
+            raise CommandError(
+                f"Cần ít nhất {needed} món đang bán, chạy generate_load_data "
+                f"--menu-items trước"
+            )
+
+        self.store_class = import_module(settings.SESSION_ENGINE).SessionStore
+        self.factory = RequestFactory()
+        self.stdout.write(
+            f"{options['repeat']} lần đo, trung vị µs (số truy vấn)"
+        )
+        self.stdout.write(
+            f"{'backend':<10}{'số món':>8}{'thêm':>16}{'xóa':>16}"
+        )
+        for name, backend in BACKENDS.items():
+            with override_settings(CART_STORAGE_BACKEND=backend):
+                for count in options["lines"]:
+                    add, remove = self.measure(
+                        menu_items[:count], menu_items[-1], options["repeat"]
+                    )
+                    self.stdout.write(
+                        f"{name:<10}{count:>8}"
+                        + "".join(
+                            f"{elapsed * 1e6:>11.0f} ({queries})"
+                            for elapsed, queries in (add, remove)
+                        )
+                    )
+
+    def request(self, key):
+        request = self.factory.post("/")
+        request.session = self.store_class(key)
+        request.user = AnonymousUser()
+        return request
+
+    def respond(self, request):
+        # Như SessionMiddleware: chỉ ghi session khi có thay đổi
+        if request.session.modified:
+            request.session.save()
+        return request.session.session_key
+
+    def measure(self, lines, extra, repeat):
+        """Giỏ có sẵn `lines`, đo thêm rồi xóa món `extra`"""
+        request = self.request(None)
+        cart = Cart(request)
+        for menu_item in lines:
+            cart.add(menu_item)
+        key = self.respond(request)
+        try:
+
+            def add():
+                request = self.request(key)
+                Cart(request).add(extra)
+                self.respond(request)
+
+            def remove():
+                request = self.request(key)
+                Cart(request).remove(extra)
+                self.respond(request)
+
+            # Xen kẽ thêm và xóa để giỏ luôn trở về đúng số món ban đầu
+            results = {add: ([], 0), remove: ([], 0)}
+            for _ in range(repeat):
+                for run, (timings, _) in results.items():
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        run()
+                        timings.append(time.perf_counter() - started)
+                    results[run] = (timings, len(queries))
+            return [
+                (statistics.median(timings), queries)
+                for timings, queries in results.values()
+            ]
+        finally:
+            session = self.store_class(key)
+            token = session.get(settings.CART_SESSION_ID)
+            if isinstance(token, str):
+                CartLine.objects.filter(cart_key=f"a:{token}").delete()
+            session.delete()
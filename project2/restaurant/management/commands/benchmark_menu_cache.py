@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from restaurant.caching import invalidate_menu_cache
+from restaurant.models import MenuItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian và số truy vấn của trang chủ và trang menu khi cache "
+        "menu vừa bị làm mới (như sau khi sửa món) và khi cache đã có sẵn"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="*", help="Đường dẫn cần đo (mặc định: / và /menu/)"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Số lần đo mỗi trang"
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host gửi kèm request, phải nằm trong ALLOWED_HOSTS",
+        )
+
+    def handle(self, *args, **options):
+        if not MenuItem.objects.exists():
+            raise CommandError(
+                "Chưa có món ăn, chạy generate_load_data --menu-items trước"
+            )
+
+        client = Client(HTTP_HOST=options["host"])
+        paths = options["paths"] or [
+            reverse("restaurant:home"),
+            reverse("restaurant:menu_list"),
+            reverse("restaurant:menu_list") + "?sort=price",
+        ]
+        self.stdout.write(
+            f"{MenuItem.objects.count()} món, {options['repeat']} lần đo"
+        )
+        self.stdout.write(
+            f"{'trang':<24}{'cache mới (ms, truy vấn)':>28}"
+            f"{'cache có sẵn (ms, truy vấn)':>32}"
+        )
+        for path in paths:
+            cold = self.measure(
+                client, path, options["repeat"], invalidate_menu_cache
+            )
+            warm = self.measure(client, path, options["repeat"])
+            self.stdout.write(
+                f"{path:<24}"
+                + "".join(
+                    f"{elapsed * 1000:>20.1f}{queries:>8}"
+                    for elapsed, queries in (cold, warm)
+                )
+            )
+
+    def measure(self, client, path, repeat, before=None):
+        """Trung vị thời gian và số truy vấn của một request"""
+        client.get(path)
+        timings = []
+        queries = 0
+        for _ in range(repeat):
+            if before:
+                before()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = client.get(path)
+                timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise CommandError(f"{path}: HTTP {response.status_code}")
+            queries = len(context.captured_queries)
+        return statistics.median(timings), queries
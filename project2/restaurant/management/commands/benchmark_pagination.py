@@ -0,0 +1,82 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+
+from restaurant.models import MenuItem
+from restaurant.pagination import CursorPaginator
+from restaurant.views import MENU_SORTS
+
+DEPTHS = [1, 10, 100, 1000, 5000]
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian lấy trang theo cursor ở các độ sâu khác nhau, so với "
+        "phân trang OFFSET"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--per-page", type=int, default=12)
+        parser.add_argument(
+            "--sort",
+            action="append",
+            choices=MENU_SORTS,
+            help="Mặc định: tất cả",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Số lần đo mỗi trang"
+        )
+
+    def handle(self, *args, **options):
+        queryset = MenuItem.objects.filter(is_available=True)
+        per_page = options["per_page"]
+        pages = -(-queryset.count() // per_page)
+        depths = [depth for depth in DEPTHS if depth <= pages] or [1]
+        if not pages:
+            raise CommandError(
+                "Chưa có món ăn, chạy generate_load_data --menu-items trước"
+            )
+
+        self.stdout.write(f"{pages} trang x {per_page} món, đơn vị ms")
+        self.stdout.write(
+            f"{'sắp xếp':<12}{'kiểu':<8}"
+            + "".join(f"{f'trang {d}':>12}" for d in depths)
+        )
+        for ordering in options["sort"] or MENU_SORTS:
+            cursors = self.collect_cursors(queryset, ordering, per_page)
+            paginator = CursorPaginator(queryset, ordering, per_page)
+            offset = Paginator(queryset.order_by(ordering, "pk"), per_page)
+            rows = (
+                ("cursor", lambda d: list(paginator.page(cursors[d]))),
+                ("offset", lambda d: list(offset.page(d).object_list)),
+            )
+            for kind, fetch in rows:
+                cells = [
+                    self.measure(fetch, depth, options["repeat"])
+                    for depth in depths
+                ]
+                self.stdout.write(
+                    f"{ordering:<12}{kind:<8}"
+                    + "".join(f"{cell * 1000:>12.2f}" for cell in cells)
+                )
+
+    def collect_cursors(self, queryset, ordering, per_page):
+        """Đi lần lượt qua mọi trang, ghi lại cursor dẫn tới mỗi trang"""
+        paginator = CursorPaginator(queryset, ordering, per_page)
+        cursors = {1: None}
+        page, number = paginator.page(), 1
+        while page.has_next:
+            number += 1
+            cursors[number] = page.next_cursor
+            page = paginator.page(page.next_cursor)
+        return cursors
+
+    def measure(self, fetch, depth, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fetch(depth)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.models import MenuItem
+from restaurant.pagination import CursorPaginator
+from restaurant.search import IcontainsSearchBackend, get_search_backend
+
+QUERIES = ["phở", "gà", "bún bò", "nướng", "1", "12", "123"]
+
+
+class Command(BaseCommand):
+    help = (
+        "So sánh thời gian tìm kiếm (đếm + trang đầu) giữa backend hiện tại "
+        "và icontains trên dữ liệu đang có"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "queries", nargs="*", help="Từ khóa cần đo (mặc định: bộ mẫu)"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Số lần đo mỗi truy vấn"
+        )
+        parser.add_argument("--per-page", type=int, default=12)
+
+    def handle(self, *args, **options):
+        total = MenuItem.objects.filter(is_available=True).count()
+        if not total:
+            raise CommandError(
+                "Chưa có món ăn, chạy generate_load_data --menu-items trước"
+            )
+
+        backends = (
+            ("index", get_search_backend()),
+            ("icontains", IcontainsSearchBackend()),
+        )
+        self.stdout.write(f"{total} món đang bán, {options['repeat']} lần đo")
+        self.stdout.write(
+            f"{'từ khóa':<12}"
+            + "".join(f"{name + ' (kết quả, ms)':>28}" for name, _ in backends)
+        )
+        for query in options["queries"] or QUERIES:
+            cells = []
+            for _, backend in backends:
+                count, elapsed = self.measure(
+                    backend, query, options["repeat"], options["per_page"]
+                )
+                cells.append(f"{count:>14} {elapsed * 1000:>12.1f}")
+            self.stdout.write(f"{query:<12}" + "".join(cells))
+
+    def measure(self, backend, query, repeat, per_page):
+        """Trung vị thời gian đếm kết quả và lấy trang đầu như menu_list"""
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = backend.filter(
+                MenuItem.objects.filter(is_available=True), query
+            )
+            ordering = (
+                "search_rank"
+                if "search_rank" in queryset.query.annotations
+                else "-created_at"
+            )
+            count = queryset.count()
+            list(CursorPaginator(queryset, ordering, per_page).page())
+            timings.append(time.perf_counter() - started)
+        return count, statistics.median(timings)
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from restaurant.cart import DatabaseCartStorage
+from restaurant.models import CartLine
+
+
+class Command(BaseCommand):
+    help = "Xóa các giỏ hàng lâu không thay đổi"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Số giỏ hàng xóa trong mỗi lần",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expiries = (
+            ("a:", getattr(settings, "CART_ANONYMOUS_EXPIRY_DAYS", 7)),
+            ("u:", getattr(settings, "CART_USER_EXPIRY_DAYS", 30)),
+        )
+        deleted = 0
+        for prefix, days in expiries:
+            cutoff = now - timedelta(days=days)
+            # Cả giỏ hết hạn khi dòng mới nhất của nó đã quá hạn, để không
+            # xóa món cũ khỏi một giỏ vẫn đang được dùng
+            expired_keys = (
+                CartLine.objects.filter(cart_key__startswith=prefix)
+                .values("cart_key")
+                .annotate(last_updated=Max("updated_at"))
+                .filter(last_updated__lt=cutoff)
+                .values_list("cart_key", flat=True)
+            )
+            # Xóa từng lô để không giữ khóa bảng quá lâu
+            while True:
+                keys = list(expired_keys[: options["batch_size"]])
+                if not keys:
+                    break
+                # Bỏ qua giỏ vừa có thay đổi sau khi lấy danh sách
+                active = CartLine.objects.filter(
+                    cart_key__in=keys, updated_at__gte=cutoff
+                ).values("cart_key")
+                count, _ = (
+                    CartLine.objects.filter(cart_key__in=keys)
+                    .exclude(cart_key__in=active)
+                    .delete()
+                )
+                cache.delete_many(
+                    [
+                        DatabaseCartStorage.summary_cache_key(key)
+                        for key in keys
+                    ]
+                )
+                deleted += count
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Đã xóa {deleted} dòng giỏ hàng hết hạn")
+        )
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from restaurant.catalog import (
+    FORMATS,
+    RESOURCES,
+    RowWriter,
+    guess_format,
+)
+
+
+class Command(BaseCommand):
+    help = "Xuất danh mục, món ăn hoặc ảnh món ra CSV/JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=sorted(RESOURCES))
+        parser.add_argument(
+            "--output", default="-", help="File đích, mặc định stdout"
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Mặc định theo đuôi file, jsonl khi ghi ra stdout",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Số dòng đọc từ DB mỗi lần",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        fmt = options["format"] or guess_format(output)
+        if fmt is None:
+            raise CommandError("Không đoán được định dạng, hãy dùng --format")
+
+        resource = RESOURCES[options["model"]]()
+        if output == "-":
+            stream = sys.stdout
+        else:
+            stream = open(output, "w", encoding="utf-8", newline="")
+        try:
+            writer = RowWriter(stream, fmt, resource.fields)
+            total = 0
+            for row in resource.export_rows(options["chunk_size"]):
+                writer.write(row)
+                total += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        if output != "-":
+            self.stdout.write(self.style.SUCCESS(f"Đã xuất {total} dòng"))
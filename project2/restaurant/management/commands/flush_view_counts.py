@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from restaurant.view_counter import view_counter
+
+
+class Command(BaseCommand):
+    help = "Ghi ngay các lượt xem món ăn đang chờ xuống database"
+
+    def handle(self, *args, **options):
+        if not view_counter.buffered:
+            self.stdout.write(
+                "Cache không phải Redis: lượt xem đã được ghi thẳng xuống DB"
+            )
+            return
+        total = view_counter.flush()
+        self.stdout.write(self.style.SUCCESS(f"Đã ghi {total} lượt xem"))
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from restaurant.images import generate_derivatives, remember_derivatives
+from restaurant.models import Category, Chef, MenuItem, MenuItemImage
+
+IMAGE_FIELDS = (
+    (Category, "image"),
+    (MenuItem, "image"),
+    (MenuItemImage, "image"),
+    (Chef, "image"),
+    (User, "avatar"),
+)
+
+
+def build(name, force):
+    """Chạy trong process con: trả về (tên, chiều rộng, lỗi)"""
+    try:
+        return name, generate_derivatives(name, force=force), None
+    except Exception as exc:
+        return name, (), str(exc)
+
+
+class Command(BaseCommand):
+    help = "Tạo bản thu nhỏ và WebP cho toàn bộ ảnh đã có, chạy song song"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Số process xử lý ảnh",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Tạo lại cả các bản thu nhỏ đã tồn tại",
+        )
+
+    def handle(self, *args, **options):
+        names = set()
+        for model, field in IMAGE_FIELDS:
+            names.update(
+                model.objects.exclude(**{f"{field}__isnull": True})
+                .exclude(**{field: ""})
+                .values_list(field, flat=True)
+                .distinct()
+            )
+        names = sorted(names)
+        if not names:
+            self.stdout.write("Không có ảnh nào")
+            return
+
+        workers = max(1, options["workers"])
+        processed = failed = 0
+        # Process con chỉ đọc/ghi file, cache được cập nhật ở process chính
+        with ProcessPoolExecutor(workers, initializer=django.setup) as pool:
+            results = pool.map(
+                build,
+                names,
+                [options["force"]] * len(names),
+                chunksize=max(1, len(names) // (workers * 4)),
+            )
+            for name, widths, error in results:
+                remember_derivatives(name, widths)
+                if widths:
+                    processed += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"{name}: {error or 'không đọc được'}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Đã xử lý {processed}/{len(names)} ảnh bằng {workers} process"
+                + (f", {failed} ảnh lỗi" if failed else "")
+            )
+        )
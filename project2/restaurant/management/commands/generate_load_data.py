@@ -0,0 +1,371 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from accounts.models import CustomerProfile, User
+from orders.models import Order, OrderItem
+from reservations.models import Reservation, Table, TableSlot
+from restaurant.caching import invalidate_menu_cache
+from restaurant.models import Category, MenuItem, Review
+
+DISHES = ["Phở", "Bún", "Cơm", "Gỏi", "Lẩu", "Bánh", "Chả", "Canh", "Mì"]
+PROTEINS = ["bò", "gà", "tôm", "cá", "heo", "vịt", "chay", "hải sản"]
+STYLES = ["nướng", "xào", "hấp", "chiên", "kho", "tái", "sả ớt", "chua ngọt"]
+RESERVATION_TIMES = [time(hour) for hour in (10, 12, 14, 16, 18, 20)]
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """Tạm tắt auto_now/auto_now_add để ghi thời gian rải theo ngày"""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "Sinh dữ liệu lớn (khách, món, đánh giá, đơn, đặt bàn) để test tải"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=12)
+        parser.add_argument("--menu-items", type=int, default=500)
+        parser.add_argument("--reviews", type=int, default=5000)
+        parser.add_argument("--orders", type=int, default=10000)
+        parser.add_argument("--max-order-items", type=int, default=4)
+        parser.add_argument("--reservations", type=int, default=3000)
+        parser.add_argument("--tables", type=int, default=20)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Số ngày trong quá khứ để rải đơn và đặt bàn",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Cùng seed sinh ra cùng dữ liệu; seed khác để sinh thêm",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--password",
+            default="loadtest",
+            help="Mật khẩu chung của các khách được sinh ra",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.options = options
+        self.tag = f"l{options['seed']}"
+        self.now = timezone.now()
+
+        try:
+            with keep_timestamps(User, MenuItem, Review, Order, Reservation):
+                user_ids = self.create_users()
+                menu_items = self.create_menu()
+                self.create_reviews(user_ids, menu_items)
+                self.create_orders(user_ids, menu_items)
+                self.create_reservations(user_ids)
+        except IntegrityError as exc:
+            raise CommandError(
+                f"Dữ liệu với seed {options['seed']} đã tồn tại ({exc}), "
+                f"hãy dùng --seed khác"
+            )
+
+        # bulk_create không gửi signal nên phải tự dựng lại dữ liệu tổng hợp
+        call_command("recompute_ratings", stdout=self.stdout)
+        call_command("rebuild_search_index", stdout=self.stdout)
+        call_command("rebuild_sales_rollups", stdout=self.stdout)
+        invalidate_menu_cache()
+
+    def log(self, message):
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def random_past(self):
+        seconds = self.rng.randint(0, self.options["days"] * 86400)
+        return self.now - timedelta(seconds=seconds)
+
+    def create_users(self):
+        password = make_password(self.options["password"])
+        users = (
+            User(
+                username=f"{self.tag}_user{index}",
+                email=f"{self.tag}_user{index}@example.com",
+                first_name=f"Khách {index}",
+                password=password,
+                role="customer",
+                phone=f"09{self.rng.randint(0, 99999999):08d}",
+                created_at=self.random_past(),
+                updated_at=self.now,
+            )
+            for index in range(self.options["users"])
+        )
+        user_ids = []
+        for batch in batched(users, self.options["batch_size"]):
+            with transaction.atomic():
+                created = User.objects.bulk_create(batch)
+                CustomerProfile.objects.bulk_create(
+                    [CustomerProfile(user=user) for user in created]
+                )
+            user_ids.extend(user.id for user in created)
+        self.log(f"Đã tạo {len(user_ids)} khách hàng")
+        return user_ids
+
+    def create_menu(self):
+        categories = Category.objects.bulk_create(
+            [
+                Category(
+                    name=f"Danh mục {index}",
+                    slug=f"{self.tag}-danh-muc-{index}",
+                    order=index,
+                )
+                for index in range(self.options["categories"])
+            ]
+        )
+
+        menu_items = []
+        for index in range(self.options["menu_items"]):
+            name = " ".join(
+                [
+                    self.rng.choice(DISHES),
+                    self.rng.choice(PROTEINS),
+                    self.rng.choice(STYLES),
+                ]
+            )
+            price = Decimal(self.rng.randint(6, 60) * 5000)
+            created_at = self.random_past()
+            menu_items.append(
+                MenuItem(
+                    name=f"{name} {index}",
+                    slug=f"{self.tag}-mon-{index}",
+                    category=self.rng.choice(categories),
+                    description=f"{name} theo công thức của nhà hàng",
+                    ingredients=", ".join(self.rng.sample(PROTEINS, 2)),
+                    price=price,
+                    discount_price=(
+                        price * Decimal("0.9")
+                        if self.rng.random() < 0.15
+                        else None
+                    ),
+                    image="menu/placeholder.jpg",
+                    is_available=self.rng.random() < 0.95,
+                    is_featured=self.rng.random() < 0.05,
+                    is_vegetarian=self.rng.random() < 0.1,
+                    is_spicy=self.rng.random() < 0.2,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+            )
+        created = []
+        for batch in batched(menu_items, self.options["batch_size"]):
+            created.extend(MenuItem.objects.bulk_create(batch))
+        self.log(f"Đã tạo {len(categories)} danh mục, {len(created)} món")
+        return [(item.id, item.get_price) for item in created]
+
+    def create_reviews(self, user_ids, menu_items):
+        total = min(self.options["reviews"], len(user_ids) * len(menu_items))
+        pairs = set()
+        while len(pairs) < total:
+            pairs.add(
+                (self.rng.choice(user_ids), self.rng.choice(menu_items)[0])
+            )
+
+        reviews = (
+            Review(
+                user_id=user_id,
+                menu_item_id=menu_item_id,
+                rating=self.rng.choices([1, 2, 3, 4, 5], [1, 1, 3, 5, 6])[0],
+                comment="Món ăn ngon, phục vụ nhanh",
+                created_at=self.random_past(),
+            )
+            for user_id, menu_item_id in sorted(pairs)
+        )
+        for batch in batched(reviews, self.options["batch_size"]):
+            Review.objects.bulk_create(batch)
+        self.log(f"Đã tạo {total} đánh giá")
+
+    def order_status(self, created_at):
+        if self.now - created_at < timedelta(hours=2):
+            return self.rng.choice(["pending", "confirmed", "preparing"])
+        return self.rng.choices(["completed", "cancelled"], [9, 1])[0]
+
+    def build_order(self, index, user_ids, menu_items):
+        created_at = self.random_past()
+        count = self.rng.randint(1, self.options["max_order_items"])
+        lines = [
+            (menu_item_id, price, self.rng.randint(1, 3))
+            for menu_item_id, price in self.rng.sample(
+                menu_items, min(count, len(menu_items))
+            )
+        ]
+        subtotal = sum(price * quantity for _, price, quantity in lines)
+        delivery_fee = Decimal(Order.get_delivery_fee(subtotal))
+        status = self.order_status(created_at)
+        order = Order(
+            order_number=f"ORDL{self.options['seed'] % 10000:04d}{index:09d}",
+            customer_id=self.rng.choice(user_ids),
+            order_type=self.rng.choice(["delivery", "pickup", "dine_in"]),
+            status=status,
+            delivery_name=f"Khách {index}",
+            delivery_phone="0900000000",
+            delivery_address="1 Đường Láng, Hà Nội",
+            subtotal=subtotal,
+            delivery_fee=delivery_fee,
+            total_amount=subtotal + delivery_fee,
+            payment_status="paid" if status == "completed" else "pending",
+            created_at=created_at,
+            updated_at=created_at,
+            completed_at=created_at if status == "completed" else None,
+        )
+        return order, lines
+
+    def create_orders(self, user_ids, menu_items):
+        orders = (
+            self.build_order(index, user_ids, menu_items)
+            for index in range(self.options["orders"])
+        )
+        total = 0
+        for batch in batched(orders, self.options["batch_size"]):
+            with transaction.atomic():
+                created = Order.objects.bulk_create(
+                    [order for order, _ in batch]
+                )
+                OrderItem.objects.bulk_create(
+                    [
+                        OrderItem(
+                            order_id=order.id,
+                            menu_item_id=menu_item_id,
+                            quantity=quantity,
+                            price=price,
+                        )
+                        for order, (_, lines) in zip(created, batch)
+                        for menu_item_id, price, quantity in lines
+                    ],
+                    batch_size=self.options["batch_size"],
+                )
+            total += len(created)
+        self.log(f"Đã tạo {total} đơn hàng")
+
+    def create_tables(self):
+        tables = list(Table.objects.filter(is_active=True))
+        missing = self.options["tables"] - len(tables)
+        if missing > 0:
+            tables += Table.objects.bulk_create(
+                [
+                    Table(
+                        number=f"{self.tag}-{index}",
+                        capacity=self.rng.choice([2, 4, 4, 6, 8, 10]),
+                        location=self.rng.choice(["indoor", "outdoor", "vip"]),
+                    )
+                    for index in range(missing)
+                ]
+            )
+        return tables
+
+    def create_reservations(self, user_ids):
+        tables = self.create_tables()
+        today = timezone.localdate()
+        first_day = today - timedelta(days=self.options["days"])
+        span = self.options["days"] + 30
+
+        # Mỗi (bàn, ngày, giờ) chỉ một đặt bàn nên không có khung giờ chồng
+        # lấn, cũng như chưa trùng với đặt bàn đã có trong bảng TableSlot
+        capacity = len(tables) * span * len(RESERVATION_TIMES)
+        total = min(self.options["reservations"], capacity)
+        taken = set(
+            TableSlot.objects.filter(date__gte=first_day).values_list(
+                "table_id", "date", "slot"
+            )
+        )
+        bookings = set()
+        while len(bookings) < total:
+            table = self.rng.choice(tables)
+            day = first_day + timedelta(days=self.rng.randrange(span))
+            start = self.rng.choice(RESERVATION_TIMES)
+            slots = TableSlot.slot_range(start, 2)
+            if any((table.id, day, slot) in taken for slot in slots):
+                continue
+            bookings.add((table, day, start))
+
+        reservations = []
+        for index, (table, day, start) in enumerate(
+            sorted(bookings, key=lambda b: (b[1], b[2], b[0].id))
+        ):
+            if day < today:
+                status = self.rng.choices(
+                    ["completed", "no_show", "cancelled"], [16, 2, 3]
+                )[0]
+            else:
+                status = self.rng.choice(["pending", "confirmed"])
+            created_at = timezone.make_aware(
+                datetime.combine(day, start)
+            ) - timedelta(days=self.rng.randint(1, 14))
+            reservations.append(
+                Reservation(
+                    reservation_number=(
+                        f"RESL{self.options['seed'] % 10000:04d}{index:09d}"
+                    ),
+                    customer_id=self.rng.choice(user_ids),
+                    table=table,
+                    guest_name=f"Khách {index}",
+                    guest_phone="0900000000",
+                    date=day,
+                    time=start,
+                    number_of_guests=self.rng.randint(1, table.capacity),
+                    status=status,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+            )
+
+        for batch in batched(reservations, self.options["batch_size"]):
+            with transaction.atomic():
+                created = Reservation.objects.bulk_create(batch)
+                TableSlot.objects.bulk_create(
+                    [
+                        TableSlot(
+                            reservation_id=reservation.id,
+                            table_id=reservation.table_id,
+                            date=reservation.date,
+                            slot=slot,
+                        )
+                        for reservation in created
+                        if reservation.status in Reservation.BLOCKING_STATUSES
+                        for slot in TableSlot.slot_range(
+                            reservation.time, reservation.duration_hours
+                        )
+                    ],
+                    batch_size=self.options["batch_size"],
+                )
+        self.log(f"Đã tạo {len(reservations)} đặt bàn trên {len(tables)} bàn")
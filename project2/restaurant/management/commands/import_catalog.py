@@ -0,0 +1,58 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from restaurant.catalog import FORMATS, RESOURCES, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Nhập danh mục, món ăn hoặc ảnh món từ CSV/JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=sorted(RESOURCES))
+        parser.add_argument("path", help="Đường dẫn file, '-' để đọc stdin")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Mặc định theo đuôi file, jsonl khi đọc từ stdin",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Số dòng kiểm tra và ghi mỗi lần",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+        if fmt is None:
+            raise CommandError("Không đoán được định dạng, hãy dùng --format")
+
+        errors = 0
+
+        def report(line_number, message):
+            nonlocal errors
+            errors += 1
+            self.stderr.write(f"Dòng {line_number}: {message}")
+
+        resource = RESOURCES[options["model"]]()
+        if path == "-":
+            stream = sys.stdin
+        else:
+            stream = open(path, encoding="utf-8-sig", newline="")
+        try:
+            imported = resource.import_rows(
+                read_rows(stream, fmt),
+                chunk_size=options["chunk_size"],
+                on_error=report,
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        resource.finish()
+
+        message = f"Đã nhập {imported} dòng, {errors} dòng lỗi"
+        if errors:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
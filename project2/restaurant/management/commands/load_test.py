@@ -0,0 +1,250 @@
+import asyncio
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, urlencode
+from urllib.request import (
+    HTTPCookieProcessor,
+    HTTPRedirectHandler,
+    Request,
+    build_opener,
+)
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import User
+from restaurant.models import MenuItem
+from restaurant.views import MENU_SORTS
+
+SEARCH_WORDS = ["phở", "bún", "cơm", "gà", "bò", "tôm", "nướng", "chay"]
+RESERVATION_TIMES = ["11:00", "12:30", "18:00", "19:00", "20:00"]
+
+
+def percentile(values, pct):
+    """Percentile theo nearest-rank trên danh sách đã sắp xếp"""
+    index = max(0, math.ceil(pct / 100 * len(values)) - 1)
+    return values[index]
+
+
+class NoRedirect(HTTPRedirectHandler):
+    """Không theo redirect: 302 sau POST được tính là thành công"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+
+    def record(self, name, elapsed, status):
+        self.latencies[name].append(elapsed)
+        if status is None or status >= 400:
+            self.errors[name][status or "lỗi kết nối"] += 1
+
+    def rows(self):
+        for name, values in self.latencies.items():
+            values = sorted(values)
+            yield (
+                name,
+                len(values),
+                sum(self.errors[name].values()),
+                *(percentile(values, pct) * 1000 for pct in (50, 95, 99)),
+            )
+
+
+class Client:
+    """Một phiên trình duyệt: cookie riêng, gọi HTTP đồng bộ"""
+
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(
+            HTTPCookieProcessor(self.cookies), NoRedirect
+        )
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value
+        return ""
+
+    def request(self, name, path, data=None):
+        body = None
+        if data is not None:
+            body = urlencode(
+                dict(data, csrfmiddlewaretoken=self.csrf_token())
+            ).encode()
+        request = Request(
+            self.base_url + path,
+            data=body,
+            headers={"Referer": self.base_url + path},
+        )
+
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except HTTPError as exc:
+            status = exc.code
+        except (URLError, OSError):
+            status = None
+        self.stats.record(name, time.perf_counter() - start, status)
+        return status
+
+
+class Command(BaseCommand):
+    help = (
+        "Giả lập nhiều khách đồng thời (xem menu, thêm giỏ, đặt món, đặt "
+        "bàn) vào một server đang chạy và báo p50/p95/p99 từng endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--users", type=int, default=20, help="Số khách chạy đồng thời"
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="Số lượt mua hàng của mỗi khách",
+        )
+        parser.add_argument(
+            "--user-prefix",
+            default="l1_user",
+            help="Tiền tố tài khoản do generate_load_data tạo ra",
+        )
+        parser.add_argument("--password", default="loadtest")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        usernames = list(
+            User.objects.filter(
+                username__startswith=options["user_prefix"]
+            ).values_list("username", flat=True)[: options["users"]]
+        )
+        self.menu_items = list(
+            MenuItem.objects.filter(is_available=True).values_list(
+                "id", "slug"
+            )[:1000]
+        )
+        if not usernames or not self.menu_items:
+            raise CommandError(
+                "Chưa có dữ liệu, hãy chạy generate_load_data trước"
+            )
+
+        self.options = options
+        self.stats = Stats()
+        started = time.perf_counter()
+        asyncio.run(self.run(usernames))
+        elapsed = time.perf_counter() - started
+        self.report(elapsed)
+
+    async def run(self, usernames):
+        loop = asyncio.get_running_loop()
+        # urllib là blocking nên mỗi khách cần một thread khi gửi request
+        loop.set_default_executor(ThreadPoolExecutor(len(usernames)))
+        await asyncio.gather(
+            *(
+                self.virtual_user(index, username)
+                for index, username in enumerate(usernames)
+            )
+        )
+
+    async def virtual_user(self, index, username):
+        rng = random.Random(self.options["seed"] * 100003 + index)
+        client = Client(
+            self.options["base_url"], self.stats, self.options["timeout"]
+        )
+
+        async def call(name, path, data=None):
+            return await asyncio.to_thread(client.request, name, path, data)
+
+        await call("login", "/accounts/login/")
+        await call(
+            "login",
+            "/accounts/login/",
+            {"username": username, "password": self.options["password"]},
+        )
+
+        for _ in range(self.options["iterations"]):
+            menu_item_id, slug = rng.choice(self.menu_items)
+            await call("home", "/")
+            await call("menu_list", f"/menu/?sort={rng.choice(MENU_SORTS)}")
+            await call(
+                "menu_search", f"/menu/?q={quote(rng.choice(SEARCH_WORDS))}"
+            )
+            await call("menu_detail", f"/menu/{slug}/")
+            await call(
+                "cart_add",
+                f"/cart/add/{menu_item_id}/",
+                {"quantity": rng.randint(1, 3)},
+            )
+            await call("cart_detail", "/cart/")
+            await call("checkout", "/orders/checkout/")
+            await call(
+                "checkout",
+                "/orders/checkout/",
+                {
+                    "order_type": rng.choice(["delivery", "pickup"]),
+                    "delivery_name": username,
+                    "delivery_phone": "0900000000",
+                    "delivery_address": "1 Đường Láng, Hà Nội",
+                    "delivery_note": "",
+                    "payment_method": "cod",
+                    "coupon_code": "",
+                },
+            )
+            day = timezone.localdate() + timedelta(days=rng.randint(1, 30))
+            await call("reservation", "/reservations/book/")
+            await call(
+                "reservation",
+                "/reservations/book/",
+                {
+                    "guest_name": username,
+                    "guest_phone": "0900000000",
+                    "guest_email": "",
+                    "date": day.isoformat(),
+                    "time": rng.choice(RESERVATION_TIMES),
+                    "number_of_guests": rng.randint(1, 6),
+                    "occasion": "",
+                    "special_request": "",
+                },
+            )
+
+    def report(self, elapsed):
+        rows = sorted(self.stats.rows())
+        total = sum(row[1] for row in rows)
+        self.stdout.write(
+            f"{'Endpoint':<14}{'Số req':>8}{'Lỗi':>6}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        )
+        for name, count, errors, p50, p95, p99 in rows:
+            self.stdout.write(
+                f"{name:<14}{count:>8}{errors:>6}"
+                f"{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}"
+            )
+        for name, errors in sorted(self.stats.errors.items()):
+            if errors:
+                detail = ", ".join(
+                    f"{status}: {count}" for status, count in errors.items()
+                )
+                self.stdout.write(self.style.WARNING(f"{name} lỗi ({detail})"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} request trong {elapsed:.1f}s "
+                f"({total / elapsed:.1f} req/s)"
+            )
+        )
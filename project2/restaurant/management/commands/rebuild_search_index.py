@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from restaurant.models import MenuItem
+from restaurant.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Dựng lại chỉ mục tìm kiếm món ăn"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Số món ghi vào chỉ mục mỗi lần",
+        )
+
+    def handle(self, *args, **options):
+        menu_items = MenuItem.objects.only(
+            "id", "name", "description", "ingredients"
+        ).order_by("id")
+        total = get_search_backend().rebuild(
+            menu_items, batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Đã index {total} món ăn"))
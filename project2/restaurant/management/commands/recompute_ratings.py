@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db.models import (
+    Count,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from restaurant.models import MenuItem, Review
+
+
+class Command(BaseCommand):
+    help = "Tính lại tổng hợp đánh giá của tất cả món ăn"
+
+    def handle(self, *args, **options):
+        reviews = (
+            Review.objects.filter(menu_item=OuterRef("pk"))
+            .order_by()
+            .values("menu_item")
+        )
+        rating_sum = Coalesce(
+            Subquery(
+                reviews.annotate(total=Sum("rating")).values("total"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+        rating_count = Coalesce(
+            Subquery(
+                reviews.annotate(total=Count("id")).values("total"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+        # Cập nhật cả bảng bằng UPDATE, không lặp từng món
+        updated = MenuItem.objects.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+        )
+        MenuItem.objects.update(
+            avg_rating=Coalesce(
+                Cast("rating_sum", FloatField()) / NullIf("rating_count", 0),
+                Value(0.0),
+            )
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Đã tính lại đánh giá cho {updated} món ăn")
+        )
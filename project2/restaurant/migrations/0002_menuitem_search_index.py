@@ -0,0 +1,46 @@
+from django.db import migrations
+
+from restaurant.search import normalize_text
+
+FTS_TABLE = "restaurant_menuitem_fts"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    MenuItem = apps.get_model("restaurant", "MenuItem")
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, description, ingredients, tokenize = 'unicode61')"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} "
+            "(rowid, name, description, ingredients) VALUES (%s, %s, %s, %s)",
+            [
+                (
+                    item.id,
+                    normalize_text(item.name),
+                    normalize_text(item.description),
+                    normalize_text(item.ingredients),
+                )
+                for item in MenuItem.objects.all()
+            ],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:54
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    MenuItem = apps.get_model("restaurant", "MenuItem")
+    Review = apps.get_model("restaurant", "Review")
+    totals = (
+        Review.objects.order_by()
+        .values("menu_item_id")
+        .annotate(rating_sum=Sum("rating"), rating_count=Count("id"))
+    )
+    for row in totals:
+        MenuItem.objects.filter(id=row["menu_item_id"]).update(
+            rating_sum=row["rating_sum"],
+            rating_count=row["rating_count"],
+            avg_rating=row["rating_sum"] / row["rating_count"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0002_menuitem_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="menuitem",
+            name="avg_rating",
+            field=models.FloatField(
+                default=0, editable=False, verbose_name="Điểm trung bình"
+            ),
+        ),
+        migrations.AddField(
+            model_name="menuitem",
+            name="rating_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="Số đánh giá"
+            ),
+        ),
+        migrations.AddField(
+            model_name="menuitem",
+            name="rating_sum",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                fields=["is_available", "-avg_rating"],
+                name="menuitem_avail_rating_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
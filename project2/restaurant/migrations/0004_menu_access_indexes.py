@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0003_menuitem_rating_aggregates"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="menuitem",
+            name="menuitem_avail_rating_idx",
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["-created_at"],
+                name="menuitem_avail_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["price"],
+                name="menuitem_avail_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["-avg_rating"],
+                name="menuitem_avail_rating_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["name"],
+                name="menuitem_avail_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["category", "-created_at"],
+                name="menuitem_cat_avail_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_available", True), ("is_featured", True)
+                ),
+                fields=["-created_at"],
+                name="menuitem_featured_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["menu_item", "-created_at"],
+                name="review_item_created_idx",
+            ),
+        ),
+    ]
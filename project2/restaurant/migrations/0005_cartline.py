@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0004_menu_access_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CartLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cart_key", models.CharField(max_length=40)),
+                ("quantity", models.PositiveIntegerField(default=1)),
+                (
+                    "unit_price",
+                    models.PositiveBigIntegerField(
+                        verbose_name="Đơn giá (xu)"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, db_index=True),
+                ),
+                (
+                    "menu_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="restaurant.menuitem",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Món trong giỏ",
+                "verbose_name_plural": "Món trong giỏ",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("cart_key", "menu_item"),
+                        name="unique_cart_line",
+                    )
+                ],
+            },
+        ),
+    ]
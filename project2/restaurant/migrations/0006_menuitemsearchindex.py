@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:57
+
+import django.db.models.deletion
+import restaurant.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0005_cartline"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MenuItemSearchIndex",
+            fields=[
+                (
+                    "menu_item",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_index",
+                        serialize=False,
+                        to="restaurant.menuitem",
+                    ),
+                ),
+                (
+                    "document",
+                    restaurant.search.MatchField(
+                        db_column="restaurant_menuitem_fts"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "restaurant_menuitem_fts",
+                "managed": False,
+            },
+        ),
+    ]
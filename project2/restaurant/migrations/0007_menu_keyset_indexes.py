@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0006_menuitemsearchindex"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="menuitem",
+            name="menuitem_avail_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="menuitem",
+            name="menuitem_avail_price_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="menuitem",
+            name="menuitem_avail_rating_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="menuitem",
+            name="menuitem_avail_name_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="menuitem",
+            name="menuitem_cat_avail_idx",
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["-created_at", "-id"],
+                name="menuitem_avail_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["price", "id"],
+                name="menuitem_avail_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["-avg_rating", "-id"],
+                name="menuitem_avail_rating_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["name", "id"],
+                name="menuitem_avail_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["category", "-created_at", "-id"],
+                name="menuitem_cat_avail_idx",
+            ),
+        ),
+    ]
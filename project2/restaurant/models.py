@@ -1,7 +1,13 @@
 from django.db import models
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
 from django.utils.text import slugify
 from django.urls import reverse
 from accounts.models import User
+from .search import MatchField
 
 
 class Category(models.Model):
@@ -63,6 +69,16 @@ class MenuItem(models.Model):
         default=15, verbose_name="Thời gian chuẩn bị (phút)"
     )
     views_count = models.IntegerField(default=0, verbose_name="Lượt xem")
+
+    # Tổng hợp đánh giá (được cập nhật qua signal của Review)
+    rating_sum = models.IntegerField(default=0, editable=False)
+    rating_count = models.IntegerField(
+        default=0, editable=False, verbose_name="Số đánh giá"
+    )
+    avg_rating = models.FloatField(
+        default=0, editable=False, verbose_name="Điểm trung bình"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -70,6 +86,45 @@ class MenuItem(models.Model):
         verbose_name = "Món ăn"
         verbose_name_plural = "Món ăn"
         ordering = ["-created_at"]
+        # Hầu hết truy vấn chỉ đọc món còn hàng nên dùng partial index
+        # với điều kiện is_available (SQLite lọc cột boolean trực tiếp,
+        # không dùng được index có is_available làm cột đầu)
+        indexes = [
+            # menu_list: mỗi kiểu sắp xếp một index, kết thúc bằng id để
+            # phân trang keyset theo (cột, id) tìm thẳng trong index
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_available=True),
+                name="menuitem_avail_created_idx",
+            ),
+            models.Index(
+                fields=["price", "id"],
+                condition=models.Q(is_available=True),
+                name="menuitem_avail_price_idx",
+            ),
+            models.Index(
+                fields=["-avg_rating", "-id"],
+                condition=models.Q(is_available=True),
+                name="menuitem_avail_rating_idx",
+            ),
+            models.Index(
+                fields=["name", "id"],
+                condition=models.Q(is_available=True),
+                name="menuitem_avail_name_idx",
+            ),
+            # category_detail, món liên quan trong menu_detail
+            models.Index(
+                fields=["category", "-created_at", "-id"],
+                condition=models.Q(is_available=True),
+                name="menuitem_cat_avail_idx",
+            ),
+            # home: chỉ vài món nổi bật
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(is_featured=True, is_available=True),
+                name="menuitem_featured_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -97,6 +152,28 @@ class MenuItem(models.Model):
         return 0
 
 
+class MenuItemSearchIndex(models.Model):
+    """Bảng ảo FTS5 của SQLiteFTSSearchBackend (rowid = MenuItem.id)
+
+    Bảng được tạo ở migration 0002 và chỉ ghi qua backend tìm kiếm; model
+    chỉ dùng để join khi lọc và xếp hạng kết quả.
+    """
+
+    menu_item = models.OneToOneField(
+        MenuItem,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        related_name="search_index",
+    )
+    # Cột ẩn cùng tên bảng, dùng cho `document__match` và bm25()
+    document = MatchField(db_column="restaurant_menuitem_fts")
+
+    class Meta:
+        managed = False
+        db_table = "restaurant_menuitem_fts"
+
+
 class MenuItemImage(models.Model):
     """Ảnh phụ cho món ăn"""
 
@@ -159,6 +236,150 @@ class Review(models.Model):
         verbose_name_plural = "Đánh giá"
         ordering = ["-created_at"]
         unique_together = ["menu_item", "user"]
+        indexes = [
+            models.Index(
+                fields=["menu_item", "-created_at"],
+                name="review_item_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.menu_item.name} ({self.rating}★)"
+
+
+class CartLine(models.Model):
+    """Một món trong giỏ hàng (backend DatabaseCartStorage)
+
+    `cart_key` là "u:<user id>" với tài khoản hoặc "a:<token>" với khách
+    chưa đăng nhập (token nằm trong session). Giá lưu bằng số nguyên xu.
+    """
+
+    cart_key = models.CharField(max_length=40)
+    menu_item = models.ForeignKey(
+        MenuItem, on_delete=models.CASCADE, related_name="+"
+    )
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.PositiveBigIntegerField(verbose_name="Đơn giá (xu)")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Món trong giỏ"
+        verbose_name_plural = "Món trong giỏ"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart_key", "menu_item"], name="unique_cart_line"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.cart_key}: {self.menu_item_id} x{self.quantity}"
+
+
+# Signal để đồng bộ chỉ mục tìm kiếm khi món ăn thay đổi
+@receiver(post_save, sender=MenuItem)
+def index_menu_item(sender, instance, update_fields=None, **kwargs):
+    from .search import get_search_backend
+
+    # Bỏ qua các lần lưu không đụng tới nội dung được index
+    if update_fields and not {"name", "description", "ingredients"} & set(
+        update_fields
+    ):
+        return
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=MenuItem)
+def unindex_menu_item(sender, instance, **kwargs):
+    from .search import get_search_backend
+
+    get_search_backend().remove(instance.id)
+
+
+def update_menu_item_rating(menu_item_id, rating_delta, count_delta):
+    """Cập nhật tổng hợp đánh giá bằng một câu UPDATE nguyên tử"""
+    new_sum = F("rating_sum") + rating_delta
+    new_count = F("rating_count") + count_delta
+    MenuItem.objects.filter(id=menu_item_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        avg_rating=Coalesce(
+            Cast(new_sum, FloatField()) / NullIf(new_count, 0),
+            Value(0.0),
+        ),
+    )
+
+
+# Signal để giữ tổng hợp đánh giá của món ăn luôn đúng
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, **kwargs):
+    instance._previous_rating = None
+    if instance.pk:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list("menu_item_id", "rating")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def apply_review_rating(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_rating", None)
+    if created or previous is None:
+        update_menu_item_rating(instance.menu_item_id, instance.rating, 1)
+        return
+
+    old_menu_item_id, old_rating = previous
+    if old_menu_item_id == instance.menu_item_id:
+        if old_rating != instance.rating:
+            update_menu_item_rating(
+                instance.menu_item_id, instance.rating - old_rating, 0
+            )
+    else:
+        update_menu_item_rating(old_menu_item_id, -old_rating, -1)
+        update_menu_item_rating(instance.menu_item_id, instance.rating, 1)
+
+
+@receiver(post_delete, sender=Review)
+def revert_review_rating(sender, instance, **kwargs):
+    update_menu_item_rating(instance.menu_item_id, -instance.rating, -1)
+
+
+# Signal để làm mới cache trang menu khi dữ liệu hiển thị thay đổi
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=MenuItem)
+@receiver([post_save, post_delete], sender=Chef)
+@receiver([post_save, post_delete], sender=Review)
+def refresh_menu_cache(sender, **kwargs):
+    from .caching import invalidate_menu_cache
+
+    invalidate_menu_cache()
+
+
+# Signal để bỏ giá đã cache (dùng khi kiểm tra giỏ hàng) khi món thay đổi
+@receiver([post_save, post_delete], sender=MenuItem)
+def forget_menu_item_price(sender, instance, **kwargs):
+    from .cart import forget_prices
+
+    forget_prices([instance.pk])
+
+
+# Signal để tạo bản thu nhỏ/WebP cho ảnh mới tải lên (chạy nền sau commit)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_save, sender=MenuItemImage)
+@receiver(post_save, sender=Chef)
+def build_image_derivatives(sender, instance, update_fields=None, **kwargs):
+    from .images import schedule_derivatives
+
+    if update_fields and "image" not in update_fields:
+        return
+    schedule_derivatives(instance.image)
+
+
+# Signal để gộp giỏ hàng lúc chưa đăng nhập vào giỏ của tài khoản
+@receiver(user_logged_in)
+def merge_anonymous_cart(sender, request, user, **kwargs):
+    from .cart import get_cart_storage_class
+
+    if request is not None:
+        get_cart_storage_class().merge_on_login(request, user)
@@ -0,0 +1,151 @@
+import datetime
+from decimal import Decimal
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+
+
+class InvalidCursor(Exception):
+    """Cursor bị sửa hoặc không đọc được"""
+
+
+class CursorPage:
+    """Một trang kết quả của CursorPaginator"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class CursorPaginator:
+    """Phân trang keyset theo (cột sắp xếp, id)
+
+    Thay vì OFFSET, mỗi trang lấy các dòng có (col, id) đứng sau dòng cuối
+    nên thời gian truy vấn không phụ thuộc vào trang thứ mấy. Cursor là
+    chuỗi đã ký nên người dùng không sửa được.
+    """
+
+    salt = "restaurant.pagination"
+
+    def __init__(self, queryset, ordering, per_page=12):
+        self.queryset = queryset
+        self.descending = ordering.startswith("-")
+        self.field = ordering.lstrip("-")
+        self.per_page = per_page
+
+    def _dump_value(self, value):
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def _load_value(self, value):
+        try:
+            field = self.queryset.model._meta.get_field(self.field)
+        except FieldDoesNotExist:
+            # Cột annotate (vd. search_rank) lưu trực tiếp dạng JSON
+            return value
+        return field.to_python(value)
+
+    def encode_cursor(self, obj, direction):
+        return signing.dumps(
+            {
+                "v": self._dump_value(getattr(obj, self.field)),
+                "id": obj.pk,
+                "d": direction,
+            },
+            salt=self.salt,
+        )
+
+    def decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=self.salt)
+            return self._load_value(data["v"]), data["id"], data["d"]
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidCursor(cursor)
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = "-" if descending else ""
+        return [f"{prefix}{self.field}", f"{prefix}pk"]
+
+    def _seek(self, queryset, value, pk, after, limit):
+        """Lấy tối đa `limit` dòng đứng sau (hoặc trước) mốc theo thứ tự
+
+        Tách làm hai truy vấn đều tìm thẳng trong index (col, id): phần còn
+        lại của nhóm trùng giá trị `col = v AND id > pk`, chưa đủ mới lấy
+        tiếp `col > v`. Gộp thành `col > v OR (col = v AND id > pk)` (hay
+        row value) thì SQLite chỉ dùng được cột đầu của index và phải quét
+        cả nhóm trùng, chậm dần ở trang sâu khi nhiều món cùng giá trị
+        (vd. món chưa có đánh giá).
+        """
+        op = "lt" if self.descending == after else "gt"
+        items = list(
+            queryset.filter(**{self.field: value, f"pk__{op}": pk})[:limit]
+        )
+        if len(items) < limit:
+            items += queryset.filter(**{f"{self.field}__{op}": value})[
+                : limit - len(items)
+            ]
+        return items
+
+    def page(self, cursor=None):
+        direction = "next"
+        if cursor:
+            value, pk, direction = self.decode_cursor(cursor)
+
+        backwards = direction == "prev"
+        queryset = self.queryset.order_by(*self._ordering(reverse=backwards))
+
+        # Lấy dư một dòng để biết còn trang tiếp theo không
+        if cursor:
+            items = self._seek(
+                queryset, value, pk, not backwards, self.per_page + 1
+            )
+        else:
+            items = list(queryset[: self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[: self.per_page]
+        if backwards:
+            items.reverse()
+
+        if not cursor:
+            has_next, has_previous = has_more, False
+        elif backwards:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, True
+
+        return CursorPage(
+            items,
+            next_cursor=(
+                self.encode_cursor(items[-1], "next")
+                if has_next and items
+                else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(items[0], "prev")
+                if has_previous and items
+                else None
+            ),
+        )
@@ -0,0 +1,173 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func, Lookup, Q, TextField, Value
+from django.utils.module_loading import import_string
+
+
+def normalize_text(text):
+    """Chuẩn hóa chuỗi: bỏ dấu tiếng Việt, chữ thường"""
+    if not text:
+        return ""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.lower()
+
+
+def tokenize(text):
+    """Tách chuỗi đã chuẩn hóa thành các từ"""
+    return re.findall(r"\w+", normalize_text(text))
+
+
+class MatchField(TextField):
+    """Cột ẩn của bảng FTS5, hỗ trợ lookup `__match`"""
+
+
+@MatchField.register_lookup
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class BaseSearchBackend:
+    """Interface chung cho các backend tìm kiếm món ăn"""
+
+    def index(self, menu_item):
+        """Cập nhật chỉ mục cho một món"""
+
+    def index_many(self, menu_items):
+        """Cập nhật chỉ mục cho nhiều món (dùng khi nhập hàng loạt)"""
+        for menu_item in menu_items:
+            self.index(menu_item)
+
+    def remove(self, menu_item_id):
+        """Xóa một món khỏi chỉ mục"""
+
+    def rebuild(self, menu_items, batch_size=1000):
+        """Dựng lại toàn bộ chỉ mục, trả về số món đã index"""
+        return 0
+
+    def filter(self, queryset, query):
+        """Lọc queryset theo từ khóa, gắn thêm `search_rank` nếu có"""
+        raise NotImplementedError
+
+
+class IcontainsSearchBackend(BaseSearchBackend):
+    """Backend đơn giản dùng icontains, không cần chỉ mục"""
+
+    def filter(self, queryset, query):
+        return queryset.filter(
+            Q(name__icontains=query)
+            | Q(description__icontains=query)
+            | Q(ingredients__icontains=query)
+        )
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """Backend dùng bảng ảo FTS5 của SQLite (rowid = MenuItem.id)"""
+
+    table = "restaurant_menuitem_fts"
+    # Trọng số bm25 theo thứ tự cột: name, description, ingredients
+    weights = (10.0, 1.0, 2.0)
+
+    def _row(self, menu_item):
+        return (
+            menu_item.id,
+            normalize_text(menu_item.name),
+            normalize_text(menu_item.description),
+            normalize_text(menu_item.ingredients),
+        )
+
+    def index(self, menu_item):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [menu_item.id]
+            )
+            cursor.execute(
+                f"INSERT INTO {self.table} "
+                "(rowid, name, description, ingredients) "
+                "VALUES (%s, %s, %s, %s)",
+                self._row(menu_item),
+            )
+
+    def index_many(self, menu_items):
+        rows = [self._row(menu_item) for menu_item in menu_items]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(row[0],) for row in rows],
+            )
+            self._insert_many(cursor, rows)
+
+    def remove(self, menu_item_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [menu_item_id]
+            )
+
+    def rebuild(self, menu_items, batch_size=1000):
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            batch = []
+            for menu_item in menu_items.iterator(chunk_size=batch_size):
+                batch.append(self._row(menu_item))
+                if len(batch) >= batch_size:
+                    self._insert_many(cursor, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                self._insert_many(cursor, batch)
+                total += len(batch)
+            cursor.execute(
+                f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')"
+            )
+        return total
+
+    def _insert_many(self, cursor, rows):
+        cursor.executemany(
+            f"INSERT INTO {self.table} "
+            "(rowid, name, description, ingredients) "
+            "VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+    def build_match(self, query):
+        """Tạo biểu thức MATCH: mỗi từ là một prefix, nối bằng AND"""
+        return " ".join(f'"{token}"*' for token in tokenize(query))
+
+    def filter(self, queryset, query):
+        match = self.build_match(query)
+        if not match:
+            return queryset
+        # Join với bảng FTS (MenuItemSearchIndex) để MATCH chỉ chạy một
+        # lần cho cả truy vấn, bm25 được tính trên chính các dòng đã khớp
+        return queryset.filter(search_index__document__match=match).annotate(
+            search_rank=Func(
+                F("search_index__document"),
+                *(Value(weight) for weight in self.weights),
+                function="bm25",
+                output_field=FloatField(),
+            )
+        )
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """Trả về backend tìm kiếm theo settings.MENU_SEARCH_BACKEND"""
+    backend_path = getattr(
+        settings,
+        "MENU_SEARCH_BACKEND",
+        "restaurant.search.SQLiteFTSSearchBackend",
+    )
+    return import_string(backend_path)()
@@ -0,0 +1,56 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from restaurant.images import available_widths, derivative_name, fallback_ext
+
+register = template.Library()
+
+
+def _srcset(field_file, widths, ext):
+    return ", ".join(
+        f"{field_file.storage.url(derivative_name(field_file.name, width, ext))}"
+        f" {width}w"
+        for width in widths
+    )
+
+
+@register.simple_tag
+def srcset(field_file, webp=False):
+    """Giá trị srcset cho ảnh, rỗng nếu chưa có bản thu nhỏ
+
+    Dùng: <img src="{{ item.image.url }}" srcset="{% srcset item.image %}">
+    """
+    if not field_file:
+        return ""
+    widths = available_widths(field_file.name)
+    ext = "webp" if webp else fallback_ext(field_file.name)
+    return _srcset(field_file, widths, ext)
+
+
+@register.simple_tag
+def responsive_image(field_file, sizes="100vw", **attrs):
+    """Thẻ <picture> gồm nguồn WebP và ảnh JPEG/PNG theo nhiều kích thước
+
+    Các tham số khác (class, alt, style...) được gắn vào thẻ <img>. Ảnh
+    chưa có bản thu nhỏ được trả về dạng <img> với ảnh gốc.
+
+        {% responsive_image item.image sizes="33vw" alt=item.name %}
+    """
+    if not field_file:
+        return ""
+    attrs.setdefault("loading", "lazy")
+    widths = available_widths(field_file.name)
+    if not widths:
+        return format_html('<img src="{}"{}>', field_file.url, flatatt(attrs))
+
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        _srcset(field_file, widths, "webp"),
+        sizes,
+        field_file.url,
+        _srcset(field_file, widths, fallback_ext(field_file.name)),
+        sizes,
+        flatatt(attrs),
+    )
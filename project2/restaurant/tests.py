@@ -1,3 +1,748 @@
-from django.test import TestCase
+import json
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import User
+from project2.testing import query_budget, query_plan, run_in_processes
+from .cart import get_cart
+from .images import derivative_name, generate_derivatives
+from .models import CartLine, Category, MenuItem, Review
+from .pagination import CursorPaginator
+from .search import get_search_backend
+from .view_counter import ViewCounter, view_counter
+
+
+def create_menu_item(category, name, **fields):
+    fields.setdefault("slug", name.lower().replace(" ", "-"))
+    fields.setdefault("description", "Món ngon")
+    fields.setdefault("price", 50000)
+    return MenuItem.objects.create(category=category, name=name, **fields)
+
+
+class FakeRedis:
+    """Client redis-py giả trong bộ nhớ, đủ các lệnh ViewCounter dùng"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hashes = {}
+
+    def hincrby(self, key, field, amount=1):
+        with self.lock:
+            return self._hincrby(key, field, amount)
+
+    def _hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[str(field)] = fields.get(str(field), 0) + amount
+        return fields[str(field)]
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(str(field))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """MULTI/EXEC: các lệnh xếp hàng rồi chạy liền dưới một khoá"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.commands = []
+
+    def hincrby(self, key, field, amount=1):
+        self.commands.append(lambda: self.client._hincrby(key, field, amount))
+
+    def hgetall(self, key):
+        self.commands.append(lambda: dict(self.client.hashes.get(key, {})))
+
+    def delete(self, key):
+        self.commands.append(
+            lambda: int(self.client.hashes.pop(key, None) is not None)
+        )
+
+    def execute(self):
+        with self.client.lock:
+            return [command() for command in self.commands]
+
+
+def record_views(menu_item_id, count):
+    """Chạy trong process con của ViewCounterTests"""
+    for _ in range(count):
+        view_counter.record(menu_item_id)
+
+
+class SearchBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Món chính", slug="chinh")
+        cls.pho = create_menu_item(
+            cls.category, "Phở bò tái", slug="pho-bo-tai"
+        )
+        cls.bun = create_menu_item(
+            cls.category,
+            "Bún chả",
+            slug="bun-cha",
+            description="Ăn kèm rau sống",
+            ingredients="thịt bò, bún",
+        )
+
+    def search(self, query):
+        return get_search_backend().filter(MenuItem.objects.all(), query)
+
+    def test_accent_insensitive_prefix(self):
+        self.assertEqual(list(self.search("pho")), [self.pho])
+        self.assertEqual(list(self.search("PHỞ b")), [self.pho])
+
+    def test_name_match_ranks_above_ingredients(self):
+        results = list(self.search("bo").order_by("search_rank", "pk"))
+        self.assertEqual(results, [self.pho, self.bun])
+
+    def test_index_follows_save_and_delete(self):
+        self.pho.name = "Hủ tiếu"
+        self.pho.save()
+        self.assertFalse(self.search("pho").exists())
+        self.assertEqual(list(self.search("hu tieu")), [self.pho])
+
+        self.pho.delete()
+        self.assertFalse(self.search("hu tieu").exists())
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        # Nhiều món trùng giá để kiểm tra thứ tự phụ theo id
+        for index in range(25):
+            create_menu_item(
+                category, f"Món {index}", price=10000 * (index % 4)
+            )
+
+    def walk(self, ordering):
+        paginator = CursorPaginator(MenuItem.objects.all(), ordering, 4)
+        page = paginator.page()
+        pages = [page]
+        while page.has_next:
+            page = paginator.page(page.next_cursor)
+            pages.append(page)
+        return paginator, pages
+
+    def test_walks_every_item_once_in_order(self):
+        for ordering in ("price", "-price", "-created_at", "name"):
+            with self.subTest(ordering=ordering):
+                _, pages = self.walk(ordering)
+                seen = [item.pk for page in pages for item in page]
+                expected = list(
+                    MenuItem.objects.order_by(
+                        ordering, ("-" if "-" in ordering else "") + "pk"
+                    ).values_list("pk", flat=True)
+                )
+                self.assertEqual(seen, expected)
+
+    def test_previous_cursor_returns_same_page(self):
+        paginator, pages = self.walk("price")
+        for page, following in zip(pages, pages[1:]):
+            previous = paginator.page(following.previous_cursor)
+            self.assertEqual(list(previous), list(page))
+
+    def test_page_queries_seek_in_index(self):
+        queryset = MenuItem.objects.filter(is_available=True)
+        paginator = CursorPaginator(queryset, "price", 4)
+        cursor = paginator.page().next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            paginator.page(cursor)
+        self.assertEqual(len(queries), 2)
+        with connection.cursor() as cursor:
+            for query in queries:
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plan = " ".join(row[-1] for row in cursor.fetchall())
+                self.assertIn(
+                    "SEARCH restaurant_menuitem USING INDEX "
+                    "menuitem_avail_price_idx",
+                    plan,
+                )
+
+
+class MenuCacheTests(TestCase):
+    """Sửa món hoặc danh mục làm mới cả dữ liệu lẫn fragment đã cache"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Món chính", slug="chinh")
+        cls.item = create_menu_item(
+            cls.category, "Phở bò", slug="pho-bo", is_featured=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        menu_queries = [
+            query
+            for query in queries.captured_queries
+            if '"restaurant_menuitem"' in query["sql"]
+        ]
+        return response.content.decode(), len(menu_queries)
+
+    def test_warm_pages_skip_menu_queries(self):
+        for url in (
+            reverse("restaurant:home"),
+            reverse("restaurant:menu_list"),
+        ):
+            with self.subTest(url=url):
+                _, cold = self.render(url)
+                _, warm = self.render(url)
+                self.assertGreater(cold, 0)
+                self.assertEqual(warm, 0)
+
+    def test_editing_menu_item_refreshes_pages(self):
+        for url in (
+            reverse("restaurant:home"),
+            reverse("restaurant:menu_list"),
+        ):
+            self.assertIn("Phở bò", self.render(url)[0])
+
+        self.item.name = "Phở gà"
+        self.item.price = 65000
+        self.item.save()
+        for url in (
+            reverse("restaurant:home"),
+            reverse("restaurant:menu_list"),
+        ):
+            with self.subTest(url=url):
+                content, _ = self.render(url)
+                self.assertIn("Phở gà", content)
+                self.assertNotIn("Phở bò", content)
+                self.assertIn("65000đ", content)
+
+    def test_editing_category_refreshes_featured_fragment(self):
+        url = reverse("restaurant:home")
+        self.assertIn("Món chính", self.render(url)[0])
+        self.category.name = "Đặc sản"
+        self.category.save()
+        content, _ = self.render(url)
+        self.assertIn("Đặc sản", content)
+        self.assertNotIn("Món chính", content)
+
+    def test_deleting_menu_item_refreshes_pages(self):
+        url = reverse("restaurant:menu_list")
+        self.render(url)
+        self.item.delete()
+        self.assertNotIn("Phở bò", self.render(url)[0])
+
+
+class RatingAggregateTests(TestCase):
+    """Tổng hợp đánh giá lưu trên MenuItem khớp với bảng Review"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        cls.pho = create_menu_item(category, "Phở bò", slug="pho-bo")
+        cls.bun = create_menu_item(category, "Bún chả", slug="bun-cha")
+        cls.users = [
+            User.objects.create_user(f"khach{index}", password="x")
+            for index in range(2)
+        ]
+
+    def review(self, user, rating, menu_item=None):
+        return Review.objects.create(
+            menu_item=menu_item or self.pho,
+            user=user,
+            rating=rating,
+            comment="Ngon",
+        )
+
+    def assertRating(self, menu_item, rating_sum, rating_count, avg_rating):
+        menu_item.refresh_from_db()
+        self.assertEqual(
+            (menu_item.rating_sum, menu_item.rating_count),
+            (rating_sum, rating_count),
+        )
+        self.assertAlmostEqual(menu_item.avg_rating, avg_rating)
+
+    def test_create_edit_move_delete(self):
+        first = self.review(self.users[0], 5)
+        second = self.review(self.users[1], 3)
+        self.assertRating(self.pho, 8, 2, 4.0)
+
+        second.rating = 4
+        second.save()
+        self.assertRating(self.pho, 9, 2, 4.5)
+
+        second.menu_item = self.bun
+        second.save()
+        self.assertRating(self.pho, 5, 1, 5.0)
+        self.assertRating(self.bun, 4, 1, 4.0)
+
+        second.delete()
+        self.assertRating(self.bun, 0, 0, 0.0)
+        first.delete()
+        self.assertRating(self.pho, 0, 0, 0.0)
+
+    def test_recompute_ratings_repairs_drift(self):
+        self.review(self.users[0], 5)
+        self.review(self.users[1], 2)
+        self.review(self.users[0], 4, menu_item=self.bun)
+        # update() bỏ qua signal, giống dữ liệu bị lệch khi nhập thẳng DB
+        MenuItem.objects.update(rating_sum=99, rating_count=7, avg_rating=1)
+        Review.objects.filter(menu_item=self.bun).update(rating=1)
+
+        call_command("recompute_ratings", stdout=StringIO())
+        self.assertRating(self.pho, 7, 2, 3.5)
+        self.assertRating(self.bun, 1, 1, 1.0)
+
+
+class MenuIndexTests(TestCase):
+    """Các truy vấn menu tìm trong index riêng, không sắp xếp tạm"""
+
+    def assertUsesIndex(self, queryset, index=""):
+        plan = query_plan(queryset)
+        self.assertIn(f"USING INDEX {index}", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_menu_queries_use_indexes(self):
+        available = MenuItem.objects.filter(is_available=True)
+        for ordering, index in (
+            (("-created_at", "-id"), "menuitem_avail_created_idx"),
+            (("price", "id"), "menuitem_avail_price_idx"),
+            (("-avg_rating", "-id"), "menuitem_avail_rating_idx"),
+            (("name", "id"), "menuitem_avail_name_idx"),
+        ):
+            with self.subTest(ordering=ordering):
+                self.assertUsesIndex(available.order_by(*ordering)[:12], index)
+        self.assertUsesIndex(
+            available.filter(category_id=1)[:4], "menuitem_cat_avail_idx"
+        )
+        # Không có thống kê, SQLite có thể chọn index theo created_at chung
+        self.assertUsesIndex(available.filter(is_featured=True)[:6])
+        self.assertUsesIndex(
+            Review.objects.filter(menu_item_id=1)[:10],
+            "review_item_created_idx",
+        )
+
+
+class MenuQueryTests(TestCase):
+    """Số truy vấn không tăng theo số món và số đánh giá"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("quanly", password="x")
+        for index in range(3):
+            category = Category.objects.create(
+                name=f"Danh mục {index}", slug=f"danh-muc-{index}"
+            )
+            for number in range(2):
+                cls.item = create_menu_item(
+                    category,
+                    f"Món {index}-{number}",
+                    slug=f"mon-{index}-{number}",
+                )
+        for index in range(5):
+            user = User.objects.create_user(f"khach{index}", password="x")
+            Review.objects.create(
+                menu_item=cls.item, user=user, rating=5, comment="Ngon"
+            )
+
+    def get(self, url, max_queries):
+        with query_budget(max_queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_menu_detail(self):
+        url = reverse("restaurant:menu_detail", args=[self.item.slug])
+        self.get(url, 5)
+
+    def test_admin_changelists(self):
+        self.client.force_login(self.admin)
+        self.get(reverse("admin:restaurant_menuitem_changelist"), 5)
+        self.get(reverse("admin:restaurant_review_changelist"), 4)
+
+
+class CartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        cls.pho = create_menu_item(category, "Phở bò", slug="pho-bo")
+        cls.bun = create_menu_item(category, "Bún chả", slug="bun-cha")
+
+    def test_browsing_does_not_create_session(self):
+        response = self.client.get(reverse("restaurant:home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def setUp(self):
+        # Đo số truy vấn khi cache trang menu còn trống
+        cache.clear()
+
+    def fill_cart(self, items):
+        for item in items:
+            self.client.post(
+                reverse("restaurant:cart_add", args=[item.pk]),
+                {"quantity": 2},
+            )
+
+    def add_more_items(self, count=10):
+        self.fill_cart(
+            create_menu_item(
+                self.pho.category, f"Món {index}", slug=f"mon-{index}"
+            )
+            for index in range(count)
+        )
+
+    def get(self, url, max_queries):
+        with query_budget(max_queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_menu_list_queries(self):
+        self.get(reverse("restaurant:menu_list"), 3)
+        self.get(reverse("restaurant:menu_list") + "?sort=price&q=phở", 3)
+        self.fill_cart([self.pho])
+        self.get(reverse("restaurant:menu_list"), 3)
+
+    def test_cart_detail_queries(self):
+        self.fill_cart([self.pho, self.bun])
+        response = self.get(reverse("restaurant:cart_detail"), 2)
+        self.assertEqual(len(response.context["cart"]), 4)
+        self.add_more_items()
+        response = self.get(reverse("restaurant:cart_detail"), 2)
+        self.assertEqual(len(response.context["cart"]), 24)
+
+    def test_logged_in_queries(self):
+        user = User.objects.create_user("khach", password="x")
+        self.client.force_login(user)
+        self.get(reverse("restaurant:home"), 5)
+        self.get(reverse("restaurant:menu_list"), 5)
+        self.get(reverse("restaurant:cart_detail"), 2)
+        self.fill_cart([self.pho, self.bun])
+        self.get(reverse("restaurant:cart_detail"), 3)
+        self.add_more_items()
+        response = self.get(reverse("restaurant:cart_detail"), 3)
+        self.assertEqual(len(response.context["cart"]), 24)
+
+    def test_cart_is_built_once_and_items_loaded_once(self):
+        for item in (self.pho, self.bun):
+            self.client.post(
+                reverse("restaurant:cart_add", args=[item.pk]),
+                {"quantity": 2},
+            )
+        request = self.client.get(reverse("restaurant:home")).wsgi_request
+        cart = get_cart(request)
+        self.assertIs(get_cart(request), cart)
+        with self.assertNumQueries(2):
+            items = [item for item in cart]
+            self.assertEqual([item for item in cart], items)
+        self.assertEqual(
+            {item["menu_item"] for item in items}, {self.pho, self.bun}
+        )
+        self.assertEqual(len(cart), 4)
+        self.assertEqual(cart.get_total_price(), 200000)
+
+
+class CatalogCommandTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Món chính", slug="chinh")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def import_file(self, model, name, content, **options):
+        """Nhập file, trả về (stdout, stderr) của lệnh"""
+        path = f"{self.directory}/{name}"
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write(content)
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_catalog",
+            model,
+            path,
+            stdout=stdout,
+            stderr=stderr,
+            **options,
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_stdout_defaults_to_json_lines(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            call_command("export_catalog", "category")
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([row["slug"] for row in rows], ["chinh"])
+
+        Category.objects.all().delete()
+        output.seek(0)
+        with mock.patch("sys.stdin", output):
+            call_command("import_catalog", "category", "-", stdout=StringIO())
+        self.assertEqual(
+            list(Category.objects.values_list("slug", "name")),
+            [("chinh", "Món chính")],
+        )
+
+    def test_menu_items_upserted_by_slug(self):
+        pho = create_menu_item(self.category, "Phở bò", slug="pho-bo")
+        self.import_file(
+            "menuitem",
+            "menu.csv",
+            "slug,name,category,description,price,image\n"
+            "pho-bo,Phở bò đặc biệt,chinh,Món ngon,65000,menu/pho.jpg\n"
+            "bun-cha,Bún chả,chinh,Món ngon,45000,menu/bun.jpg\n",
+        )
+
+        self.assertEqual(MenuItem.objects.count(), 2)
+        pho.refresh_from_db()
+        self.assertEqual(pho.name, "Phở bò đặc biệt")
+        self.assertEqual(pho.price, 65000)
+        # Nhập lại món đã có (JSON Lines) chỉ cập nhật, không tạo thêm
+        self.import_file(
+            "menuitem",
+            "menu.jsonl",
+            json.dumps(
+                {
+                    "slug": "bun-cha",
+                    "name": "Bún chả Hà Nội",
+                    "category": "chinh",
+                    "description": "Món ngon",
+                    "price": "50000",
+                    "image": "menu/bun.jpg",
+                },
+                ensure_ascii=False,
+            )
+            + "\n",
+        )
+        self.assertEqual(
+            list(
+                MenuItem.objects.order_by("slug").values_list("slug", "name")
+            ),
+            [("bun-cha", "Bún chả Hà Nội"), ("pho-bo", "Phở bò đặc biệt")],
+        )
+
+    def test_bad_rows_reported_and_skipped(self):
+        stdout, stderr = self.import_file(
+            "menuitem",
+            "menu.csv",
+            "slug,name,category,description,price,image\n"
+            "pho-bo,Phở bò,chinh,Món ngon,50000,menu/pho.jpg\n"
+            "bun-cha,Bún chả,khong-co,Món ngon,45000,menu/bun.jpg\n"
+            "com-ga,Cơm gà,chinh,Món ngon,re lam,menu/com.jpg\n"
+            "mi-xao,Mì xào,chinh,Món ngon,40000,menu/mi.jpg\n",
+            chunk_size=2,
+        )
+
+        self.assertEqual(
+            set(MenuItem.objects.values_list("slug", flat=True)),
+            {"pho-bo", "mi-xao"},
+        )
+        errors = stderr.splitlines()
+        self.assertEqual(len(errors), 2)
+        self.assertIn("Dòng 3: category: không tìm thấy 'khong-co'", errors)
+        self.assertTrue(errors[1].startswith("Dòng 4: price:"))
+        self.assertIn("Đã nhập 2 dòng, 2 dòng lỗi", stdout)
+
+    def test_reimport_replaces_images(self):
+        pho = create_menu_item(
+            self.category, "Phở bò", slug="pho-bo", image="menu/pho.jpg"
+        )
+        pho.images.create(image="menu/gallery/pho-1.jpg", order=1)
+        pho.images.create(image="menu/gallery/pho-2.jpg", order=2)
+
+        self.import_file(
+            "menuitem",
+            "menu.csv",
+            "slug,name,category,description,price,image\n"
+            "pho-bo,Phở bò,chinh,Món ngon,50000,menu/pho-moi.jpg\n",
+        )
+        self.import_file(
+            "image",
+            "images.csv",
+            "menu_item,image,caption,order\n"
+            "pho-bo,menu/gallery/pho-3.jpg,Tô phở,1\n",
+        )
+
+        pho.refresh_from_db()
+        self.assertEqual(pho.image.name, "menu/pho-moi.jpg")
+        self.assertEqual(
+            list(pho.images.values_list("image", "caption")),
+            [("menu/gallery/pho-3.jpg", "Tô phở")],
+        )
+
+
+class ClearExpiredCartsTests(TestCase):
+    def test_expires_whole_carts_only(self):
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        pho = create_menu_item(category, "Phở bò", slug="pho-bo")
+        bun = create_menu_item(category, "Bún chả", slug="bun-cha")
+        for key in ("a:cu", "a:dang-dung"):
+            for item in (pho, bun):
+                CartLine.objects.create(
+                    cart_key=key, menu_item=item, unit_price=5000000
+                )
+        old = timezone.now() - timedelta(days=30)
+        CartLine.objects.filter(cart_key="a:cu").update(updated_at=old)
+        # Giỏ đang dùng có một món cũ và một món vừa thêm
+        CartLine.objects.filter(cart_key="a:dang-dung", menu_item=pho).update(
+            updated_at=old
+        )
+
+        call_command(
+            "clear_expired_carts", "--batch-size=1", stdout=StringIO()
+        )
+
+        self.assertFalse(CartLine.objects.filter(cart_key="a:cu").exists())
+        self.assertEqual(
+            CartLine.objects.filter(cart_key="a:dang-dung").count(), 2
+        )
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = FileSystemStorage(location=directory.name)
+
+    def save_image(self, name, width):
+        buffer = BytesIO()
+        Image.new("RGB", (width, width // 2)).save(buffer, "JPEG")
+        return self.storage.save(name, ContentFile(buffer.getvalue()))
+
+    def width_of(self, name):
+        with self.storage.open(name) as file:
+            return Image.open(file).width
+
+    def test_skips_widths_wider_than_original(self):
+        name = self.save_image("menu/pho.jpg", 700)
+        self.assertEqual(
+            generate_derivatives(name, storage=self.storage), (320, 640)
+        )
+        for width in (320, 640):
+            for ext in ("jpg", "webp"):
+                path = derivative_name(name, width, ext)
+                self.assertEqual(self.width_of(path), width)
+        self.assertFalse(
+            self.storage.exists(derivative_name(name, 1280, "webp"))
+        )
+
+    def test_narrow_original_has_no_derivatives(self):
+        name = self.save_image("menu/nho.jpg", 200)
+        # Bản cũ mang nhãn sai chiều rộng bị xoá khi tạo lại
+        self.storage.save(derivative_name(name, 320, "jpg"), ContentFile(b""))
+        self.assertEqual(
+            generate_derivatives(name, storage=self.storage, force=True), ()
+        )
+        self.assertFalse(
+            self.storage.exists(derivative_name(name, 320, "jpg"))
+        )
+
+
+class ViewCounterTests(TransactionTestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Món chính", slug="chinh")
+        self.item = create_menu_item(category, "Phở bò", slug="pho-bo")
+        view_counter.flush()
+
+    def use_fake_redis(self):
+        client = FakeRedis()
+        for patcher in (
+            mock.patch.object(ViewCounter, "buffered", True),
+            mock.patch.object(ViewCounter, "_client", return_value=client),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_menu_detail_counts_view(self):
+        url = reverse("restaurant:menu_detail", args=[self.item.slug])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.context["menu_item"].views_count, 2)
+        view_counter.flush()
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.views_count, 2)
+
+    def test_no_views_lost_across_processes(self):
+        run_in_processes(
+            "restaurant.tests.record_views", [(self.item.pk, 200)] * 8
+        )
+        view_counter.flush()
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.views_count, 1600)
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://127.0.0.1:6379",
+            }
+        }
+    )
+    def test_buffers_only_with_redis_cache(self):
+        self.assertTrue(view_counter.buffered)
+
+    def test_buffered_menu_detail_does_not_write_views(self):
+        self.use_fake_redis()
+        # Lượt flush của khoảng thời gian này đã có process khác nhận
+        view_counter.cache.set(f"{view_counter.key}:flush", 1)
+        self.addCleanup(view_counter.cache.clear)
+        url = reverse("restaurant:menu_detail", args=[self.item.slug])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.context["menu_item"].views_count, 1)
+        self.assertFalse(
+            [q for q in context.captured_queries if "UPDATE" in q["sql"]]
+        )
+        self.assertEqual(view_counter.pending(self.item.pk), 1)
+
+    def test_concurrent_flushes_apply_each_view_once(self):
+        self.use_fake_redis()
+
+        def record_and_flush():
+            for _ in range(100):
+                view_counter.record(self.item.pk)
+                view_counter.flush()
+            connection.close()
+
+        threads = [threading.Thread(target=record_and_flush) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        view_counter.flush()
+        self.assertEqual(view_counter.pending(self.item.pk), 0)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.views_count, 800)
+
+    def test_failed_flush_keeps_pending_views(self):
+        self.use_fake_redis()
+        view_counter.record(self.item.pk, 3)
+        with mock.patch.object(
+            ViewCounter, "_apply", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                view_counter.flush()
+        self.assertEqual(view_counter.pending(self.item.pk), 3)
+        self.assertEqual(view_counter.flush(), 3)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.views_count, 3)
@@ -0,0 +1,114 @@
+import atexit
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+from django.db.models import F
+from .models import MenuItem
+
+
+class ViewCounter:
+    """Bộ đếm lượt xem món ăn
+
+    Với cache Redis, lượt xem được cộng dồn vào một hash dùng chung cho mọi
+    process (HINCRBY là nguyên tử) và ghi xuống DB theo lô. Mỗi lần flush
+    đọc và xoá hash trong cùng một transaction MULTI/EXEC để nhận trọn phần
+    đang chờ, nên hai process flush cùng lúc không bao giờ ghi trùng, và
+    lượt xem không mất khi worker bị kill vì không nằm trong bộ nhớ process.
+
+    Cache khác (locmem, file) không có phép cộng nguyên tử dùng chung giữa
+    các process, nên mỗi lượt xem được ghi thẳng bằng một câu
+    `UPDATE ... SET views_count = views_count + 1`.
+    """
+
+    key = "menu_item_views"
+    chunk_size = 500
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, "VIEW_COUNT_FLUSH_INTERVAL", 10)
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "VIEW_COUNT_CACHE", "default")]
+
+    @property
+    def buffered(self):
+        # django.core.cache.cache là proxy, phải kiểm tra backend thật
+        return isinstance(self.cache, RedisCache)
+
+    def _client(self):
+        # RedisCache không có API cho hash nên dùng client redis-py
+        return self.cache._cache.get_client(write=True)
+
+    def _key(self):
+        return self.cache.make_and_validate_key(self.key)
+
+    def record(self, menu_item_id, count=1):
+        """Ghi nhận lượt xem, trả về số lượt của món chưa có trong DB"""
+        if not self.buffered:
+            MenuItem.objects.filter(id=menu_item_id).update(
+                views_count=F("views_count") + count
+            )
+            return count
+
+        pending = self._client().hincrby(self._key(), menu_item_id, count)
+        # Mỗi khoảng VIEW_COUNT_FLUSH_INTERVAL chỉ một request (của bất kỳ
+        # process nào) đứng ra flush
+        if self.cache.add(f"{self.key}:flush", 1, timeout=self.flush_interval):
+            self.flush()
+        return pending
+
+    def pending(self, menu_item_id):
+        """Số lượt xem chưa được ghi xuống DB"""
+        if not self.buffered:
+            return 0
+        return int(self._client().hget(self._key(), menu_item_id) or 0)
+
+    def flush(self):
+        """Ghi mọi lượt xem đang chờ xuống DB, trả về tổng số lượt đã ghi"""
+        if not self.buffered:
+            return 0
+        client = self._client()
+        with client.pipeline(transaction=True) as pipe:
+            pipe.hgetall(self._key())
+            pipe.delete(self._key())
+            pending, _ = pipe.execute()
+
+        counts = {
+            int(menu_item_id): int(count)
+            for menu_item_id, count in pending.items()
+        }
+        if not counts:
+            return 0
+        try:
+            self._apply(counts)
+        except Exception:
+            # Trả lại số đếm vào hash để lần flush sau ghi tiếp
+            with client.pipeline(transaction=True) as pipe:
+                for menu_item_id, count in counts.items():
+                    pipe.hincrby(self._key(), menu_item_id, count)
+                pipe.execute()
+            raise
+        return sum(counts.values())
+
+    def _apply(self, counts):
+        # Một câu UPDATE cho mỗi nhóm món có cùng số lượt tăng
+        ids_by_count = defaultdict(list)
+        for menu_item_id, count in counts.items():
+            ids_by_count[count].append(menu_item_id)
+
+        with transaction.atomic():
+            for count, ids in ids_by_count.items():
+                for start in range(0, len(ids), self.chunk_size):
+                    MenuItem.objects.filter(
+                        id__in=ids[start : start + self.chunk_size]
+                    ).update(views_count=F("views_count") + count)
+
+
+view_counter = ViewCounter()
+
+# Ghi nốt các lượt xem đang chờ khi process tắt bình thường
+atexit.register(view_counter.flush)
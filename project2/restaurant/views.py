@@ -1,97 +1,160 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Avg, Count
-from django.core.paginator import Paginator
+from django.http import Http404
 from django.views.decorators.http import require_POST
 from .models import MenuItem, Category, Chef, Review
-from .cart import Cart
+from .cart import get_cart
+from .caching import (
+    get_menu_cache_version,
+    get_or_build,
+    make_view_cache_key,
+    normalize_params,
+)
 from .forms import CartAddItemForm, MenuItemSearchForm, ReviewForm
+from .pagination import CursorPaginator, InvalidCursor
+from .search import get_search_backend
+from .view_counter import view_counter
+
+
+def _cursor_page(menu_items, ordering, cursor, per_page=12):
+    """Lấy một trang theo cursor; cursor hỏng thì quay về trang đầu"""
+    paginator = CursorPaginator(menu_items, ordering, per_page)
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        return paginator.page()
+
+
+def _page_links(request, page_obj):
+    """Query string cho link trang trước/sau, giữ nguyên các bộ lọc"""
+    links = {}
+    for name, cursor in (
+        ("previous_query", page_obj.previous_cursor),
+        ("next_query", page_obj.next_cursor),
+    ):
+        if cursor:
+            params = request.GET.copy()
+            params.pop("page", None)
+            params["cursor"] = cursor
+            links[name] = params.urlencode()
+    return links
 
 
 def home(request):
     """Trang chủ"""
-    featured_items = MenuItem.objects.filter(
-        is_featured=True, is_available=True
-    )[:6]
 
-    categories = Category.objects.filter(is_active=True)[:6]
-    chefs = Chef.objects.filter(is_active=True)[:4]
+    def build():
+        featured_items = MenuItem.objects.filter(
+            is_featured=True, is_available=True
+        ).select_related("category")[:6]
 
-    context = {
-        "featured_items": featured_items,
-        "categories": categories,
-        "chefs": chefs,
-    }
+        return {
+            "featured_items": list(featured_items),
+            "categories": list(Category.objects.filter(is_active=True)[:6]),
+            "chefs": list(Chef.objects.filter(is_active=True)[:4]),
+        }
+
+    context = get_or_build(make_view_cache_key("home"), build)
+    context["menu_cache_version"] = get_menu_cache_version()
     return render(request, "restaurant/home.html", context)
 
 
+MENU_FILTER_PARAMS = (
+    "q",
+    "category",
+    "min_price",
+    "max_price",
+    "vegetarian",
+    "min_rating",
+)
+MENU_LIST_PARAMS = MENU_FILTER_PARAMS + ("sort", "cursor")
+# Các kiểu sắp xếp menu_list nhận (giá trị đầu là mặc định)
+MENU_SORTS = ("-created_at", "price", "-price", "name", "-avg_rating")
+
+
 def menu_list(request):
     """Danh sách món ăn với tìm kiếm và filter"""
-    menu_items = MenuItem.objects.filter(is_available=True).annotate(
-        avg_rating=Avg("reviews__rating"), review_count=Count("reviews")
-    )
-
     # Search form
     form = MenuItemSearchForm(request.GET)
 
-    # Tìm kiếm theo tên
-    query = request.GET.get("q")
-    if query:
-        menu_items = menu_items.filter(
-            Q(name__icontains=query)
-            | Q(description__icontains=query)
-            | Q(ingredients__icontains=query)
+    def build():
+        menu_items = MenuItem.objects.filter(is_available=True)
+
+        # Tìm kiếm theo tên, mô tả, nguyên liệu (qua chỉ mục tìm kiếm)
+        query = request.GET.get("q")
+        if query:
+            menu_items = get_search_backend().filter(menu_items, query)
+
+        # Filter theo category
+        category_id = request.GET.get("category")
+        if category_id:
+            menu_items = menu_items.filter(category_id=category_id)
+
+        # Filter theo giá
+        min_price = request.GET.get("min_price")
+        if min_price:
+            menu_items = menu_items.filter(price__gte=min_price)
+
+        max_price = request.GET.get("max_price")
+        if max_price:
+            menu_items = menu_items.filter(price__lte=max_price)
+
+        # Filter vegetarian
+        if request.GET.get("vegetarian"):
+            menu_items = menu_items.filter(is_vegetarian=True)
+
+        # Filter theo điểm đánh giá
+        min_rating = request.GET.get("min_rating")
+        if min_rating and min_rating.isdigit():
+            menu_items = menu_items.filter(avg_rating__gte=min_rating)
+
+        # Sorting (khi tìm kiếm mà không chọn sắp xếp thì theo độ liên quan)
+        sort_by = request.GET.get("sort", MENU_SORTS[0])
+        if sort_by not in MENU_SORTS:
+            sort_by = MENU_SORTS[0]
+        if (
+            query
+            and "sort" not in request.GET
+            and "search_rank" in menu_items.query.annotations
+        ):
+            sort_by = "search_rank"
+
+        # Pagination theo cursor, tổng số món được cache riêng theo bộ lọc
+        total_items = get_or_build(
+            make_view_cache_key(
+                "menu_list_count",
+                normalize_params(request.GET, MENU_FILTER_PARAMS),
+            ),
+            menu_items.count,
         )
-
-    # Filter theo category
-    category_id = request.GET.get("category")
-    if category_id:
-        menu_items = menu_items.filter(category_id=category_id)
-
-    # Filter theo giá
-    min_price = request.GET.get("min_price")
-    if min_price:
-        menu_items = menu_items.filter(price__gte=min_price)
-
-    max_price = request.GET.get("max_price")
-    if max_price:
-        menu_items = menu_items.filter(price__lte=max_price)
-
-    # Filter vegetarian
-    if request.GET.get("vegetarian"):
-        menu_items = menu_items.filter(is_vegetarian=True)
-
-    # Sorting
-    sort_by = request.GET.get("sort", "-created_at")
-    valid_sorts = ["-created_at", "price", "-price", "name"]
-    if sort_by in valid_sorts:
-        menu_items = menu_items.order_by(sort_by)
-
-    # Pagination
-    paginator = Paginator(menu_items, 12)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
-    context = {
-        "page_obj": page_obj,
-        "form": form,
-        "total_items": menu_items.count(),
-    }
+        return {
+            "page_obj": _cursor_page(
+                menu_items, sort_by, request.GET.get("cursor")
+            ),
+            "total_items": total_items,
+        }
+
+    # Cache theo bộ tham số GET đã chuẩn hóa
+    params = normalize_params(request.GET, MENU_LIST_PARAMS)
+    context = get_or_build(make_view_cache_key("menu_list", params), build)
+    context["form"] = form
+    context["menu_cache_version"] = get_menu_cache_version()
+    context.update(_page_links(request, context["page_obj"]))
     return render(request, "restaurant/menu_list.html", context)
 
 
 def menu_detail(request, slug):
     """Chi tiết món ăn"""
-    menu_item = get_object_or_404(MenuItem, slug=slug)
+    menu_item = get_object_or_404(
+        MenuItem.objects.select_related("category"), slug=slug
+    )
 
-    # Tăng lượt xem
-    menu_item.views_count += 1
-    menu_item.save(update_fields=["views_count"])
+    # Tăng lượt xem (ghi trễ theo lô, xem restaurant.view_counter)
+    menu_item.views_count += view_counter.record(menu_item.id)
 
     # Lấy reviews
     reviews = menu_item.reviews.select_related("user")[:10]
-    avg_rating = reviews.aggregate(Avg("rating"))["rating__avg"]
 
     # Form thêm vào giỏ
     cart_form = CartAddItemForm()
@@ -125,8 +188,8 @@ def menu_detail(request, slug):
         "menu_item": menu_item,
         "cart_form": cart_form,
         "reviews": reviews,
-        "avg_rating": avg_rating,
-        "review_count": reviews.count(),
+        "avg_rating": menu_item.avg_rating,
+        "review_count": menu_item.rating_count,
         "review_form": review_form,
         "user_review": user_review,
         "related_items": related_items,
@@ -136,20 +199,28 @@ def menu_detail(request, slug):
 
 def category_detail(request, slug):
     """Xem món theo danh mục"""
-    category = get_object_or_404(Category, slug=slug, is_active=True)
-    menu_items = MenuItem.objects.filter(
-        category=category, is_available=True
-    ).annotate(avg_rating=Avg("reviews__rating"))
-
-    # Pagination
-    paginator = Paginator(menu_items, 12)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
-    context = {
-        "category": category,
-        "page_obj": page_obj,
-    }
+    cursor = request.GET.get("cursor")
+
+    def build():
+        category = Category.objects.filter(slug=slug, is_active=True).first()
+        if category is None:
+            return {"category": None}
+        menu_items = MenuItem.objects.filter(
+            category=category, is_available=True
+        )
+        return {
+            "category": category,
+            "page_obj": _cursor_page(menu_items, "-created_at", cursor),
+        }
+
+    params = normalize_params(request.GET, ["cursor"])
+    context = get_or_build(
+        make_view_cache_key("category_detail", params, slug), build
+    )
+    if context["category"] is None:
+        raise Http404("Không tìm thấy danh mục")
+    context["menu_cache_version"] = get_menu_cache_version()
+    context.update(_page_links(request, context["page_obj"]))
     return render(request, "restaurant/category_detail.html", context)
 
 
@@ -159,7 +230,7 @@ def category_detail(request, slug):
 @require_POST
 def cart_add(request, menu_item_id):
     """Thêm món vào giỏ hàng"""
-    cart = Cart(request)
+    cart = get_cart(request)
     menu_item = get_object_or_404(MenuItem, id=menu_item_id)
     form = CartAddItemForm(request.POST)
 
@@ -178,7 +249,7 @@ def cart_add(request, menu_item_id):
 @require_POST
 def cart_remove(request, menu_item_id):
     """Xóa món khỏi giỏ hàng"""
-    cart = Cart(request)
+    cart = get_cart(request)
     menu_item = get_object_or_404(MenuItem, id=menu_item_id)
     cart.remove(menu_item)
     messages.info(request, f'Đã xóa "{menu_item.name}" khỏi giỏ hàng!')
@@ -187,7 +258,7 @@ def cart_remove(request, menu_item_id):
 
 def cart_detail(request):
     """Xem giỏ hàng"""
-    cart = Cart(request)
+    cart = get_cart(request)
 
     # Form để update số lượng
     for item in cart:
@@ -203,9 +274,8 @@ def cart_detail(request):
 
 def chefs_list(request):
     """Danh sách đầu bếp"""
-    chefs = Chef.objects.filter(is_active=True)
-
-    context = {
-        "chefs": chefs,
-    }
+    context = get_or_build(
+        make_view_cache_key("chefs_list"),
+        lambda: {"chefs": list(Chef.objects.filter(is_active=True))},
+    )
     return render(request, "restaurant/chefs_list.html", context)
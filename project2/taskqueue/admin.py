@@ -0,0 +1,44 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "name",
+        "status",
+        "attempts",
+        "max_attempts",
+        "run_at",
+        "created_at",
+        "finished_at",
+    ]
+    list_filter = ["status", "name"]
+    search_fields = ["name"]
+    readonly_fields = [
+        "name",
+        "args",
+        "kwargs",
+        "attempts",
+        "locked_by",
+        "locked_at",
+        "last_error",
+        "created_at",
+        "finished_at",
+    ]
+    actions = ["retry_tasks"]
+
+    def retry_tasks(self, request, queryset):
+        updated = queryset.exclude(status="running").update(
+            status="pending",
+            attempts=0,
+            run_at=timezone.now(),
+            locked_by="",
+            finished_at=None,
+        )
+        self.message_user(request, f"Đã đưa {updated} tác vụ vào hàng đợi")
+
+    retry_tasks.short_description = "Chạy lại tác vụ đã chọn"
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class TaskqueueConfig(AppConfig):
+    name = "taskqueue"
+    verbose_name = "Hàng đợi tác vụ"
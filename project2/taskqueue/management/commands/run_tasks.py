@@ -0,0 +1,87 @@
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from taskqueue.queue import claim, purge_finished, run_pending, run_task
+
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = "Chạy worker xử lý hàng đợi tác vụ nền"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "TASKS_CONCURRENCY", 2),
+            help="Số thread xử lý song song",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Số giây chờ khi hàng đợi trống",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Chạy hết tác vụ đến hạn rồi thoát",
+        )
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        if options["once"]:
+            count = run_pending(worker_id)
+            self.stdout.write(self.style.SUCCESS(f"Đã chạy {count} tác vụ"))
+            return
+
+        self.stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop.set())
+
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(f"{worker_id}:{index}", options["poll_interval"]),
+                name=f"task-worker-{index}",
+            )
+            for index in range(max(1, options["concurrency"]))
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(
+            f"Worker {worker_id} chạy với {len(threads)} thread, "
+            f"Ctrl+C để dừng"
+        )
+
+        retention = getattr(settings, "TASKS_RETENTION_DAYS", 7)
+        next_purge = 0
+        while not self.stop.is_set():
+            if time.monotonic() >= next_purge:
+                purge_finished(retention)
+                next_purge = time.monotonic() + PURGE_INTERVAL
+            self.stop.wait(1)
+
+        # Mỗi thread chạy nốt tác vụ đang dở rồi mới dừng
+        for thread in threads:
+            thread.join()
+        self.stdout.write("Worker đã dừng")
+
+    def work(self, worker_id, poll_interval):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                tasks = claim(worker_id)
+                if not tasks:
+                    self.stop.wait(poll_interval)
+                    continue
+                run_task(tasks[0])
+        finally:
+            connection.close()
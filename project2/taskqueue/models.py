@@ -0,0 +1,45 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Một lần gọi hàm nền, được worker `run_tasks` nhận và chạy"""
+
+    STATUS_CHOICES = (
+        ("pending", "Chờ chạy"),
+        ("running", "Đang chạy"),
+        ("done", "Hoàn thành"),
+        ("failed", "Thất bại"),
+    )
+
+    name = models.CharField(max_length=200, verbose_name="Tác vụ")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="pending"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name="Số lần chạy"
+    )
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Chạy lúc"
+    )
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, verbose_name="Lỗi gần nhất")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tác vụ nền"
+        verbose_name_plural = "Tác vụ nền"
+        ordering = ["run_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["status", "run_at"], name="task_status_run_at_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
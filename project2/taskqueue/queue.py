@@ -0,0 +1,245 @@
+import functools
+import logging
+import random
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def get_max_attempts():
+    return getattr(settings, "TASKS_MAX_ATTEMPTS", 5)
+
+
+def get_lock_timeout():
+    return getattr(settings, "TASKS_LOCK_TIMEOUT", 600)
+
+
+def is_eager():
+    return getattr(settings, "TASKS_EAGER", False)
+
+
+def retry_delay(attempts):
+    """Backoff lũy thừa có jitter: base, 2*base, 4*base... tối đa max"""
+    base = getattr(settings, "TASKS_RETRY_BACKOFF", 10)
+    cap = getattr(settings, "TASKS_RETRY_BACKOFF_MAX", 3600)
+    delay = min(cap, base * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.5, 1)
+
+
+class TaskFunction:
+    """Hàm đã đăng ký làm tác vụ: gọi trực tiếp như cũ hoặc `.delay()`"""
+
+    def __init__(self, func, max_attempts=None):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self.name, args, kwargs, self.max_attempts)
+
+
+def task(func=None, *, max_attempts=None):
+    """Decorator đăng ký tác vụ nền
+
+    Tham số phải serialize được bằng JSON (id, chuỗi ngày...), không
+    truyền instance model.
+    """
+    if func is None:
+        return functools.partial(task, max_attempts=max_attempts)
+    return TaskFunction(func, max_attempts)
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=None, countdown=0):
+    """Thêm tác vụ vào hàng đợi
+
+    Dòng Task được ghi trong transaction hiện tại nên worker chỉ thấy nó
+    sau khi commit. Với TASKS_EAGER, hàm được chạy ngay sau commit.
+    """
+    kwargs = kwargs or {}
+    if is_eager():
+        func = import_string(name)
+        transaction.on_commit(functools.partial(func, *args, **kwargs))
+        return None
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=max_attempts or get_max_attempts(),
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def _stale(now):
+    """Tác vụ "đang chạy" nhưng worker không còn gia hạn khóa"""
+    stale = now - timedelta(seconds=get_lock_timeout())
+    return Q(status="running", locked_at__lt=stale)
+
+
+def _ready(now):
+    """Tác vụ đến hạn, hoặc của worker đã chết và còn lượt chạy lại"""
+    return Q(status="pending", run_at__lte=now) | (
+        _stale(now) & Q(attempts__lt=F("max_attempts"))
+    )
+
+
+def _fail_exhausted(now):
+    """Tác vụ của worker đã chết nhưng hết lượt chạy thì chuyển thất bại"""
+    return Task.objects.filter(
+        _stale(now), attempts__gte=F("max_attempts")
+    ).update(
+        status="failed",
+        last_error="Worker dừng khi đang chạy tác vụ, đã hết số lần thử",
+        finished_at=now,
+        locked_at=None,
+    )
+
+
+def claim(worker_id, limit=1):
+    """Nhận tối đa `limit` tác vụ đến hạn cho worker
+
+    Trên PostgreSQL dùng SELECT ... FOR UPDATE SKIP LOCKED; mọi backend
+    đều đánh dấu bằng một UPDATE có điều kiện kèm token riêng, nên hai
+    worker không bao giờ nhận cùng một tác vụ. Tác vụ bị bỏ dở chỉ được
+    nhận lại khi chưa dùng hết `max_attempts`.
+    """
+    now = timezone.now()
+    token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+    with transaction.atomic():
+        _fail_exhausted(now)
+        queryset = Task.objects.filter(_ready(now)).order_by("run_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        ids = list(queryset.values_list("id", flat=True)[:limit])
+        if not ids:
+            return []
+        Task.objects.filter(_ready(now), id__in=ids).update(
+            status="running",
+            locked_by=token,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+    return list(Task.objects.filter(locked_by=token, status="running"))
+
+
+class Heartbeat(threading.Thread):
+    """Gia hạn `locked_at` định kỳ trong lúc tác vụ còn chạy
+
+    Nhờ đó tác vụ chạy lâu hơn TASKS_LOCK_TIMEOUT không bị worker khác
+    coi là bỏ dở và nhận lại.
+    """
+
+    def __init__(self, task):
+        super().__init__(name=f"task-heartbeat-{task.pk}", daemon=True)
+        self.task = task
+        self.interval = max(1, get_lock_timeout() / 3)
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                Task.objects.filter(
+                    pk=self.task.pk,
+                    locked_by=self.task.locked_by,
+                    status="running",
+                ).update(locked_at=timezone.now())
+        except Exception:
+            logger.exception(
+                "Không gia hạn được khóa tác vụ #%s", self.task.pk
+            )
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_task(task):
+    """Chạy một tác vụ đã nhận; lỗi thì hẹn giờ chạy lại hoặc đánh dấu hỏng
+
+    Trả về True nếu thành công.
+    """
+    owned = Task.objects.filter(pk=task.pk, locked_by=task.locked_by)
+    heartbeat = Heartbeat(task)
+    heartbeat.start()
+    try:
+        func = import_string(task.name)
+        func(*task.args, **task.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if task.attempts < task.max_attempts:
+            delay = retry_delay(task.attempts)
+            logger.warning(
+                "Tác vụ %s #%s lỗi lần %s, chạy lại sau %.0fs",
+                task.name,
+                task.pk,
+                task.attempts,
+                delay,
+            )
+            owned.update(
+                status="pending",
+                run_at=now + timedelta(seconds=delay),
+                last_error=error,
+                locked_by="",
+                locked_at=None,
+            )
+        else:
+            logger.error(
+                "Tác vụ %s #%s thất bại sau %s lần\n%s",
+                task.name,
+                task.pk,
+                task.attempts,
+                error,
+            )
+            owned.update(
+                status="failed",
+                last_error=error,
+                finished_at=now,
+                locked_at=None,
+            )
+        return False
+    finally:
+        heartbeat.stop()
+
+    owned.update(status="done", finished_at=timezone.now(), locked_at=None)
+    return True
+
+
+def run_pending(worker_id="inline", limit=None):
+    """Chạy lần lượt các tác vụ đến hạn trong process hiện tại
+
+    Dùng cho `run_tasks --once` và khi test. Trả về số tác vụ đã chạy.
+    """
+    count = 0
+    while limit is None or count < limit:
+        tasks = claim(worker_id)
+        if not tasks:
+            break
+        run_task(tasks[0])
+        count += 1
+    return count
+
+
+def purge_finished(days):
+    """Xóa tác vụ đã xong quá `days` ngày, giữ lại tác vụ thất bại"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Task.objects.filter(
+        status="done", finished_at__lt=cutoff
+    ).delete()
+    return deleted
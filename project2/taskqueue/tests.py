@@ -0,0 +1,106 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import claim, enqueue, run_pending, run_task, task
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def broken():
+    raise ValueError("hỏng")
+
+
+@task
+def slow_claim_check(seconds):
+    """Chạy lâu hơn TASKS_LOCK_TIMEOUT rồi thử nhận lại chính nó"""
+    time.sleep(seconds)
+    calls.append(claim("other-worker"))
+
+
+@override_settings(TASKS_EAGER=False)
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def make_stale(self, queued, attempts):
+        Task.objects.filter(pk=queued.pk).update(
+            status="running",
+            attempts=attempts,
+            locked_by="dead-worker",
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+
+    def test_claim_is_exclusive(self):
+        queued = record.delay(1)
+        self.assertEqual([t.pk for t in claim("a")], [queued.pk])
+        self.assertEqual(claim("b"), [])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "running")
+        self.assertEqual(queued.attempts, 1)
+
+    def test_countdown_delays_claim(self):
+        enqueue("taskqueue.tests.record", [1], countdown=60)
+        self.assertEqual(claim("a"), [])
+
+    def test_failure_retries_with_backoff_then_fails(self):
+        queued = broken.delay()
+        with self.assertLogs("taskqueue.queue", "WARNING"):
+            self.assertFalse(run_task(claim("a")[0]))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "pending")
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn("hỏng", queued.last_error)
+
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        with self.assertLogs("taskqueue.queue", "ERROR"):
+            self.assertFalse(run_task(claim("a")[0]))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "failed")
+        self.assertEqual(queued.attempts, 2)
+        self.assertEqual(claim("a"), [])
+
+    def test_stale_task_is_reclaimed(self):
+        queued = record.delay(1)
+        self.make_stale(queued, attempts=1)
+        tasks = claim("a")
+        self.assertEqual([t.pk for t in tasks], [queued.pk])
+        self.assertEqual(tasks[0].attempts, 2)
+        self.assertTrue(run_task(tasks[0]))
+        self.assertEqual(calls, [1])
+
+    def test_stale_task_past_max_attempts_fails(self):
+        queued = enqueue("taskqueue.tests.record", [1], max_attempts=1)
+        self.make_stale(queued, attempts=1)
+        self.assertEqual(claim("a"), [])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "failed")
+        self.assertEqual(calls, [])
+
+    def test_run_tasks_once(self):
+        record.delay(1)
+        record.delay(2)
+        call_command("run_tasks", "--once", stdout=StringIO())
+        self.assertEqual(calls, [1, 2])
+        self.assertFalse(Task.objects.exclude(status="done").exists())
+        self.assertEqual(run_pending(), 0)
+
+
+@override_settings(TASKS_EAGER=False, TASKS_LOCK_TIMEOUT=2)
+class HeartbeatTests(TransactionTestCase):
+    def test_long_task_is_not_reclaimed(self):
+        calls.clear()
+        slow_claim_check.delay(3)
+        self.assertTrue(run_task(claim("a")[0]))
+        self.assertEqual(calls, [[]])